@@ -33,6 +33,27 @@ function getPythonBrainEndpoint(req) {
   return `${proto}://${host}/api/assistant-brain`;
 }
 
+function getPythonTurnEndpoint(req) {
+  const explicit = String(process.env.ASSISTANT_TURN_URL || '').trim();
+  if (explicit) return explicit;
+  // An explicit brain URL points at another deployment; keep calling only the brain there.
+  if (String(process.env.ASSISTANT_BRAIN_URL || '').trim()) return '';
+
+  const host = String(req?.headers?.host || '').trim();
+  if (!host) return '';
+
+  const forwardedProto = String(req?.headers?.['x-forwarded-proto'] || '').trim().toLowerCase();
+  const proto = forwardedProto || (host.includes('localhost') ? 'http' : 'https');
+  return `${proto}://${host}/api/assistant-turn`;
+}
+
+function normalizePythonChatReply(payload) {
+  if (!payload || typeof payload !== 'object') return null;
+  const reply = String(payload.reply || '').trim();
+  if (!reply) return null;
+  return { reply };
+}
+
 function normalizeBrainClarifications(list = []) {
   if (!Array.isArray(list)) return [];
   return list
@@ -60,23 +81,52 @@ function normalizePythonBrainDecision(payload) {
   const summary = String(payload.summary || '').trim() || tool;
   const naturalReply = String(payload.natural_reply || payload.reply || '').trim();
   const mode = payload.mode === 'clarification_required' ? 'clarification_required' : TOOLS[tool].mode;
+  const actions = normalizePythonBrainActions(payload.actions);
 
   return {
     tool,
-    mode,
+    mode: actions.length >= 2 && payload.requires_clarification === true ? 'clarification_required' : mode,
     args,
     summary,
     confidence: String(payload.confidence || '').trim().toLowerCase(),
     natural_reply: naturalReply,
-    clarifications: normalizeBrainClarifications(payload.clarifications),
+    clarifications: actions.length >= 2
+      ? normalizeBrainClarifications(actions.flatMap((action) => action.clarifications))
+      : normalizeBrainClarifications(payload.clarifications),
+    actions: actions.length >= 2 ? actions : [],
   };
 }
 
+function normalizePythonBrainActions(list = []) {
+  if (!Array.isArray(list)) return [];
+  return list
+    .filter((step) => {
+      const tool = String(step?.tool || '').trim();
+      return tool && tool !== 'execute_action_bundle' && Object.prototype.hasOwnProperty.call(TOOLS, tool);
+    })
+    .map((step, idx) => {
+      const tool = String(step.tool).trim();
+      return {
+        tool,
+        args: step.args && typeof step.args === 'object' ? step.args : {},
+        summary: String(step.summary || '').trim() || tool,
+        clarifications: normalizeBrainClarifications(step.clarifications).map((item) => ({
+          ...item,
+          question: `Aksi ${idx + 1}: ${item.question}`,
+        })),
+      };
+    });
+}
+
+// One /api/assistant-turn call returns the brain decision and the chat reply
+// for the same message (parsed once); { decision, chat } either may be null.
 async function inferIntentWithPythonBrain(req, user, message) {
-  if (!isPythonAssistantEngineEnabled()) return null;
+  const none = { decision: null, chat: null };
+  if (!isPythonAssistantEngineEnabled()) return none;
 
-  const endpoint = getPythonBrainEndpoint(req);
-  if (!endpoint) return null;
+  const turnEndpoint = getPythonTurnEndpoint(req);
+  const endpoint = turnEndpoint || getPythonBrainEndpoint(req);
+  if (!endpoint) return none;
 
   const timeoutMs = Math.max(350, Math.min(2500, Number(process.env.ASSISTANT_BRAIN_TIMEOUT_MS || 1100)));
   const controller = new AbortController();
@@ -86,6 +136,8 @@ async function inferIntentWithPythonBrain(req, user, message) {
     const headers = { 'Content-Type': 'application/json' };
     const secret = String(process.env.ASSISTANT_BRAIN_SHARED_SECRET || '').trim();
     if (secret) headers['X-Brain-Secret'] = secret;
+    const chatbotSecret = String(process.env.CHATBOT_SHARED_SECRET || '').trim();
+    if (turnEndpoint && chatbotSecret) headers['X-Chatbot-Secret'] = chatbotSecret;
 
     const response = await fetch(endpoint, {
       method: 'POST',
@@ -97,12 +149,16 @@ async function inferIntentWithPythonBrain(req, user, message) {
       signal: controller.signal,
     });
 
-    if (!response.ok) return null;
+    if (!response.ok) return none;
 
     const json = await response.json().catch(() => null);
-    return normalizePythonBrainDecision(json);
+    if (!turnEndpoint) return { decision: normalizePythonBrainDecision(json), chat: null };
+    return {
+      decision: normalizePythonBrainDecision(json?.brain),
+      chat: normalizePythonChatReply(json?.chat),
+    };
   } catch {
-    return null;
+    return none;
   } finally {
     clearTimeout(timeout);
   }
@@ -2125,9 +2181,10 @@ async function toolExecuteActionBundle(ctx, args = {}) {
       throw err;
     }
 
+    // Read steps only come from Python brain plans ("buat task ... lalu cek risiko deadline").
     const def = TOOLS[toolName];
-    if (!def || def.mode !== 'write') {
-      const err = new Error(`Aksi ${i + 1} menggunakan tool write yang tidak valid: ${toolName}`);
+    if (!def || (def.mode !== 'write' && def.mode !== 'read')) {
+      const err = new Error(`Aksi ${i + 1} menggunakan tool yang tidak valid: ${toolName}`);
       err.statusCode = 400;
       throw err;
     }
@@ -2138,9 +2195,11 @@ async function toolExecuteActionBundle(ctx, args = {}) {
       executed.push({
         index: i + 1,
         tool: toolName,
+        mode: def.mode,
         summary: action.summary || toolName,
         args: actionArgs,
         result,
+        ...(def.mode === 'read' ? { reply: summarizeRead(toolName, result, ctx.user) } : {}),
       });
     } catch (err) {
       const doneLabel = executed.length
@@ -2602,7 +2661,7 @@ function writeExecutionReply(toolName, result) {
     const actions = Array.isArray(result.actions) ? result.actions : [];
     if (!actions.length) return 'Bundle selesai tanpa aksi.';
     const details = actions
-      .map((entry) => `${entry.index}. ${writeExecutionReply(entry.tool, entry.result)}`)
+      .map((entry) => `${entry.index}. ${entry.reply || writeExecutionReply(entry.tool, entry.result)}`)
       .join(' | ');
     return `Bundle ${actions.length} aksi berhasil: ${details}`;
   }
@@ -2781,7 +2840,7 @@ function buildAssistantToolCalls(toolName = '', args = {}) {
     return Array.isArray(args?.actions)
       ? args.actions.map((action) => ({
           name: action.tool,
-          mode: 'write',
+          mode: TOOLS[action.tool]?.mode || 'write',
           args: action.args || {},
         }))
       : [];
@@ -2881,8 +2940,16 @@ async function processAssistantRequest(req, user, body = {}) {
     throw createError('Message required', 400);
   }
 
-  const pythonDecision = await inferIntentWithPythonBrain(req, user, message);
-  const detectedIntent = pythonDecision
+  const { decision: pythonDecision, chat: pythonChat } = await inferIntentWithPythonBrain(req, user, message);
+  const pythonActions = pythonDecision?.actions?.length ? pythonDecision.actions : null;
+  const detectedIntent = pythonActions
+    ? {
+        tool: 'execute_action_bundle',
+        mode: 'write',
+        args: { actions: pythonActions.map(({ tool, args, summary }) => ({ tool, args, summary })) },
+        summary: `Jalankan ${pythonActions.length} aksi: ${pythonActions.map((x) => x.summary).join(', ')}`,
+      }
+    : pythonDecision
     ? {
         tool: pythonDecision.tool,
         mode: TOOLS[pythonDecision.tool]?.mode || pythonDecision.mode,
@@ -2940,12 +3007,14 @@ async function processAssistantRequest(req, user, body = {}) {
   const result = await def.run({ user }, intentWithUser.args || {});
   const explainability = buildExplainability(intentWithUser.tool, result, user);
   const readReply = summarizeRead(intentWithUser.tool, result, user);
+  // No tool matched: the chat reply from the same turn answers the message before the help tips.
+  const leadReply = pythonDecision?.natural_reply || (intentWithUser.tool === 'help' ? pythonChat?.reply || '' : '');
   return {
     ok: true,
     mode: 'read',
     tool: intentWithUser.tool,
     tool_calls: [{ name: intentWithUser.tool, mode: 'read', args: intentWithUser.args || {} }],
-    reply: mergeNaturalReply(pythonDecision?.natural_reply || '', readReply),
+    reply: mergeNaturalReply(leadReply, readReply),
     data: result,
     explainability,
     execution_frame: buildExecutionFrame({
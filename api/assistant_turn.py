@@ -0,0 +1,135 @@
+"""Combined chat reply + assistant brain decision for one message.
+
+One request instead of ``/api/chatbot`` and ``/api/assistant-brain`` for the
+same text: one cold start, one auth check, one body read and one parse of the
+message (ParsedMessage: lowercase text, temporal scan) used by both the chat
+processor and the brain. ``chat`` is the ``/api/chatbot`` body, ``brain`` the
+``/api/assistant-brain`` body. ``api/assistant.js`` calls it when the Python
+assistant engine is on.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+
+from chatbot.brain import brain_decision, decision_cache_stats
+from chatbot.intents import normalize_message
+from chatbot.keepalive import KeepAliveHandler
+from chatbot.processor import parse_message
+from chatbot.replies import chat_reply
+from chatbot.sessions import session_store_stats
+from chatbot.timing import NULL_TIMER, StageTimer
+
+
+MAX_BODY_BYTES = 8 * 1024
+ALLOWED_PATHS = {"/api/assistant-turn", "/api/assistant_turn.py"}
+TIMINGS_QUERY_FLAGS = {"timings=1", "timings=true"}
+# Every configured secret must match, so this endpoint is never easier to
+# call than the two it replaces.
+SECRETS = (("CHATBOT_SHARED_SECRET", "X-Chatbot-Secret"), ("ASSISTANT_BRAIN_SHARED_SECRET", "X-Brain-Secret"))
+
+
+def _server_timing_enabled() -> bool:
+    raw = str(os.getenv("CHATBOT_SERVER_TIMING", "true")).strip().lower()
+    return raw not in {"0", "false", "no", "off"}
+
+
+def _authorized(handler: KeepAliveHandler) -> bool:
+    for env_name, header in SECRETS:
+        required_secret = str(os.getenv(env_name, "")).strip()
+        if required_secret and str(handler.headers.get(header, "")).strip() != required_secret:
+            return False
+    return True
+
+
+def _send_json(handler: KeepAliveHandler, status_code: int, payload: dict, timer: StageTimer = NULL_TIMER) -> None:
+    body = json.dumps(payload, ensure_ascii=True).encode("utf-8")
+    timer.lap("encode")
+    handler.send_response(status_code)
+    handler.send_header("Content-Type", "application/json; charset=utf-8")
+    handler.send_header("Cache-Control", "no-store")
+    if timer is not NULL_TIMER:
+        handler.send_header("Server-Timing", timer.server_timing())
+    handler.send_header("Content-Length", str(len(body)))
+    handler.send_connection_header()
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+def _read_json_body(handler: KeepAliveHandler) -> dict:
+    length = handler.body_length()
+    if length <= 0:
+        return {}
+    raw = handler.read_body(length).decode("utf-8", errors="ignore")
+    try:
+        parsed = json.loads(raw)
+    except Exception:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def turn_reply(payload: dict, timer: StageTimer = NULL_TIMER) -> tuple[int, dict]:
+    """(status, body) with both replies; chat request errors (400) apply to the whole turn."""
+    message = payload.get("message")
+    parsed = None
+    if isinstance(message, str):
+        # Both sides collapse whitespace the same way; each keeps its own length
+        # limit and only uses the parse while its text is the parsed text.
+        message = normalize_message(message)
+        payload = {**payload, "message": message}
+        parsed = parse_message(message) if message else None
+    status, chat = chat_reply(payload, timer, parsed)
+    if status != 200:
+        return status, chat
+    brain = brain_decision(payload["message"], payload.get("user", ""), parsed)
+    timer.lap("brain")
+    return 200, {"chat": chat, "brain": brain}
+
+
+class handler(KeepAliveHandler):  # pylint: disable=invalid-name
+    def log_message(self, fmt: str, *args) -> None:  # noqa: A003
+        return
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.discard_body()
+        _send_json(
+            self,
+            200,
+            {
+                "ok": True,
+                "service": "assistant-turn-python",
+                "endpoint": "/api/assistant-turn",
+                "sessions": session_store_stats(),
+                "decision_cache": decision_cache_stats(),
+            },
+        )
+
+    def do_POST(self) -> None:  # noqa: N802
+        path, _, query = self.path.partition("?")
+        if path not in ALLOWED_PATHS:
+            self.discard_body()
+            _send_json(self, 404, {"error": "Not Found"})
+            return
+
+        if not _authorized(self):
+            self.discard_body()
+            _send_json(self, 401, {"error": "Unauthorized"})
+            return
+
+        if self.body_length() > MAX_BODY_BYTES:
+            self.discard_body()
+            _send_json(self, 413, {"error": "Payload too large"})
+            return
+
+        timer = StageTimer()
+        payload = _read_json_body(self)
+        timer.lap("decode")
+        want_body_timings = payload.get("timings") is True or any(flag in query.split("&") for flag in TIMINGS_QUERY_FLAGS)
+        if not want_body_timings and not _server_timing_enabled():
+            timer = NULL_TIMER
+
+        status, body = turn_reply(payload, timer)
+        if status == 200 and want_body_timings:
+            body["timings"] = timer.as_dict()
+        _send_json(self, status, body, timer)
@@ -7,38 +7,98 @@ from __future__ import annotations
 
 import json
 import os
-from http.server import BaseHTTPRequestHandler
+import re
 
-from chatbot.processor import process_message_payload
+from chatbot.intents import query_embedding_cache_stats
+from chatbot.keepalive import KeepAliveHandler
+from chatbot.processor import MAX_BATCH_ITEMS, process_message_batch
+from chatbot.replies import chat_reply, shape_result as _shape_result
+from chatbot.sessions import session_store_stats
+from chatbot.timing import NULL_TIMER, StageTimer
 
 
 MAX_BODY_BYTES = 8 * 1024
+MAX_BATCH_BODY_BYTES = 96 * 1024
 ALLOWED_PATHS = {"/api/chat.py", "/api/chat", "/api/chatbot"}
+TIMINGS_QUERY_FLAGS = {"timings=1", "timings=true"}
+_JSON_WS = re.compile(r"[ \t\n\r]*")
+_JSON_DECODER = json.JSONDecoder()
 
 
-def _send_json(handler: BaseHTTPRequestHandler, status_code: int, payload: dict) -> None:
+def _server_timing_enabled() -> bool:
+    raw = str(os.getenv("CHATBOT_SERVER_TIMING", "true")).strip().lower()
+    return raw not in {"0", "false", "no", "off"}
+
+
+def _send_json(handler: KeepAliveHandler, status_code: int, payload: dict, timer: StageTimer = NULL_TIMER) -> None:
     body = json.dumps(payload, ensure_ascii=True).encode("utf-8")
+    timer.lap("encode")
     handler.send_response(status_code)
     handler.send_header("Content-Type", "application/json; charset=utf-8")
     handler.send_header("Cache-Control", "no-store")
+    if timer is not NULL_TIMER:
+        handler.send_header("Server-Timing", timer.server_timing())
     handler.send_header("Content-Length", str(len(body)))
+    handler.send_connection_header()
     handler.end_headers()
     handler.wfile.write(body)
 
 
-def _read_json_body(handler: BaseHTTPRequestHandler) -> dict:
-    raw_length = str(handler.headers.get("Content-Length", "0")).strip()
-    try:
-        length = int(raw_length)
-    except Exception:
-        length = 0
-
+def _declares_items(prefix: str) -> bool:
+    """True if the top-level object of a (possibly truncated) JSON body has an "items" key.
+
+    Keys are walked in order and the values before "items" are decoded only
+    to skip them; a prefix that ends before the key is not a batch.
+    """
+    idx = _JSON_WS.match(prefix).end()
+    if not prefix.startswith("{", idx):
+        return False
+    idx += 1
+    while True:
+        idx = _JSON_WS.match(prefix, idx).end()
+        if not prefix.startswith('"', idx):
+            return False
+        try:
+            key, idx = json.decoder.scanstring(prefix, idx + 1)
+        except ValueError:
+            return False
+        if key == "items":
+            return True
+        idx = _JSON_WS.match(prefix, idx).end()
+        if not prefix.startswith(":", idx):
+            return False
+        try:
+            _, idx = _JSON_DECODER.raw_decode(prefix, _JSON_WS.match(prefix, idx + 1).end())
+        except ValueError:
+            return False
+        idx = _JSON_WS.match(prefix, idx).end()
+        if not prefix.startswith(",", idx):
+            return False
+        idx += 1
+
+
+def _read_json_body(handler: KeepAliveHandler, max_bytes: int = MAX_BODY_BYTES, batch_max_bytes: int = 0) -> dict:
+    """Read and parse the body; a 413 body is drained here.
+
+    Only a batch (a body with a top-level "items" key) may exceed max_bytes,
+    up to batch_max_bytes. Past max_bytes just the first max_bytes are read
+    to tell, so an oversized single message is never read in full or parsed.
+    """
+    length = handler.body_length()
     if length <= 0:
         return {}
-    if length > MAX_BODY_BYTES:
+    if length > max(max_bytes, batch_max_bytes):
+        handler.discard_body(length)
         return {"_error": "payload_too_large"}
 
-    raw = handler.rfile.read(length).decode("utf-8", errors="ignore")
+    raw = handler.read_body(min(length, max_bytes))
+    if length > max_bytes:
+        if not _declares_items(raw.decode("utf-8", errors="ignore")):
+            handler.discard_body(length - len(raw))
+            return {"_error": "payload_too_large"}
+        raw += handler.read_body(length - len(raw))
+
+    raw = raw.decode("utf-8", errors="ignore")
     try:
         parsed = json.loads(raw)
     except Exception:
@@ -46,12 +106,13 @@ def _read_json_body(handler: BaseHTTPRequestHandler) -> dict:
     return parsed if isinstance(parsed, dict) else {}
 
 
-class handler(BaseHTTPRequestHandler):  # pylint: disable=invalid-name
+class handler(KeepAliveHandler):  # pylint: disable=invalid-name
     def log_message(self, fmt: str, *args) -> None:  # noqa: A003
         # Suppress default stdout logs in serverless.
         return
 
     def do_GET(self) -> None:  # noqa: N802
+        self.discard_body()
         _send_json(
             self,
             200,
@@ -60,12 +121,15 @@ class handler(BaseHTTPRequestHandler):  # pylint: disable=invalid-name
                 "service": "chatbot-python",
                 "endpoint": "/api/chat",
                 "mode": "stateless",
+                "neural_query_cache": query_embedding_cache_stats(),
+                "sessions": session_store_stats(),
             },
         )
 
     def do_POST(self) -> None:  # noqa: N802
-        path = self.path.split("?", 1)[0]
+        path, _, query = self.path.partition("?")
         if path not in ALLOWED_PATHS:
+            self.discard_body()
             _send_json(self, 404, {"error": "Not Found"})
             return
 
@@ -73,39 +137,46 @@ class handler(BaseHTTPRequestHandler):  # pylint: disable=invalid-name
         if required_secret:
             incoming_secret = str(self.headers.get("X-Chatbot-Secret", "")).strip()
             if incoming_secret != required_secret:
+                self.discard_body()
                 _send_json(self, 401, {"error": "Unauthorized"})
                 return
 
-        payload = _read_json_body(self)
+        # Batch bodies get a larger (still bounded) limit; single messages keep MAX_BODY_BYTES.
+        timer = StageTimer()
+        payload = _read_json_body(self, MAX_BODY_BYTES, MAX_BATCH_BODY_BYTES)
+        timer.lap("decode")
         if payload.get("_error") == "payload_too_large":
             _send_json(self, 413, {"error": "Payload too large"})
             return
 
-        message = payload.get("message")
-        if not isinstance(message, str) or not message.strip():
-            _send_json(self, 400, {"error": "message is required"})
+        # Timings in the body are opt-in; the Server-Timing header is on unless disabled.
+        want_body_timings = payload.get("timings") is True or any(flag in query.split("&") for flag in TIMINGS_QUERY_FLAGS)
+        if not want_body_timings and not _server_timing_enabled():
+            timer = NULL_TIMER
+
+        items = payload.get("items")
+        if isinstance(items, list):
+            if not items:
+                _send_json(self, 400, {"error": "items must not be empty"}, timer)
+                return
+            if len(items) > MAX_BATCH_ITEMS:
+                _send_json(self, 413, {"error": f"Batch limited to {MAX_BATCH_ITEMS} items"}, timer)
+                return
+            results = [
+                {"error": str(result["error"])} if "error" in result else _shape_result(result)
+                for result in process_message_batch(items, timer=timer)
+            ]
+            body = {"results": results, "count": len(results)}
+            if want_body_timings:
+                body["timings"] = timer.as_dict()
+            _send_json(self, 200, body, timer)
+            return
+
+        if self.body_length() > MAX_BODY_BYTES:
+            _send_json(self, 413, {"error": "Payload too large"})
             return
 
-        context = payload.get("context") if isinstance(payload.get("context"), dict) else None
-        memory = payload.get("memory") if isinstance(payload.get("memory"), dict) else None
-        planner = payload.get("planner") if isinstance(payload.get("planner"), dict) else None
-        result = process_message_payload(message, context, memory, planner)
-        reply = str(result.get("reply", "")).strip()
-        suggestions = result.get("suggestions")
-        intent = str(result.get("intent", "")).strip()
-        adaptive = result.get("adaptive")
-        planner_out = result.get("planner")
-        memory_update = result.get("memory_update")
-
-        payload_out = {"reply": reply}
-        if isinstance(suggestions, list):
-            payload_out["suggestions"] = suggestions[:4]
-        if intent:
-            payload_out["intent"] = intent
-        if isinstance(adaptive, dict):
-            payload_out["adaptive"] = adaptive
-        if isinstance(planner_out, dict):
-            payload_out["planner"] = planner_out
-        if isinstance(memory_update, dict):
-            payload_out["memory_update"] = memory_update
-        _send_json(self, 200, payload_out)
+        status, body = chat_reply(payload, timer)
+        if status == 200 and want_body_timings:
+            body["timings"] = timer.as_dict()
+        _send_json(self, status, body, timer)
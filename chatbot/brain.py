@@ -0,0 +1,527 @@
+"""Rule-based tool decisions for the assistant brain.
+
+Parses a user command into one or more validated tool calls (create/complete
+task or assignment, deadline updates, read tools) with clarifications for
+missing fields. Shared by ``api/assistant_brain.py`` and the combined
+``api/assistant_turn.py`` endpoint.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from chatbot.lazy import LazyPattern, SequencePattern, cut_tail
+from chatbot.temporal import MONTH_WORD_PATTERN, parse_temporal
+
+
+ENGINE = "python-v1"
+DEFAULT_TIME_TEXT = "21:00"
+MAX_PLAN_STEPS = 5
+DAY_MONTH_PATTERN = rf"\b(?:tanggal\s*)?\d{{1,2}}\s*(?:[\/.,-]\s*)?{MONTH_WORD_PATTERN}(?:\s+\d{{4}})?\b"
+ALLOWED_USERS = {"Zaldy", "Nesya"}
+# Two-sided rules and ".*$" cuts go through chatbot.lazy so matching stays
+# linear in the message length (plain re retries ".*" from every keyword).
+_DEADLINE_WORD = LazyPattern(r"\b(?:deadline|due)\b", re.I)
+_DESCRIPTION_WORD = LazyPattern(r"\b(?:deskripsi|description|desc)\b", re.I)
+_DESCRIPTION_HEAD = LazyPattern(r"(?:deskripsi|description|desc)\s+", re.I)
+_DESCRIPTION_STOP = LazyPattern(r"\s+(?:deadline|due)\b", re.I)
+_UPDATE_DEADLINE = SequencePattern(r"(?:ubah|update|ganti|reschedule|geser)\s+(?:deadline|due)", r"(?:task|tugas)(?:\s*id)?\s*#?(\d+)")
+_DEADLINE_RISK = SequencePattern(r"(?:risk|resiko|risiko|berisiko|rawan|terlambat)", r"(?:deadline|task|tugas|assignment|kuliah)")
+_ASSIGNMENT_LIST = SequencePattern(r"(?:assignment|tugas kuliah|kuliah)", r"(?:pending|belum|deadline|list|daftar|apa)")
+_TASK_LIST = SequencePattern(r"(?:task|tugas|todo|to-do)", r"(?:pending|belum|deadline|list|daftar|apa)")
+# Compound messages ("buat task X deadline besok lalu cek risiko deadline")
+# split on these joiners, but text after a joiner only becomes its own step
+# when it leads with a command verb; "dan sampo" or ", jam 19:00" stay details.
+_STEP_JOINER = LazyPattern(r"\s*[;,]?\s*\b(?:lalu|kemudian|terus|habis itu|setelah itu|dan|then|and)\b\s*|\s*[;,]\s*", re.I)
+_STEP_VERB = LazyPattern(
+    r"(?:(?:tolong|please|pls)\s+)?(?:buat|buatkan|tambah|add|create|selesaikan|complete|done|tandai|ubah|update|ganti|reschedule|geser|"
+    r"cek|check|lihat|tampilkan|show|list|ambil|buka|prediksi|susun|rangkum)\b",
+    re.I,
+)
+ALLOWED_TOOLS = {
+    "create_task",
+    "create_assignment",
+    "complete_task",
+    "complete_assignment",
+    "update_task_deadline",
+    "get_tasks",
+    "get_assignments",
+    "get_deadline_risk",
+    "get_daily_brief",
+    "get_unified_memory",
+    "get_memory_graph",
+    "get_study_plan",
+    "get_schedule",
+    "get_goals",
+    "get_report",
+    "set_study_preferences",
+    "replan_study_window",
+    "nudge_partner_checkin",
+}
+
+
+def _collapse_spaces(text=""):
+    return re.sub(r"\s{2,}", " ", str(text or "")).strip()
+
+
+def _normalize_priority(raw=""):
+    val = str(raw or "").strip().lower()
+    if val in ("high", "tinggi"):
+        return "high"
+    if val in ("low", "rendah"):
+        return "low"
+    return "medium"
+
+
+def _normalize_assigned_to(raw="", fallback=""):
+    candidate = str(raw or "").strip().lower()
+    if candidate:
+        fixed = candidate[:1].upper() + candidate[1:]
+        if fixed in ALLOWED_USERS:
+            return fixed
+    fb = str(fallback or "").strip()
+    if fb in ALLOWED_USERS:
+        return fb
+    return None
+
+
+def _placeholder_title(title=""):
+    clean = _collapse_spaces(title).lower()
+    if len(clean) < 3:
+        return True
+    return clean in {"task", "tugas", "todo", "to-do", "assignment", "kuliah", "belajar", "study"}
+
+
+def _parse_datetime_from_text(text="", parsed=None):
+    # "2026-03-01t19:00" is accepted as an ISO date with time, like before.
+    msg = re.sub(r"\b(\d{4}-\d{2}-\d{2})t(\d{1,2}:\d{2})\b", r"\1 \2", str(text or ""))
+    scan = parsed.temporal if parsed is not None and parsed.text == msg else None
+    resolved = parse_temporal(msg, datetime.now().date(), scan).at(DEFAULT_TIME_TEXT)
+    return resolved.isoformat(timespec="seconds") if resolved else None
+
+
+def _strip_task_title(text=""):
+    title = str(text or "")
+    title = re.sub(r"^(?:tolong|please|pls|bisa|boleh|minta)\s+", "", title, flags=re.I)
+    title = re.sub(r"^(?:buat|buatkan|tambah|add|create|catat|ingatkan)\s+(?:task|tugas)\s*", "", title, flags=re.I)
+    title = re.sub(r"\b(?:priority|prioritas)\s*(?:high|medium|low|tinggi|sedang|rendah)\b", "", title, flags=re.I)
+    title = re.sub(r"\b(?:assign(?:ed)?\s*to|untuk|for)\s*(?:zaldy|nesya)\b", "", title, flags=re.I)
+    title = cut_tail(_DEADLINE_WORD, title)
+    title = re.sub(r"\b(?:today|hari ini|tomorrow|besok|lusa|day after tomorrow)\b", "", title, flags=re.I)
+    title = re.sub(r"\b\d{4}-\d{2}-\d{2}\b", "", title)
+    title = re.sub(DAY_MONTH_PATTERN, "", title, flags=re.I)
+    title = re.sub(r"\b\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4}\b", "", title)
+    title = re.sub(r"\b\d{1,2}:\d{2}\b", "", title)
+    return _collapse_spaces(title)
+
+
+def _strip_assignment_title(text=""):
+    title = str(text or "")
+    title = re.sub(r"^(?:tolong|please|pls|bisa|boleh|minta)\s+", "", title, flags=re.I)
+    title = re.sub(r"^(?:buat|buatkan|tambah|add|create|catat|ingatkan)\s+(?:assignment|tugas kuliah)\s*", "", title, flags=re.I)
+    title = re.sub(r"\b(?:assign(?:ed)?\s*to|untuk|for)\s*(?:zaldy|nesya)\b", "", title, flags=re.I)
+    title = cut_tail(_DESCRIPTION_WORD, title)
+    title = cut_tail(_DEADLINE_WORD, title)
+    title = re.sub(r"\b(?:today|hari ini|tomorrow|besok|lusa|day after tomorrow)\b", "", title, flags=re.I)
+    title = re.sub(r"\b\d{4}-\d{2}-\d{2}\b", "", title)
+    title = re.sub(DAY_MONTH_PATTERN, "", title, flags=re.I)
+    title = re.sub(r"\b\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4}\b", "", title)
+    title = re.sub(r"\b\d{1,2}:\d{2}\b", "", title)
+    return _collapse_spaces(title)
+
+
+def _extract_description(text=""):
+    """Text after "deskripsi"/"desc" up to " deadline"/" due" or the end, in one pass.
+
+    Same result (after collapsing spaces) as searching
+    ``(?:deskripsi|description|desc)\s+(.+?)(?=\s+(?:deadline|due)\b|$)``,
+    which is quadratic when the keyword repeats on lines that are not last.
+    """
+    end = len(text) - 1 if text.endswith("\n") else len(text)
+    pos = 0
+    stop = None
+    stop_known = False
+    while True:
+        head = _DESCRIPTION_HEAD.search(text, pos)
+        if head is None:
+            return ""
+        start = head.end()
+        line_end = text.find("\n", start)
+        if line_end < 0:
+            line_end = len(text)
+        # The next stop after this head; reused while it is still ahead (or absent).
+        if not stop_known or (stop is not None and stop.start() <= start):
+            stop = _DESCRIPTION_STOP.search(text, start + 1)
+            stop_known = True
+        if stop is not None and stop.start() <= line_end:
+            return text[start : stop.start()]
+        if line_end >= end:
+            return text[start:line_end]
+        # A later head on this line only helps if its whitespace runs past the
+        # newline, so it must end in the spaces right before it.
+        keyword_end = line_end
+        while keyword_end > start and text[keyword_end - 1] in " \t\r\f\v":
+            keyword_end -= 1
+        pos = max(start, keyword_end - len("description"))
+
+
+def _parse_create_task(message="", user="", parsed=None):
+    original = str(message or "").strip()
+    priority_match = re.search(r"(?:priority|prioritas)\s*(high|medium|low|tinggi|sedang|rendah)", original, flags=re.I)
+    assigned_match = re.search(r"(?:assign(?:ed)?\s*to|untuk|for)\s*(zaldy|nesya)\b", original, flags=re.I)
+    deadline = _parse_datetime_from_text(original, parsed)
+    title = _strip_task_title(original)
+    args = {
+        "title": title,
+        "priority": _normalize_priority(priority_match.group(1) if priority_match else ""),
+        "assigned_to": _normalize_assigned_to(assigned_match.group(1) if assigned_match else "", user),
+        "deadline": deadline,
+    }
+    return args
+
+
+def _parse_create_assignment(message="", user="", parsed=None):
+    original = str(message or "").strip()
+    assigned_match = re.search(r"(?:assign(?:ed)?\s*to|untuk|for)\s*(zaldy|nesya)\b", original, flags=re.I)
+    deadline = _parse_datetime_from_text(original, parsed)
+    description = _collapse_spaces(_extract_description(original))
+    title = _strip_assignment_title(original)
+    args = {
+        "title": title,
+        "description": description or None,
+        "assigned_to": _normalize_assigned_to(assigned_match.group(1) if assigned_match else "", user),
+        "deadline": deadline,
+    }
+    return args
+
+
+def _build_clarification(field, question, example):
+    return {"field": field, "question": question, "example": example}
+
+
+def _detect_intent(message="", user="", parsed=None):
+    msg = str(message or "").strip()
+    if parsed is not None and parsed.text != msg:
+        parsed = None
+    lower = parsed.lower if parsed is not None else msg.lower()
+
+    if re.search(r"(?:buat|buatkan|tambah|add|create)\s+(?:task|tugas)\b", lower):
+        args = _parse_create_task(msg, user, parsed)
+        clarifications = []
+        if _placeholder_title(args.get("title", "")):
+            clarifications.append(_build_clarification("title", "Judul task-nya apa?", "buat task review basis data deadline besok 19:00 priority high"))
+        if not args.get("deadline"):
+            clarifications.append(_build_clarification("deadline", "Deadline task kapan?", "buat task review basis data deadline besok 19:00 priority high"))
+        if clarifications:
+            return {
+                "tool": "create_task",
+                "mode": "clarification_required",
+                "summary": "Butuh detail untuk buat task",
+                "args": args,
+                "clarifications": clarifications,
+                "confidence": "high",
+                "natural_reply": "Siap, aku bantu buat task. Biar akurat, aku perlu detail berikut dulu.",
+            }
+        return {
+            "tool": "create_task",
+            "mode": "write",
+            "summary": "Buat task baru",
+            "args": args,
+            "confidence": "high",
+            "natural_reply": "Sip, task-nya akan langsung aku eksekusi sekarang.",
+        }
+
+    if re.search(r"(?:buat|buatkan|tambah|add|create)\s+(?:assignment|tugas kuliah)\b", lower):
+        args = _parse_create_assignment(msg, user, parsed)
+        clarifications = []
+        if _placeholder_title(args.get("title", "")):
+            clarifications.append(_build_clarification("title", "Judul tugas kuliahnya apa?", "buat assignment makalah AI deadline besok 21:00"))
+        if not args.get("deadline"):
+            clarifications.append(_build_clarification("deadline", "Deadline tugas kuliahnya kapan?", "buat assignment makalah AI deadline 2026-03-01 21:00"))
+        if clarifications:
+            return {
+                "tool": "create_assignment",
+                "mode": "clarification_required",
+                "summary": "Butuh detail untuk buat assignment",
+                "args": args,
+                "clarifications": clarifications,
+                "confidence": "high",
+                "natural_reply": "Oke, aku siap buat tugas kuliah. Tinggal lengkapi detail pentingnya dulu.",
+            }
+        return {
+            "tool": "create_assignment",
+            "mode": "write",
+            "summary": "Buat assignment baru",
+            "args": args,
+            "confidence": "high",
+            "natural_reply": "Siap, assignment akan langsung aku buat sesuai detailmu.",
+        }
+
+    complete_task = re.search(r"(?:selesaikan|complete|done|tandai)\s+(?:task|tugas)(?:\s*id)?\s*#?(\d+)", lower)
+    if complete_task:
+        return {
+            "tool": "complete_task",
+            "mode": "write",
+            "summary": f"Tandai task #{complete_task.group(1)} selesai",
+            "args": {"id": int(complete_task.group(1))},
+            "confidence": "high",
+            "natural_reply": "Mantap, aku tandai task itu sebagai selesai.",
+        }
+
+    complete_assignment = re.search(r"(?:selesaikan|complete|done|tandai)\s+(?:assignment|tugas kuliah)(?:\s*id)?\s*#?(\d+)", lower)
+    if complete_assignment:
+        return {
+            "tool": "complete_assignment",
+            "mode": "write",
+            "summary": f"Tandai assignment #{complete_assignment.group(1)} selesai",
+            "args": {"id": int(complete_assignment.group(1))},
+            "confidence": "high",
+            "natural_reply": "Siap, assignment itu aku tandai sudah selesai.",
+        }
+
+    update_deadline = _UPDATE_DEADLINE.search(lower)
+    if update_deadline:
+        return {
+            "tool": "update_task_deadline",
+            "mode": "write",
+            "summary": f"Ubah deadline task #{update_deadline.group(1)}",
+            "args": {"id": int(update_deadline.group(1)), "deadline": _parse_datetime_from_text(msg, parsed)},
+            "confidence": "medium",
+            "natural_reply": "Baik, aku bantu update deadline task-nya.",
+        }
+
+    if _DEADLINE_RISK.search(lower):
+        return {
+            "tool": "get_deadline_risk",
+            "mode": "read",
+            "summary": "Prediksi risiko deadline",
+            "args": {"horizon_hours": 48},
+            "confidence": "high",
+            "natural_reply": "Aku cek dulu item yang paling berisiko telat.",
+        }
+
+    if _ASSIGNMENT_LIST.search(lower):
+        return {
+            "tool": "get_assignments",
+            "mode": "read",
+            "summary": "Lihat assignment",
+            "args": {"limit": 8, "pending_only": True},
+            "confidence": "high",
+            "natural_reply": "Siap, aku tampilkan assignment yang masih pending.",
+        }
+
+    if _TASK_LIST.search(lower):
+        return {
+            "tool": "get_tasks",
+            "mode": "read",
+            "summary": "Lihat task",
+            "args": {"limit": 8, "pending_only": True, "scope": "mine"},
+            "confidence": "high",
+            "natural_reply": "Oke, aku ambil task yang belum selesai.",
+        }
+
+    if re.search(r"(?:memory graph|graf|graph memory)", lower):
+        return {
+            "tool": "get_memory_graph",
+            "mode": "read",
+            "summary": "Lihat memory graph",
+            "args": {},
+            "confidence": "medium",
+            "natural_reply": "Aku buka memory graph terbaru biar konteksnya kebaca jelas.",
+        }
+
+    if re.search(r"(?:memory|snapshot|konteks|context)", lower):
+        return {
+            "tool": "get_unified_memory",
+            "mode": "read",
+            "summary": "Lihat memory snapshot",
+            "args": {},
+            "confidence": "medium",
+            "natural_reply": "Aku tarik snapshot konteks terpadu dulu.",
+        }
+
+    if re.search(r"(?:jadwal belajar|study plan|belajar besok|target belajar)", lower):
+        return {
+            "tool": "get_study_plan",
+            "mode": "read",
+            "summary": "Rencana belajar",
+            "args": {"target_minutes": 150},
+            "confidence": "medium",
+            "natural_reply": "Siap, aku susun plan belajar yang realistis dulu.",
+        }
+
+    if re.search(r"(?:ringkasan hari ini|brief|summary|hari ini)", lower):
+        return {
+            "tool": "get_daily_brief",
+            "mode": "read",
+            "summary": "Ringkasan hari ini",
+            "args": {"limit": 5},
+            "confidence": "high",
+            "natural_reply": "Oke, aku rangkum status terpenting hari ini.",
+        }
+
+    return None
+
+
+def _plan_intents(message="", user="", parsed=None):
+    """Ordered tool decisions for each step of a compound message, at most MAX_PLAN_STEPS.
+
+    A message without a verb-led step after a joiner plans exactly like _detect_intent.
+    ``parsed`` (see brain_decision) is only used for a step that is the whole message.
+    """
+    msg = str(message or "").strip()
+    chunks = []
+    pos = 0
+    for joiner in _STEP_JOINER.finditer(msg):
+        chunks.append((pos, joiner.start()))
+        pos = joiner.end()
+    chunks.append((pos, len(msg)))
+
+    spans = [list(chunks[0])]
+    found = None
+    for chunk_start, chunk_end in chunks[1:]:
+        chunk = msg[chunk_start:chunk_end]
+        # Every chunk is parsed at most once here, so long messages stay linear.
+        if _STEP_VERB.match(chunk) and _detect_intent(chunk, user):
+            if found is None:
+                found = _detect_intent(msg[spans[-1][0] : spans[-1][1]], user) is not None
+            if found:
+                if len(spans) >= MAX_PLAN_STEPS:
+                    break
+                spans.append([chunk_start, chunk_end])
+                continue
+            # Leading chatter ("halo, buat task ...") stays with the first step, as before.
+            found = True
+        spans[-1][1] = chunk_end
+
+    steps = []
+    for start, end in spans:
+        command = msg[start:end]
+        decision = _detect_intent(command, user, parsed)
+        if decision:
+            decision["command"] = command
+            steps.append(decision)
+    return steps
+
+
+class DecisionCache:
+    """Thread-safe LRU of planned steps, bucketed by local date.
+
+    Relative deadlines ("besok", "lusa") depend on today's date, so entries
+    only live for the date they were planned on; the first lookup on a new
+    date drops the old bucket. Cached steps are shared: callers must not
+    mutate them.
+    """
+
+    def __init__(self, max_items=512):
+        self.max_items = max(0, int(max_items))
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._date = ""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _bucket(self, date_key):
+        if date_key != self._date:
+            self._items.clear()
+            self._date = date_key
+
+    def get(self, date_key, message, user):
+        key = (message, user)
+        with self._lock:
+            self._bucket(date_key)
+            steps = self._items.get(key)
+            if steps is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return steps
+
+    def put(self, date_key, message, user, steps):
+        if self.max_items <= 0:
+            return
+        key = (message, user)
+        with self._lock:
+            self._bucket(date_key)
+            self._items[key] = steps
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "date": self._date,
+                "size": len(self._items),
+                "max_items": self.max_items,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _cache_size_from_env():
+    try:
+        size = int(str(os.getenv("ASSISTANT_BRAIN_DECISION_CACHE_SIZE") or "512").strip())
+    except ValueError:
+        size = 512
+    return max(0, min(20000, size))
+
+
+_DECISION_CACHE = DecisionCache(_cache_size_from_env())
+
+
+def _cached_plan(message="", user="", parsed=None):
+    """_plan_intents for a collapsed message, served from _DECISION_CACHE when it repeats today."""
+    date_key = datetime.now().date().isoformat()
+    steps = _DECISION_CACHE.get(date_key, message, user)
+    if steps is None:
+        steps = _plan_intents(message, user, parsed)
+        _DECISION_CACHE.put(date_key, message, user, steps)
+    return steps
+
+
+def decision_cache_stats():
+    return _DECISION_CACHE.stats()
+
+
+def brain_decision(message="", user="", parsed=None):
+    """Response body for one brain request; None when the message is empty.
+
+    ``parsed`` is the chat processor's ParsedMessage when the same message also
+    gets a chat reply (api/assistant_turn.py): its lowercase text and temporal
+    scan are used instead of parsing the message again.
+    """
+    message = _collapse_spaces(message)
+    user = _collapse_spaces(user)
+    if not message:
+        return None
+
+    planned = _cached_plan(message, user, parsed)
+    if not planned:
+        return {"ok": False, "reason": "no_intent", "engine": ENGINE}
+
+    allowed = [step for step in planned if str(step.get("tool", "")).strip() in ALLOWED_TOOLS]
+    if not allowed:
+        return {"ok": False, "reason": "tool_not_allowed", "engine": ENGINE}
+
+    # Planned steps may be cached, so ids go on copies. Top-level fields
+    # stay the first step's decision for single-tool clients.
+    steps = [{**step, "id": f"step_{index}"} for index, step in enumerate(allowed, start=1)]
+    decision = {key: value for key, value in steps[0].items() if key not in ("id", "command")}
+    decision["actions"] = steps
+    decision["requires_clarification"] = any(step["mode"] == "clarification_required" for step in steps)
+    decision["ok"] = True
+    decision["engine"] = ENGINE
+    return decision
@@ -0,0 +1,401 @@
+"""Embedding backends for the neural intent fallback."""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from operator import mul
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+# http.client, urllib.parse and NumPy load on first use: the rule-only path
+# and health checks never need the network stack or a matrix library.
+if TYPE_CHECKING:
+    import http.client
+
+
+LOCAL_EMBED_MODEL = "local-char-ngram-v1"
+LOCAL_EMBED_DIM = 512
+LOCAL_NGRAM_SIZES = (3, 4)
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1)
+def optional_numpy():
+    """Return the numpy module, or None; NumPy is optional and the serverless bundle stays dependency-free."""
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover - depends on the environment
+        return None
+    return numpy
+
+
+def _char_ngrams(text: str) -> list[str]:
+    grams: list[str] = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        padded = f" {word} "
+        for size in LOCAL_NGRAM_SIZES:
+            if len(padded) < size:
+                continue
+            grams.extend(padded[i:i + size] for i in range(len(padded) - size + 1))
+    return grams
+
+
+def _bucket(gram: str) -> tuple[int, float]:
+    # crc32 is stable across processes, unlike hash() under PYTHONHASHSEED.
+    digest = zlib.crc32(gram.encode("utf-8"))
+    return digest % LOCAL_EMBED_DIM, (1.0 if digest & 0x80000000 else -1.0)
+
+
+def normalize_vector(vec: Sequence[float]) -> list[float]:
+    if not vec:
+        return []
+    norm = math.hypot(*vec)
+    if norm <= 0.0 or not math.isfinite(norm):
+        return []
+    return [x / norm for x in vec]
+
+
+def mean_vector(rows: Sequence[Sequence[float]]) -> list[float]:
+    rows = [row for row in rows if row]
+    if not rows:
+        return []
+    dim = min(len(row) for row in rows)
+    np = optional_numpy()
+    if np is not None:
+        return np.asarray([row[:dim] for row in rows], dtype=np.float64).mean(axis=0).tolist()
+    count = len(rows)
+    return [math.fsum(column) / count for column in zip(*(row[:dim] for row in rows))]
+
+
+class CentroidMatrix:
+    """Intent centroids packed into one contiguous row-major block.
+
+    With NumPy the block is a float32 matrix and scoring is a single
+    matrix-vector product; without it the block is an ``array('f')`` and each
+    row is scored through a zero-copy memoryview slice.
+    """
+
+    def __init__(self, centroids: dict[str, Sequence[float]], use_numpy: bool | None = None) -> None:
+        rows = {name: vec for name, vec in centroids.items() if vec}
+        self.names: tuple[str, ...] = tuple(rows)
+        self.dim = min((len(vec) for vec in rows.values()), default=0)
+        np = optional_numpy() if use_numpy is None or use_numpy else None
+        self.uses_numpy = np is not None
+        if np is not None:
+            self._matrix = np.asarray([vec[:self.dim] for vec in rows.values()], dtype=np.float32).reshape(len(rows), self.dim)
+        else:
+            block = array("f")
+            for vec in rows.values():
+                block.extend(vec[:self.dim])
+            self._block = memoryview(block)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def scores(self, query: Sequence[float]) -> list[float]:
+        if not self.names or len(query) < self.dim:
+            return []
+        if self.uses_numpy:
+            np = optional_numpy()
+            return (self._matrix @ np.asarray(query[:self.dim], dtype=np.float32)).tolist()
+        dim = self.dim
+        return [sum(map(mul, self._block[i * dim:(i + 1) * dim], query)) for i in range(len(self.names))]
+
+    def top2(self, query: Sequence[float]) -> tuple[str, float, float]:
+        """Return (best intent, best score, second-best score) for a unit query vector."""
+        best_intent = ""
+        best_score = -1.0
+        second_score = -1.0
+        for name, score in zip(self.names, self.scores(query)):
+            if score > best_score:
+                second_score = best_score
+                best_score = score
+                best_intent = name
+            elif score > second_score:
+                second_score = score
+        return best_intent, best_score, second_score
+
+
+class LocalHashVectorizer:
+    """Hashed character n-gram TF-IDF vectors fitted on a small phrase corpus.
+
+    No network and no third-party packages: a short message embeds in well
+    under a millisecond, which makes it usable on every fallback message.
+    """
+
+    def __init__(self, corpus: Iterable[str]) -> None:
+        docs = [set(_char_ngrams(text)) for text in corpus]
+        doc_freq: dict[str, int] = {}
+        for grams in docs:
+            for gram in grams:
+                doc_freq[gram] = doc_freq.get(gram, 0) + 1
+        total = len(docs)
+        self.default_idf = math.log(1.0 + total) + 1.0
+        self.idf = {gram: math.log((1.0 + total) / (1.0 + freq)) + 1.0 for gram, freq in doc_freq.items()}
+
+    def embed(self, text: str) -> list[float]:
+        counts: dict[str, int] = {}
+        for gram in _char_ngrams(text):
+            counts[gram] = counts.get(gram, 0) + 1
+
+        vec = [0.0] * LOCAL_EMBED_DIM
+        for gram, count in counts.items():
+            index, sign = _bucket(gram)
+            vec[index] += sign * (1.0 + math.log(count)) * self.idf.get(gram, self.default_idf)
+        return vec
+
+    def embed_many(self, texts: Iterable[str]) -> list[list[float]]:
+        return [self.embed(text) for text in texts]
+
+
+def _stale_socket_errors() -> tuple[type[BaseException], ...]:
+    import http.client
+
+    return (
+        http.client.RemoteDisconnected,
+        http.client.BadStatusLine,
+        BrokenPipeError,
+        ConnectionResetError,
+        ConnectionAbortedError,
+    )
+
+
+class EmbeddingsClient:
+    """Keep-alive HTTP/1.1 client for one OpenAI-compatible API base.
+
+    Idle connections are pooled and reused across calls, so a warm worker
+    skips the TCP + TLS handshake. A reused socket the server already closed
+    is retried once on a fresh connection.
+    """
+
+    def __init__(self, api_base: str, max_idle: int = 4) -> None:
+        import urllib.parse
+
+        parsed = urllib.parse.urlsplit(api_base.rstrip("/"))
+        self.scheme = parsed.scheme or "https"
+        self.host = parsed.hostname or ""
+        self.port = parsed.port
+        self.path = f"{parsed.path}/v1/embeddings"
+        self.max_idle = max(0, int(max_idle))
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.calls = 0
+        self.connects = 0
+        self.reuses = 0
+        self.retries = 0
+        self.errors = 0
+
+    def _new_connection(self, timeout_s: float) -> http.client.HTTPConnection:
+        import http.client
+
+        if self.scheme == "http":
+            return http.client.HTTPConnection(self.host, self.port, timeout=timeout_s)
+        return http.client.HTTPSConnection(self.host, self.port, timeout=timeout_s)
+
+    def _checkout(self) -> http.client.HTTPConnection | None:
+        with self._lock:
+            return self._idle.pop() if self._idle else None
+
+    def _checkin(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _send(
+        self,
+        conn: http.client.HTTPConnection,
+        body: bytes,
+        headers: dict[str, str],
+        timeout_s: float,
+        timing: dict[str, object],
+    ) -> tuple[int, bytes, bool]:
+        if conn.sock is None:
+            started = time.perf_counter()
+            conn.connect()
+            timing["connect_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+            with self._lock:
+                self.connects += 1
+        else:
+            conn.sock.settimeout(timeout_s)
+        started = time.perf_counter()
+        conn.request("POST", self.path, body=body, headers=headers)
+        resp = conn.getresponse()
+        raw = resp.read()
+        timing["transfer_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+        return resp.status, raw, resp.will_close
+
+    def create(
+        self,
+        texts: list[str],
+        *,
+        api_key: str,
+        model: str,
+        timeout_s: float,
+    ) -> tuple[dict | None, dict[str, object]]:
+        """POST /v1/embeddings; return (decoded body or None, per-call timing)."""
+        body = json.dumps({"model": model, "input": texts}).encode("utf-8")
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}",
+            "Connection": "keep-alive",
+        }
+        timing: dict[str, object] = {"connect_ms": 0.0, "transfer_ms": 0.0, "reused": False, "retried": False}
+        self._local.timing = timing
+        with self._lock:
+            self.calls += 1
+
+        conn = self._checkout()
+        if conn is not None:
+            timing["reused"] = True
+            with self._lock:
+                self.reuses += 1
+        else:
+            conn = self._new_connection(timeout_s)
+
+        try:
+            try:
+                status, raw, will_close = self._send(conn, body, headers, timeout_s, timing)
+            except _stale_socket_errors():
+                if not timing["reused"]:
+                    raise
+                # The server dropped the idle socket; one fresh attempt is safe.
+                conn.close()
+                conn = self._new_connection(timeout_s)
+                timing["retried"] = True
+                with self._lock:
+                    self.retries += 1
+                status, raw, will_close = self._send(conn, body, headers, timeout_s, timing)
+        except Exception:
+            conn.close()
+            with self._lock:
+                self.errors += 1
+            return None, timing
+
+        if will_close:
+            conn.close()
+        else:
+            self._checkin(conn)
+
+        timing["status"] = status
+        if status != 200:
+            with self._lock:
+                self.errors += 1
+            return None, timing
+        try:
+            parsed = json.loads(raw.decode("utf-8"))
+        except Exception:
+            return None, timing
+        return (parsed if isinstance(parsed, dict) else None), timing
+
+    def last_timing(self) -> dict[str, object]:
+        """Timing of the most recent call made from the current thread."""
+        return dict(getattr(self._local, "timing", {}) or {})
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "connects": self.connects,
+                "reuses": self.reuses,
+                "retries": self.retries,
+                "errors": self.errors,
+                "idle": len(self._idle),
+            }
+
+
+_CLIENTS: dict[str, EmbeddingsClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_embeddings_client(api_base: str) -> EmbeddingsClient:
+    key = api_base.rstrip("/")
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = EmbeddingsClient(key)
+            _CLIENTS[key] = client
+        return client
+
+
+class EmbeddingCache:
+    """Thread-safe LRU cache of query vectors with a TTL and a hard size cap."""
+
+    def __init__(self, max_items: int = 512, ttl_s: float = 3600.0) -> None:
+        self.max_items = max(0, int(max_items))
+        self.ttl_s = max(0.0, float(ttl_s))
+        self._items: OrderedDict[tuple[str, str], tuple[float, list[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, model: str, text: str) -> list[float] | None:
+        key = (model, text)
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            stored_at, vec = item
+            if self.ttl_s and now - stored_at > self.ttl_s:
+                del self._items[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return vec
+
+    def contains(self, model: str, text: str) -> bool:
+        """Membership test that leaves LRU order and hit/miss counters untouched."""
+        with self._lock:
+            item = self._items.get((model, text))
+            return item is not None and not (self.ttl_s and time.monotonic() - item[0] > self.ttl_s)
+
+    def put(self, model: str, text: str, vec: list[float]) -> None:
+        if self.max_items <= 0 or not vec:
+            return
+        key = (model, text)
+        with self._lock:
+            self._items[key] = (time.monotonic(), vec)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_items": self.max_items,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -3,97 +3,145 @@
 from __future__ import annotations
 
 import json
-import math
 import os
 import re
 import threading
-import urllib.request
-from dataclasses import dataclass
-from typing import Iterable, Pattern
+from functools import lru_cache
+from typing import Iterable, Iterator, NamedTuple
+
+from chatbot.embeddings import (
+    LOCAL_EMBED_MODEL,
+    CentroidMatrix,
+    EmbeddingCache,
+    LocalHashVectorizer,
+    get_embeddings_client,
+    mean_vector,
+    normalize_vector,
+)
+from chatbot.lazy import AnyPattern, LazyPattern, SequencePattern
+from chatbot.timing import NULL_TIMER, StageTimer
 
 
-@dataclass(frozen=True)
-class IntentRule:
+class IntentRule(NamedTuple):
     name: str
-    pattern: Pattern[str]
+    pattern: LazyPattern | SequencePattern | AnyPattern
+    # Every group must share at least one token with the message before the
+    # pattern is worth running. Empty means the rule is always evaluated.
+    anchors: tuple[frozenset[str], ...] = ()
+
+
+def _compile(pattern: str) -> LazyPattern:
+    # Compiled on first search: a cold start that never classifies (health
+    # checks, the assistant brain) skips all rule compilation.
+    return LazyPattern(pattern, re.IGNORECASE)
+
 
+def _sequence(first: str, then: str) -> SequencePattern:
+    # ``first.*then`` without the quadratic backtracking (see chatbot.lazy).
+    return SequencePattern(first, then, re.IGNORECASE)
 
-def _compile(pattern: str) -> Pattern[str]:
-    return re.compile(pattern, re.IGNORECASE)
+
+def _anchors(*groups: str) -> tuple[frozenset[str], ...]:
+    return tuple(frozenset(group.split()) for group in groups)
+
+
+_CREATE_VERBS = "buat buatkan tambah tambahkan add create catat simpan"
 
 
 INTENT_RULES: tuple[IntentRule, ...] = (
     # Order matters: specific intents should be evaluated first.
     IntentRule(
         "create_assignment",
-        _compile(
-            r"(?:\b(buat|buatkan|tambah|add|create|catat|simpan)\b.*\b(assignment|tugas kuliah)\b)|"
-            r"(?:\b(tugas kuliah|assignment)\b.*\b(buat|tambahkan|catat|simpan)\b)"
+        AnyPattern(
+            _sequence(r"\b(buat|buatkan|tambah|add|create|catat|simpan)\b", r"\b(assignment|tugas kuliah)\b"),
+            _sequence(r"\b(tugas kuliah|assignment)\b", r"\b(buat|tambahkan|catat|simpan)\b"),
         ),
+        _anchors("assignment kuliah", _CREATE_VERBS),
     ),
     IntentRule(
         "create_task",
-        _compile(
-            r"(?:\b(buat|buatkan|tambah|add|create|catat|simpan)\b.*\b(task|tugas|todo|to-do)\b)|"
-            r"(?:\b(task|tugas|todo|to-do)\b.*\b(buat|tambahkan|catat|simpan)\b)"
+        AnyPattern(
+            _sequence(r"\b(buat|buatkan|tambah|add|create|catat|simpan)\b", r"\b(task|tugas|todo|to-do)\b"),
+            _sequence(r"\b(task|tugas|todo|to-do)\b", r"\b(buat|tambahkan|catat|simpan)\b"),
         ),
+        _anchors("task tugas todo do", _CREATE_VERBS),
     ),
     IntentRule(
         "set_reminder",
         _compile(
             r"\b(reminder|ingatkan|ingetin|notifikasi|alarm|jangan lupa)\b"
         ),
+        _anchors("reminder ingatkan ingetin notifikasi alarm jangan"),
     ),
     IntentRule(
         "daily_brief",
         _compile(
             r"\b(ringkasan hari ini|brief hari ini|summary hari ini|rekap hari ini|status hari ini|fokus hari ini)\b"
         ),
+        _anchors("ringkasan brief summary rekap status fokus", "hari"),
+    ),
+    IntentRule(
+        "toxic_motivation",
+        _compile(r"\b(toxic|mode tegas|gaspol|push keras|no excuse|no excuses)\b"),
+        _anchors("toxic tegas gaspol keras excuse excuses"),
     ),
-    IntentRule("toxic_motivation", _compile(r"\b(toxic|mode tegas|gaspol|push keras|no excuse|no excuses)\b")),
     IntentRule(
         "evaluation",
         _compile(r"\b(evaluasi|review|refleksi|retrospektif|daily review|weekly review)\b"),
+        _anchors("evaluasi review refleksi retrospektif"),
     ),
     IntentRule(
         "recommend_task",
         _compile(r"\b(rekomendasi|rekomendasi tugas|saran tugas|prioritas|task apa dulu|tugas apa dulu)\b"),
+        _anchors("rekomendasi saran prioritas dulu"),
     ),
     IntentRule(
         "study_schedule",
-        _compile(
-            r"(?:\b(jadwal belajar|study plan|rencana belajar|sesi belajar)\b.*\b(waktu kosong|jam kosong|slot kosong|free slot|free time|waktu luang)\b)|"
-            r"(?:\b(buat|buatkan|susun|atur|generate|carikan|rancang)\b.*\b(jadwal belajar|study plan|rencana belajar)\b)|"
-            r"(?:^(jadwal belajar|study plan)\b)"
+        AnyPattern(
+            _sequence(
+                r"\b(jadwal belajar|study plan|rencana belajar|sesi belajar)\b",
+                r"\b(waktu kosong|jam kosong|slot kosong|free slot|free time|waktu luang)\b",
+            ),
+            _sequence(r"\b(buat|buatkan|susun|atur|generate|carikan|rancang)\b", r"\b(jadwal belajar|study plan|rencana belajar)\b"),
+            _compile(r"^(jadwal belajar|study plan)\b"),
         ),
+        _anchors("belajar plan"),
     ),
     IntentRule(
         "affirmation",
         _compile(r"\b(oke|ok|siap|gas|lanjut|deal|sip|mantap|yuk)\b"),
+        _anchors("oke ok siap gas lanjut deal sip mantap yuk"),
     ),
     IntentRule(
         "check_daily_target",
-        _compile(
-            r"(?:\b(target|goal)\b.*\b(harian|hari ini|today|pasangan|bareng|bersama)\b)|"
-            r"(?:\bcek\b.*\b(target|goal)\b)|"
-            r"(?:\btarget\b.*\b(kita|pasangan)\b)"
+        AnyPattern(
+            _sequence(r"\b(target|goal)\b", r"\b(harian|hari ini|today|pasangan|bareng|bersama)\b"),
+            _sequence(r"\bcek\b", r"\b(target|goal)\b"),
+            _sequence(r"\btarget\b", r"\b(kita|pasangan)\b"),
         ),
+        _anchors("target goal"),
     ),
     IntentRule(
         "reminder_ack",
-        _compile(
-            r"(?:\b(reminder|alarm|notifikasi)\b.*\b(ok|oke|siap|aktif|jalan)\b)|"
-            r"(?:\b(ok|oke|siap|aktif|jalan)\b.*\b(reminder|alarm|notifikasi)\b)"
+        AnyPattern(
+            _sequence(r"\b(reminder|alarm|notifikasi)\b", r"\b(ok|oke|siap|aktif|jalan)\b"),
+            _sequence(r"\b(ok|oke|siap|aktif|jalan)\b", r"\b(reminder|alarm|notifikasi)\b"),
         ),
+        _anchors("reminder alarm notifikasi", "ok oke siap aktif jalan"),
     ),
     IntentRule(
         "checkin_progress",
-        _compile(
-            r"(?:\b(check-?in|cek in|update)\b.*\b(progress|progres|tugas|belajar|goal|target)\b)|"
-            r"(?:\b(progress|progres)\b.*\b(hari ini|today|kita|pasangan)\b)"
+        AnyPattern(
+            _sequence(r"\b(check-?in|cek in|update)\b", r"\b(progress|progres|tugas|belajar|goal|target)\b"),
+            _sequence(r"\b(progress|progres)\b", r"\b(hari ini|today|kita|pasangan)\b"),
         ),
+        _anchors("check checkin cek update progress progres", "progress progres tugas belajar goal target hari today kita pasangan"),
+    ),
+    IntentRule(
+        "greeting",
+        _compile(r"\b(halo|hai|hi|hello|hey)\b"),
+        _anchors("halo hai hi hello hey"),
     ),
-    IntentRule("greeting", _compile(r"\b(halo|hai|hi|hello|hey)\b")),
 )
 
 
@@ -167,13 +215,73 @@ INTENT_PROTOTYPES: dict[str, tuple[str, ...]] = {
 
 
 _NEURAL_CENTROID_CACHE: dict[str, dict[str, list[float]]] = {}
+_NEURAL_MATRIX_CACHE: dict[str, CentroidMatrix] = {}
 _NEURAL_CACHE_LOCK = threading.Lock()
+_CENTROID_FILE_LOCK = threading.Lock()
+_PERSISTED_CENTROIDS_LOADED = False
+_LOCAL_VECTORIZER: LocalHashVectorizer | None = None
+
+CENTROID_FILE_VERSION = 1
+BUNDLED_CENTROID_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_centroids.json")
 
 
 def normalize_message(text: str) -> str:
     return re.sub(r"\s{2,}", " ", str(text or "").strip())
 
 
+_TOKEN_PATTERN = re.compile(r"\w+")
+# Non-ASCII characters that re.IGNORECASE treats as equal to an ASCII letter
+# but that str.lower() keeps distinct (U+212A KELVIN SIGN already lowers to "k").
+_IGNORECASE_FOLD = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s"})
+
+
+def message_tokens(text: str) -> frozenset[str]:
+    lower = text.lower() if text.isascii() else text.translate(_IGNORECASE_FOLD).lower()
+    return frozenset(_TOKEN_PATTERN.findall(lower))
+
+
+class RuleEngine:
+    """Ordered rule matcher that skips rules whose anchor keywords are absent.
+
+    The message is tokenized once; a rule's regex only runs when each of its
+    anchor groups is present, so the first match is the same as a plain loop.
+    """
+
+    def __init__(self, rules: Iterable[IntentRule]) -> None:
+        self.rules: tuple[IntentRule, ...] = tuple(rules)
+
+    def candidates(self, text: str) -> Iterator[IntentRule]:
+        tokens = message_tokens(text)
+        for rule in self.rules:
+            if all(not group.isdisjoint(tokens) for group in rule.anchors):
+                yield rule
+
+    def first_match(self, text: str) -> str | None:
+        for rule in self.candidates(text):
+            if rule.pattern.search(text):
+                return rule.name
+        return None
+
+    def all_matches(self, text: str) -> list[str]:
+        return [rule.name for rule in self.candidates(text) if rule.pattern.search(text)]
+
+
+DEFAULT_RULE_ENGINE = RuleEngine(INTENT_RULES)
+
+
+def warm_intent_rules(rules: Iterable[IntentRule] = INTENT_RULES) -> int:
+    """Compile every rule pattern up front (long-lived workers); returns how many regexes."""
+    return sum(rule.pattern.warm() for rule in rules)
+
+
+def match_all_intents(message: str, rules: Iterable[IntentRule] = INTENT_RULES) -> list[str]:
+    text = normalize_message(message)
+    if not text:
+        return []
+    engine = DEFAULT_RULE_ENGINE if rules is INTENT_RULES else RuleEngine(rules)
+    return engine.all_matches(text)
+
+
 def _to_float(value: str, default: float) -> float:
     try:
         return float(value)
@@ -181,23 +289,46 @@ def _to_float(value: str, default: float) -> float:
         return default
 
 
+_QUERY_EMBEDDING_CACHE = EmbeddingCache(
+    max_items=max(0, min(20000, int(_to_float(str(os.getenv("CHATBOT_NEURAL_QUERY_CACHE_SIZE") or "512"), 512)))),
+    ttl_s=max(0.0, min(86400.0, _to_float(str(os.getenv("CHATBOT_NEURAL_QUERY_CACHE_TTL_S") or "3600"), 3600.0))),
+)
+
+
+def query_embedding_cache_stats() -> dict[str, int | float]:
+    return _QUERY_EMBEDDING_CACHE.stats()
+
+
 def _neural_config() -> dict[str, object]:
     api_key = str(os.getenv("CHATBOT_LLM_API_KEY") or os.getenv("OPENAI_API_KEY") or "").strip()
+    backend = str(os.getenv("CHATBOT_NEURAL_BACKEND") or "remote").strip().lower()
+    if backend not in {"remote", "local"}:
+        backend = "remote"
+    # The local backend needs no credentials, so it is usable without an API key.
+    available = backend == "local" or bool(api_key)
     raw_enabled = str(os.getenv("CHATBOT_NEURAL_INTENT_ENABLED") or "").strip().lower()
     if raw_enabled in {"1", "true", "yes", "on"}:
-        enabled = bool(api_key)
+        enabled = available
     elif raw_enabled in {"0", "false", "no", "off"}:
         enabled = False
     else:
-        enabled = bool(api_key)
+        enabled = available
 
     api_base = str(os.getenv("CHATBOT_NEURAL_API_BASE") or os.getenv("OPENAI_API_BASE") or "https://api.openai.com").strip()
-    model = str(os.getenv("CHATBOT_NEURAL_EMBED_MODEL") or "text-embedding-3-small").strip()
+    if backend == "local":
+        api_base = "local"
+        model = LOCAL_EMBED_MODEL
+        # Sparse n-gram cosines run much lower than dense embedding cosines.
+        default_threshold, min_threshold = 0.28, 0.2
+    else:
+        model = str(os.getenv("CHATBOT_NEURAL_EMBED_MODEL") or "text-embedding-3-small").strip()
+        default_threshold, min_threshold = 0.76, 0.55
     timeout_s = max(0.3, min(3.0, _to_float(str(os.getenv("CHATBOT_NEURAL_TIMEOUT_S") or "0.9"), 0.9)))
-    threshold = max(0.55, min(0.92, _to_float(str(os.getenv("CHATBOT_NEURAL_INTENT_THRESHOLD") or "0.76"), 0.76)))
+    threshold = max(min_threshold, min(0.92, _to_float(str(os.getenv("CHATBOT_NEURAL_INTENT_THRESHOLD") or default_threshold), default_threshold)))
     margin = max(0.0, min(0.2, _to_float(str(os.getenv("CHATBOT_NEURAL_INTENT_MARGIN") or "0.02"), 0.02)))
     return {
         "enabled": enabled,
+        "backend": backend,
         "api_key": api_key,
         "api_base": api_base,
         "model": model,
@@ -217,21 +348,13 @@ def _request_embeddings(
 ) -> list[list[float]] | None:
     if not texts:
         return None
-    url = f"{api_base.rstrip('/')}/v1/embeddings"
-    payload = json.dumps({"model": model, "input": texts}).encode("utf-8")
-    req = urllib.request.Request(
-        url=url,
-        data=payload,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-        method="POST",
+    body, _timing = get_embeddings_client(api_base).create(
+        texts,
+        api_key=api_key,
+        model=model,
+        timeout_s=timeout_s,
     )
-    try:
-        with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-            body = json.loads(resp.read().decode("utf-8"))
-    except Exception:
+    if body is None:
         return None
 
     rows = body.get("data")
@@ -260,32 +383,41 @@ def _request_embeddings(
     return [item or [] for item in out]
 
 
-def _normalize_vector(vec: list[float]) -> list[float]:
-    if not vec:
-        return []
-    norm = math.sqrt(sum(x * x for x in vec))
-    if norm <= 0.0:
-        return []
-    return [x / norm for x in vec]
-
+def _local_vectorizer() -> LocalHashVectorizer:
+    global _LOCAL_VECTORIZER
+    with _NEURAL_CACHE_LOCK:
+        if _LOCAL_VECTORIZER is None:
+            _LOCAL_VECTORIZER = LocalHashVectorizer(
+                normalize_message(sample) for samples in INTENT_PROTOTYPES.values() for sample in samples
+            )
+        return _LOCAL_VECTORIZER
 
-def _cosine_similarity(a: list[float], b: list[float]) -> float:
-    if not a or not b:
-        return -1.0
-    n = min(len(a), len(b))
-    if n <= 0:
-        return -1.0
-    return sum(a[i] * b[i] for i in range(n))
 
+def _embed_texts(texts: list[str], config: dict[str, object]) -> list[list[float]] | None:
+    if not texts:
+        return None
+    if config.get("backend") == "local":
+        return _local_vectorizer().embed_many(texts)
 
-def _build_intent_centroids(config: dict[str, object]) -> dict[str, list[float]] | None:
     api_key = str(config.get("api_key") or "")
     api_base = str(config.get("api_base") or "")
     model = str(config.get("model") or "")
-    timeout_s = float(config.get("timeout_s") or 0.9)
     if not api_key or not api_base or not model:
         return None
+    return _request_embeddings(
+        texts,
+        api_key=api_key,
+        api_base=api_base,
+        model=model,
+        timeout_s=float(config.get("timeout_s") or 0.9),
+    )
+
 
+def _normalize_vector(vec: list[float]) -> list[float]:
+    return normalize_vector(vec)
+
+
+def _build_intent_centroids(config: dict[str, object]) -> dict[str, list[float]] | None:
     phrases: list[str] = []
     owners: list[str] = []
     for intent_name, samples in INTENT_PROTOTYPES.items():
@@ -298,13 +430,7 @@ def _build_intent_centroids(config: dict[str, object]) -> dict[str, list[float]]
     if not phrases:
         return None
 
-    vectors = _request_embeddings(
-        phrases,
-        api_key=api_key,
-        api_base=api_base,
-        model=model,
-        timeout_s=timeout_s,
-    )
+    vectors = _embed_texts(phrases, config)
     if not vectors or len(vectors) != len(phrases):
         return None
 
@@ -316,26 +442,132 @@ def _build_intent_centroids(config: dict[str, object]) -> dict[str, list[float]]
 
     centroids: dict[str, list[float]] = {}
     for intent_name, bucket in grouped.items():
-        if not bucket:
-            continue
-        dim = min(len(vec) for vec in bucket if vec)
-        if dim <= 0:
-            continue
-        summed = [0.0] * dim
-        for vec in bucket:
-            for i in range(dim):
-                summed[i] += vec[i]
-        avg = [value / len(bucket) for value in summed]
-        norm = _normalize_vector(avg)
+        norm = _normalize_vector(mean_vector(bucket))
         if norm:
             centroids[intent_name] = norm
     return centroids or None
 
 
+@lru_cache(maxsize=1)
+def prototype_fingerprint() -> str:
+    payload = json.dumps(
+        {name: [normalize_message(sample) for sample in samples] for name, samples in INTENT_PROTOTYPES.items()},
+        sort_keys=True,
+        ensure_ascii=True,
+    )
+    import hashlib
+
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _centroid_cache_key(api_base: str, model: str) -> str:
+    return f"{api_base.rstrip('/')}|{model}|{prototype_fingerprint()}"
+
+
+def _centroid_file_paths() -> tuple[str, str]:
+    """Return the (read, write) centroid file paths."""
+    explicit = str(os.getenv("CHATBOT_NEURAL_CENTROID_FILE") or "").strip()
+    if explicit:
+        return explicit, explicit
+    import tempfile
+
+    # Serverless bundles are read-only, so runtime rebuilds land in the temp dir.
+    return BUNDLED_CENTROID_FILE, os.path.join(tempfile.gettempdir(), "itg_intent_centroids.json")
+
+
+def _read_centroid_file(path: str) -> dict[str, dict[str, list[float]]]:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            body = json.load(fh)
+    except Exception:
+        return {}
+    if not isinstance(body, dict) or body.get("version") != CENTROID_FILE_VERSION:
+        return {}
+    entries = body.get("entries")
+    if not isinstance(entries, dict):
+        return {}
+
+    out: dict[str, dict[str, list[float]]] = {}
+    for key, centroids in entries.items():
+        if not isinstance(key, str) or not isinstance(centroids, dict):
+            continue
+        clean: dict[str, list[float]] = {}
+        for intent_name, vec in centroids.items():
+            if intent_name in INTENT_PROTOTYPES and isinstance(vec, list) and vec:
+                clean[intent_name] = [float(x) for x in vec]
+        if clean:
+            out[key] = clean
+    return out
+
+
+def write_centroid_file(path: str, entries: dict[str, dict[str, list[float]]]) -> None:
+    body = {
+        "version": CENTROID_FILE_VERSION,
+        "entries": {
+            key: {name: [round(x, 6) for x in vec] for name, vec in centroids.items()}
+            for key, centroids in entries.items()
+        },
+    }
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".centroids-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(body, fh, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_persisted_centroids() -> int:
+    """Warm the in-process cache from centroid files whose prototype hash still matches."""
+    fingerprint = prototype_fingerprint()
+    loaded: dict[str, dict[str, list[float]]] = {}
+    for path in dict.fromkeys(_centroid_file_paths()):
+        for key, centroids in _read_centroid_file(path).items():
+            if key.rsplit("|", 1)[-1] == fingerprint:
+                loaded.setdefault(key, centroids)
+    if loaded:
+        with _NEURAL_CACHE_LOCK:
+            for key, centroids in loaded.items():
+                _NEURAL_CENTROID_CACHE.setdefault(key, centroids)
+    return len(loaded)
+
+
+def _ensure_persisted_centroids() -> None:
+    # Centroid files are read on the first neural lookup, not at import.
+    global _PERSISTED_CENTROIDS_LOADED
+    if _PERSISTED_CENTROIDS_LOADED:
+        return
+    with _CENTROID_FILE_LOCK:
+        if not _PERSISTED_CENTROIDS_LOADED:
+            load_persisted_centroids()
+            _PERSISTED_CENTROIDS_LOADED = True
+
+
+def _persist_centroids(cache_key: str, centroids: dict[str, list[float]]) -> None:
+    _, path = _centroid_file_paths()
+    prefix = cache_key.rsplit("|", 1)[0] + "|"
+    # Entries for the same base + model with an older prototype hash are stale.
+    entries = {key: value for key, value in _read_centroid_file(path).items() if not key.startswith(prefix)}
+    entries[cache_key] = centroids
+    try:
+        write_centroid_file(path, entries)
+    except Exception:
+        return
+
+
 def _get_intent_centroids(config: dict[str, object]) -> dict[str, list[float]] | None:
     model = str(config.get("model") or "")
     api_base = str(config.get("api_base") or "")
-    cache_key = f"{api_base}|{model}"
+    cache_key = _centroid_cache_key(api_base, model)
+    _ensure_persisted_centroids()
     with _NEURAL_CACHE_LOCK:
         cached = _NEURAL_CENTROID_CACHE.get(cache_key)
     if cached:
@@ -346,45 +578,54 @@ def _get_intent_centroids(config: dict[str, object]) -> dict[str, list[float]] |
         return None
     with _NEURAL_CACHE_LOCK:
         _NEURAL_CENTROID_CACHE[cache_key] = built
+    if config.get("backend") != "local":
+        # Local centroids rebuild in microseconds; only remote ones are worth a file.
+        _persist_centroids(cache_key, built)
     return built
 
 
-def _detect_intent_neural(text: str) -> str | None:
-    config = _neural_config()
-    if not bool(config.get("enabled")):
-        return None
-    if len(text) < 8:
-        return None
+def _get_centroid_matrix(config: dict[str, object]) -> CentroidMatrix | None:
+    cache_key = _centroid_cache_key(str(config.get("api_base") or ""), str(config.get("model") or ""))
+    with _NEURAL_CACHE_LOCK:
+        matrix = _NEURAL_MATRIX_CACHE.get(cache_key)
+    if matrix is not None:
+        return matrix
 
     centroids = _get_intent_centroids(config)
     if not centroids:
         return None
+    matrix = CentroidMatrix(centroids)
+    if not len(matrix):
+        return None
+    with _NEURAL_CACHE_LOCK:
+        _NEURAL_MATRIX_CACHE[cache_key] = matrix
+    return matrix
 
-    vector_rows = _request_embeddings(
-        [text],
-        api_key=str(config.get("api_key") or ""),
-        api_base=str(config.get("api_base") or ""),
-        model=str(config.get("model") or ""),
-        timeout_s=float(config.get("timeout_s") or 0.9),
-    )
-    if not vector_rows or not vector_rows[0]:
+
+def _detect_intent_neural(text: str) -> str | None:
+    config = _neural_config()
+    if not bool(config.get("enabled")):
         return None
-    query_vec = _normalize_vector(vector_rows[0])
-    if not query_vec:
+    if len(text) < 8:
         return None
 
-    best_intent = ""
-    best_score = -1.0
-    second_score = -1.0
-    for intent_name, centroid in centroids.items():
-        score = _cosine_similarity(query_vec, centroid)
-        if score > best_score:
-            second_score = best_score
-            best_score = score
-            best_intent = intent_name
-        elif score > second_score:
-            second_score = score
+    matrix = _get_centroid_matrix(config)
+    if matrix is None:
+        return None
 
+    model = str(config.get("model") or "")
+    cache_text = text.lower()
+    query_vec = _QUERY_EMBEDDING_CACHE.get(model, cache_text)
+    if query_vec is None:
+        vector_rows = _embed_texts([text], config)
+        if not vector_rows or not vector_rows[0]:
+            return None
+        query_vec = _normalize_vector(vector_rows[0])
+        if not query_vec:
+            return None
+        _QUERY_EMBEDDING_CACHE.put(model, cache_text, query_vec)
+
+    best_intent, best_score, second_score = matrix.top2(query_vec)
     threshold = float(config.get("threshold") or 0.76)
     margin = float(config.get("margin") or 0.02)
     if best_intent and best_score >= threshold and (best_score - second_score) >= margin:
@@ -392,16 +633,54 @@ def _detect_intent_neural(text: str) -> str | None:
     return None
 
 
-def detect_intent(message: str, rules: Iterable[IntentRule] = INTENT_RULES) -> str:
+def prefetch_neural_embeddings(messages: Iterable[str]) -> int:
+    """Embed every rule-miss message in one backend call and warm the query cache.
+
+    Used by batch classification so N fallbacks share one embeddings request.
+    Returns the number of vectors fetched.
+    """
+    config = _neural_config()
+    if not bool(config.get("enabled")):
+        return 0
+
+    model = str(config.get("model") or "")
+    pending: dict[str, str] = {}
+    for message in messages:
+        text = normalize_message(message)
+        if len(text) < 8 or DEFAULT_RULE_ENGINE.first_match(text):
+            continue
+        cache_text = text.lower()
+        if cache_text in pending or _QUERY_EMBEDDING_CACHE.contains(model, cache_text):
+            continue
+        pending[cache_text] = text
+    if not pending or _get_centroid_matrix(config) is None:
+        return 0
+
+    vector_rows = _embed_texts(list(pending.values()), config)
+    if not vector_rows or len(vector_rows) != len(pending):
+        return 0
+    fetched = 0
+    for cache_text, vec in zip(pending, vector_rows):
+        query_vec = _normalize_vector(vec)
+        if query_vec:
+            _QUERY_EMBEDDING_CACHE.put(model, cache_text, query_vec)
+            fetched += 1
+    return fetched
+
+
+def detect_intent(message: str, rules: Iterable[IntentRule] = INTENT_RULES, timer: StageTimer = NULL_TIMER) -> str:
     text = normalize_message(message)
     if not text:
         return "fallback"
 
-    for rule in rules:
-        if rule.pattern.search(text):
-            return rule.name
+    engine = DEFAULT_RULE_ENGINE if rules is INTENT_RULES else RuleEngine(rules)
+    matched = engine.first_match(text)
+    timer.lap("rules")
+    if matched:
+        return matched
 
     neural_guess = _detect_intent_neural(text)
+    timer.lap("neural")
     if neural_guess:
         return neural_guess
     return "fallback"
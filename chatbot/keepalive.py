@@ -0,0 +1,78 @@
+"""HTTP/1.1 persistent connections for the api/*.py handler classes."""
+
+from __future__ import annotations
+
+import os
+from http.server import BaseHTTPRequestHandler
+
+DEFAULT_IDLE_TIMEOUT_S = 15.0
+# Unread bodies up to this size are read and dropped so the connection can be
+# reused; anything larger closes the connection instead.
+MAX_DRAIN_BYTES = 1024 * 1024
+_DRAIN_CHUNK_BYTES = 64 * 1024
+
+
+def _idle_timeout_s() -> float:
+    try:
+        value = float(str(os.getenv("CHATBOT_HTTP_IDLE_TIMEOUT_S", "")).strip() or DEFAULT_IDLE_TIMEOUT_S)
+    except ValueError:
+        return DEFAULT_IDLE_TIMEOUT_S
+    return value if value > 0 else DEFAULT_IDLE_TIMEOUT_S
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """BaseHTTPRequestHandler that keeps HTTP/1.1 connections open between requests.
+
+    Responses must carry an exact Content-Length, and every request body must
+    be consumed (read, or dropped with discard_body) before responding;
+    otherwise the leftover bytes would be parsed as the next request. A body
+    that cannot be framed (bad Content-Length, Transfer-Encoding) or is too
+    large to drain closes the connection. ``timeout`` bounds both the wait for
+    the next request and slow body reads; BaseHTTPRequestHandler closes the
+    connection when it expires.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = _idle_timeout_s()
+    # Headers and body go out as two writes; with Nagle on, the body waits for
+    # the client's delayed ACK (~40 ms) on every reused connection.
+    disable_nagle_algorithm = True
+
+    def body_length(self) -> int:
+        """Declared request body length; 0 (and close after responding) if it cannot be trusted."""
+        if self.headers.get("Transfer-Encoding"):
+            self.close_connection = True
+            return 0
+        raw_length = str(self.headers.get("Content-Length", "0")).strip() or "0"
+        try:
+            length = int(raw_length)
+        except ValueError:
+            self.close_connection = True
+            return 0
+        if length < 0:
+            self.close_connection = True
+            return 0
+        return length
+
+    def read_body(self, length: int) -> bytes:
+        raw = self.rfile.read(length) if length > 0 else b""
+        if len(raw) < length:
+            self.close_connection = True
+        return raw
+
+    def discard_body(self, length: int | None = None) -> None:
+        """Drop an unread request body before an early response (404, 401, 413)."""
+        remaining = self.body_length() if length is None else length
+        if remaining > MAX_DRAIN_BYTES:
+            self.close_connection = True
+            return
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, _DRAIN_CHUNK_BYTES))
+            if not chunk:
+                self.close_connection = True
+                return
+            remaining -= len(chunk)
+
+    def send_connection_header(self) -> None:
+        if getattr(self, "close_connection", False):
+            self.send_header("Connection", "close")
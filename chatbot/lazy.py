@@ -0,0 +1,146 @@
+"""Deferred regex compilation, so importing a module stays cheap on cold start.
+
+Also the linear-time replacements for ``first.*then`` and ``keyword.*$``
+patterns. Python's re backtracks, so ``first.*then`` retries ``.*then`` from
+every match of ``first`` and is quadratic when ``first`` repeats without a
+``then`` after it. Every pattern given to these helpers must itself be free
+of nested or adjacent unbounded repeats.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterator
+
+
+class LazyPattern:
+    """``re.compile`` deferred to first use; exposes the Pattern methods the chatbot uses.
+
+    Compiling twice under a race is harmless: both threads get an equal
+    pattern and one of them is kept.
+    """
+
+    __slots__ = ("pattern", "flags", "_compiled")
+
+    def __init__(self, pattern: str, flags: int = 0) -> None:
+        self.pattern = pattern
+        self.flags = flags
+        self._compiled: re.Pattern[str] | None = None
+
+    @property
+    def compiled(self) -> re.Pattern[str]:
+        compiled = self._compiled
+        if compiled is None:
+            compiled = self._compiled = re.compile(self.pattern, self.flags)
+        return compiled
+
+    def search(self, string: str, *args: int) -> re.Match[str] | None:
+        return self.compiled.search(string, *args)
+
+    def match(self, string: str, *args: int) -> re.Match[str] | None:
+        return self.compiled.match(string, *args)
+
+    def fullmatch(self, string: str, *args: int) -> re.Match[str] | None:
+        return self.compiled.fullmatch(string, *args)
+
+    def finditer(self, string: str, *args: int) -> Iterator[re.Match[str]]:
+        return self.compiled.finditer(string, *args)
+
+    def findall(self, string: str, *args: int) -> list:
+        return self.compiled.findall(string, *args)
+
+    def sub(self, repl, string: str, count: int = 0) -> str:
+        return self.compiled.sub(repl, string, count)
+
+    def split(self, string: str, maxsplit: int = 0) -> list[str]:
+        return self.compiled.split(string, maxsplit)
+
+    def warm(self) -> int:
+        """Compile now rather than on first use; returns the number of regexes."""
+        self.compiled
+        return 1
+
+    def __repr__(self) -> str:
+        return f"LazyPattern({self.pattern!r}, {self.flags!r})"
+
+
+class SequencePattern:
+    """``first.*then`` in linear time: ``first``, then ``then`` later on the same line.
+
+    Each line is scanned at most once for ``first`` and once for ``then``:
+    ``then`` is only looked for after the leftmost ``first`` of a line, since
+    a later ``first`` can only see a shorter tail. Like ``.``, the gap never
+    spans a newline. ``search`` returns the last ``then`` match after
+    ``first`` (what a greedy ``.*`` would keep), so its groups are those of
+    ``then``.
+    """
+
+    __slots__ = ("first", "then")
+
+    def __init__(self, first: str, then: str, flags: int = 0) -> None:
+        self.first = LazyPattern(first, flags)
+        self.then = LazyPattern(then, flags)
+
+    def search(self, string: str) -> re.Match[str] | None:
+        pos = 0
+        while True:
+            head = self.first.search(string, pos)
+            if head is None:
+                return None
+            line_end = string.find("\n", head.end())
+            if line_end < 0:
+                line_end = len(string)
+            tail = None
+            for tail in self.then.finditer(string, head.end(), line_end):
+                pass
+            if tail is not None:
+                return tail
+            if line_end >= len(string):
+                return None
+            pos = line_end + 1
+
+    def warm(self) -> int:
+        return self.first.warm() + self.then.warm()
+
+    def __repr__(self) -> str:
+        return f"SequencePattern({self.first.pattern!r}, {self.then.pattern!r}, {self.first.flags!r})"
+
+
+class AnyPattern:
+    """An alternation of patterns, searched one after another.
+
+    Truthiness matches the single regex; the match returned is the first
+    pattern's that matches, not necessarily the leftmost in the string.
+    """
+
+    __slots__ = ("patterns",)
+
+    def __init__(self, *patterns: LazyPattern | SequencePattern) -> None:
+        self.patterns = patterns
+
+    def search(self, string: str) -> re.Match[str] | None:
+        for pattern in self.patterns:
+            match = pattern.search(string)
+            if match is not None:
+                return match
+        return None
+
+    def warm(self) -> int:
+        return sum(pattern.warm() for pattern in self.patterns)
+
+    def __repr__(self) -> str:
+        return f"AnyPattern{self.patterns!r}"
+
+
+def cut_tail(keyword: LazyPattern, string: str) -> str:
+    """``re.sub(keyword + ".*$", "", string)`` in linear time.
+
+    ``.*$`` without MULTILINE can only end at the end of the string (or
+    before a final newline), so only the leftmost ``keyword`` on the last
+    line can start the match. ``keyword`` must not match a newline.
+    """
+    end = len(string) - 1 if string.endswith("\n") else len(string)
+    match = keyword.search(string, string.rfind("\n", 0, end) + 1, end)
+    if match is None:
+        return string
+    return string[: match.start()] + string[end:]
@@ -2,29 +2,28 @@
 
 from __future__ import annotations
 
+import itertools
 import re
-from typing import Any, TypedDict
+import zlib
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Iterator, Mapping, NamedTuple, TypedDict
 
-from chatbot.intents import detect_intent, normalize_message
+from chatbot.intents import DEFAULT_RULE_ENGINE, detect_intent, normalize_message, prefetch_neural_embeddings
+from chatbot.lazy import LazyPattern, cut_tail
 from chatbot.responses import pick_response
+from chatbot.sessions import SessionState, SessionStore, default_session_store, valid_session_id
+from chatbot.temporal import TemporalScan, scan_temporal
+from chatbot.timing import NULL_TIMER, StageTimer
 
 
 MAX_MESSAGE_LEN = 600
 MAX_REPLY_LEN = 420
 MAX_SUGGESTIONS = 4
 MAX_PLAN_ACTIONS = 5
+MAX_PLAN_SEGMENTS = 16
 MAX_HISTORY_ITEMS = 8
-MONTH_WORD_PATTERN = (
-    r"(?:jan(?:uari)?|january|"
-    r"feb(?:ruari|ruary)?|febuari|pebruari|"
-    r"mar(?:et|ch)?|apr(?:il)?|mei|may|"
-    r"jun(?:i|e)?|jul(?:i|y)?|"
-    r"agu(?:stus)?|ags|agt|aug(?:ust)?|"
-    r"sep(?:t(?:ember)?)?|"
-    r"okt(?:ober)?|oct(?:ober)?|"
-    r"nov(?:ember)?|"
-    r"des(?:ember)?|dec(?:ember)?)"
-)
+MAX_BATCH_ITEMS = 32
 
 
 class QuickSuggestion(TypedDict):
@@ -48,6 +47,7 @@ class PlannerStep(TypedDict):
     status: str
     command: str
     missing: list[str]
+    segment_hash: str  # _segment_hash(command) when the step was last checked
 
 
 class PlannerFrame(TypedDict):
@@ -58,6 +58,7 @@ class PlannerFrame(TypedDict):
     actions: list[PlannerStep]
     summary: str
     next_best_action: str
+    segments: list[str]  # hashes of every segment already planned, oldest first
 
 
 class MemoryUpdate(TypedDict):
@@ -208,51 +209,86 @@ def _normalize_memory_hint(raw: Any) -> dict[str, Any]:
 
 
 def _has_deadline_signal(text: str) -> bool:
-    return bool(
-        re.search(
-            rf"("
-            rf"\bdeadline\b|\bdue\b|\btanggal\b|"
-            rf"\bbesok\b|\blusa\b|\bhari ini\b|\btoday\b|"
-            rf"\d{{1,2}}:\d{{2}}|\d{{4}}-\d{{2}}-\d{{2}}|"
-            rf"\d{{1,2}}[\/.-]\d{{1,2}}(?:[\/.-]\d{{2,4}})?|"
-            rf"(?:tanggal\s*)?\d{{1,2}}\s*(?:[\/.,-]\s*)?{MONTH_WORD_PATTERN}\b|"
-            rf"{MONTH_WORD_PATTERN}\s+\d{{1,2}}\b"
-            rf")",
-            text,
-            flags=re.IGNORECASE,
-        )
-    )
+    return scan_temporal(text).has_deadline_signal
 
 
 def _extract_time_or_deadline_fragment(text: str) -> str:
-    source = str(text or "")
-    iso = re.search(r"\b(\d{4}-\d{2}-\d{2}(?:\s+\d{1,2}:\d{2})?)\b", source)
-    if iso:
-        return iso.group(1).strip()
-    natural_day_month = re.search(
-        rf"\b((?:tanggal\s*)?\d{{1,2}}\s*(?:[\/.,-]\s*)?{MONTH_WORD_PATTERN}(?:\s+\d{{4}})?)\b",
-        source,
-        flags=re.IGNORECASE,
-    )
-    if natural_day_month:
-        return natural_day_month.group(1).strip()
-    natural_month_day = re.search(
-        rf"\b({MONTH_WORD_PATTERN}\s+\d{{1,2}}(?:\s+\d{{4}})?)\b",
-        source,
-        flags=re.IGNORECASE,
-    )
-    if natural_month_day:
-        return natural_month_day.group(1).strip()
-    dmy = re.search(r"\b(\d{1,2}[\/.-]\d{1,2}(?:[\/.-]\d{2,4})?)\b", source)
-    if dmy:
-        return dmy.group(1).strip()
-    rel = re.search(r"\b(hari ini|today|besok|tomorrow|lusa|day after tomorrow)(?:\s+\d{1,2}:\d{2})?\b", source, flags=re.IGNORECASE)
-    if rel:
-        return rel.group(0).strip()
-    hhmm = re.search(r"\b(\d{1,2}:\d{2})\b", source)
-    if hhmm:
-        return hhmm.group(1).strip()
-    return ""
+    return scan_temporal(str(text or "")).fragment
+
+
+_DOMAIN_KULIAH_WORDS = frozenset({"kuliah", "assignment", "deadline", "ipk", "makalah", "quiz", "ujian"})
+# "jadwal belajar" / "sesi belajar" always contain "belajar", so the word alone is enough.
+_DOMAIN_STUDY_WORDS = frozenset({"belajar", "study plan"})
+_DOMAIN_HABIT_WORDS = frozenset({"habit", "kebiasaan", "olahraga", "health", "tidur"})
+_SELF_WORDS = frozenset({"aku", "saya"})
+_STRICT_WORDS = frozenset({"toxic", "tegas", "gaspol", "no excuse", "push keras"})
+_URGENCY_HIGH_WORDS = frozenset({"urgent", "asap", "deadline", "besok", "hari ini", "sekarang juga", "telat"})
+_URGENCY_MEDIUM_WORDS = frozenset({"target", "goal", "reminder", "ingatkan", "check-in", "progres"})
+_ENERGY_LOW_WORDS = frozenset({"lelah", "capek", "ngantuk", "burnout", "drop", "mager"})
+_ENERGY_HIGH_WORDS = frozenset({"semangat", "fokus", "gas", "mantap"})
+_FOLLOWUP_EVALUATION_WORDS = frozenset({"evaluasi", "review", "refleksi"})
+_FOLLOWUP_REMINDER_WORDS = frozenset({"reminder", "ingat", "notifikasi", "alarm"})
+_TOPIC_WORDS: tuple[tuple[str, frozenset[str]], ...] = (
+    ("kuliah", frozenset({"kuliah", "assignment", "deadline", "ujian", "quiz", "makalah"})),
+    ("target", frozenset({"target", "goal", "prioritas"})),
+    ("reminder", frozenset({"reminder", "ingat", "alarm", "notifikasi"})),
+    ("checkin", frozenset({"check-in", "checkin", "progres", "progress", "sync"})),
+    ("evaluation", frozenset({"evaluasi", "review", "refleksi"})),
+    ("mood", frozenset({"mood", "lelah", "burnout", "stress"})),
+    ("couple", frozenset({"couple", "pasangan", "partner"})),
+)
+_FEATURE_WORDS = frozenset().union(
+    _DOMAIN_KULIAH_WORDS,
+    _DOMAIN_STUDY_WORDS,
+    _DOMAIN_HABIT_WORDS,
+    _SELF_WORDS,
+    _STRICT_WORDS,
+    _URGENCY_HIGH_WORDS,
+    _URGENCY_MEDIUM_WORDS,
+    _ENERGY_LOW_WORDS,
+    _ENERGY_HIGH_WORDS,
+    _FOLLOWUP_EVALUATION_WORDS,
+    _FOLLOWUP_REMINDER_WORDS,
+    *(words for _, words in _TOPIC_WORDS),
+)
+# One scan finds every keyword. No keyword is a whole-word prefix of another
+# or starts inside another, so non-overlapping matches miss nothing.
+_FEATURE_PATTERN = LazyPattern(
+    r"\b(?:" + "|".join(re.escape(word) for word in sorted(_FEATURE_WORDS, key=len, reverse=True)) + r")\b"
+)
+
+
+class ParsedMessage:
+    """Per-request view of one message, scanned once and shared by the helpers."""
+
+    def __init__(self, message: str) -> None:
+        self.text = message
+        self.lower = message.lower()
+        self.hits = frozenset(match.group(0) for match in _FEATURE_PATTERN.finditer(self.lower))
+
+    def has_any(self, words: frozenset[str]) -> bool:
+        return not self.hits.isdisjoint(words)
+
+    @cached_property
+    def focus_minutes(self) -> int | None:
+        return _parse_focus_minutes_from_message(self.text)
+
+    @cached_property
+    def temporal(self) -> TemporalScan:
+        # Also read by the brain when both answer the same text (api/assistant_turn.py).
+        return scan_temporal(self.text)
+
+    @cached_property
+    def deadline_fragment(self) -> str:
+        return self.temporal.fragment
+
+    @cached_property
+    def has_deadline_signal(self) -> bool:
+        # The scan is case-insensitive, but str.lower() can change non-ASCII text.
+        return self.temporal.has_deadline_signal if self.text.isascii() else _has_deadline_signal(self.lower)
+
+
+_DEADLINE_WORD = LazyPattern(r"\b(?:deadline|due)\b", re.IGNORECASE)
 
 
 def _extract_item_title_candidate(message: str, kind: str) -> str:
@@ -277,7 +313,7 @@ def _extract_item_title_candidate(message: str, kind: str) -> str:
             flags=re.IGNORECASE,
         )
 
-    text = re.sub(r"\b(?:deadline|due)\b.*$", "", text, flags=re.IGNORECASE)
+    text = cut_tail(_DEADLINE_WORD, text)
     text = re.sub(r"\b(?:hari ini|today|besok|tomorrow|lusa|day after tomorrow)\b", "", text, flags=re.IGNORECASE)
     text = re.sub(r"\b\d{4}-\d{2}-\d{2}\b", "", text)
     text = re.sub(r"\b\d{1,2}:\d{2}\b", "", text)
@@ -297,8 +333,32 @@ def _planner_missing_fields(planner: PlannerFrame) -> list[str]:
     return out
 
 
-def _planner_action_from_segment(segment: str, index: int) -> PlannerStep | None:
-    lower = segment.lower()
+_PLAN_SPLIT_PATTERN = LazyPattern(r"\s*(?:;|(?:,\s*)?(?:dan|lalu|kemudian|terus|habis itu|setelah itu))\s*", re.IGNORECASE)
+_SEGMENT_HASH_CHARS = frozenset("0123456789abcdef")
+
+
+def _segment_hash(segment: str) -> str:
+    # Only identifies text the planner has already seen; a forged or colliding
+    # hash can change nothing but the plan of the client that sent it.
+    return format(zlib.crc32(segment.lower().encode("utf-8")), "08x")
+
+
+def _valid_segment_hash(raw: Any) -> str:
+    value = str(raw or "").strip().lower()
+    return value if len(value) == 8 and _SEGMENT_HASH_CHARS.issuperset(value) else ""
+
+
+def _planner_segments(normalized: str) -> list[str]:
+    segments = [part.strip() for part in _PLAN_SPLIT_PATTERN.split(normalized) if part.strip()]
+    if not segments and normalized:
+        segments = [normalized]
+    return segments
+
+
+def _planner_action_from_segment(segment: str, index: int, parsed: ParsedMessage | None = None) -> PlannerStep | None:
+    if parsed is None or parsed.text != segment:
+        parsed = ParsedMessage(segment)
+    lower = parsed.lower
     missing: list[str] = []
     kind = ""
     summary = ""
@@ -306,7 +366,7 @@ def _planner_action_from_segment(segment: str, index: int) -> PlannerStep | None
     if re.search(r"(?:buat|buatkan|tambah|add|create|catat|simpan)\s+(?:assignment|tugas kuliah)\b", lower):
         kind = "create_assignment"
         summary = "Buat tugas kuliah baru"
-        if not _has_deadline_signal(lower):
+        if not parsed.has_deadline_signal:
             missing.append("deadline")
         stripped = re.sub(
             r"(?:buat|buatkan|tambah|add|create|catat|simpan)\s+(?:assignment|tugas kuliah)\s*",
@@ -319,7 +379,7 @@ def _planner_action_from_segment(segment: str, index: int) -> PlannerStep | None
     elif re.search(r"(?:buat|buatkan|tambah|add|create|catat|simpan)\s+(?:task|tugas|todo|to-do)\b", lower):
         kind = "create_task"
         summary = "Buat tugas baru"
-        if not _has_deadline_signal(lower):
+        if not parsed.has_deadline_signal:
             missing.append("deadline")
         stripped = re.sub(
             r"(?:buat|buatkan|tambah|add|create|catat|simpan)\s+(?:task|tugas|todo|to-do)\s*",
@@ -349,13 +409,15 @@ def _planner_action_from_segment(segment: str, index: int) -> PlannerStep | None
     else:
         return None
 
+    command = segment.strip()
     return {
         "id": f"step_{index}",
         "kind": kind,
         "summary": summary,
         "status": "blocked" if missing else "ready",
-        "command": segment.strip(),
+        "command": command,
         "missing": missing,
+        "segment_hash": _segment_hash(command),
     }
 
 
@@ -377,6 +439,7 @@ def _normalize_planner_step(raw: Any, index: int) -> PlannerStep | None:
         "status": status,
         "command": command,
         "missing": missing,
+        "segment_hash": _valid_segment_hash(raw.get("segment_hash")),
     }
 
 
@@ -432,6 +495,14 @@ def _normalize_planner_hint(raw: Any) -> PlannerFrame | None:
             if len(clarifications) >= 4:
                 break
 
+    segments: list[str] = []
+    segments_raw = raw.get("segments")
+    if isinstance(segments_raw, list):
+        for item in segments_raw[-MAX_PLAN_SEGMENTS:]:
+            segment_hash = _valid_segment_hash(item)
+            if segment_hash and segment_hash not in segments:
+                segments.append(segment_hash)
+
     requires_clarification = bool(raw.get("requires_clarification")) or len(clarifications) > 0
     confidence = str(raw.get("confidence", "")).strip().lower()
     if confidence not in {"low", "medium", "high"}:
@@ -462,31 +533,141 @@ def _normalize_planner_hint(raw: Any) -> PlannerFrame | None:
         "actions": actions,
         "summary": summary,
         "next_best_action": next_best_action,
+        "segments": segments,
     }
 
 
+def _replan_from_hint(
+    hinted: PlannerFrame,
+    segments: list[str],
+    parsed: ParsedMessage | None = None,
+) -> tuple[list[PlannerStep], list[str], bool]:
+    """Carry a hinted plan forward, re-checking only what the new text can change.
+
+    Segments whose hash the hint already lists were planned on an earlier turn
+    and are skipped. A hint without segment hashes (``api/chat.js`` builds one
+    from the current message, older clients echo one back) lists none, so
+    every segment is planned again. A new segment that repeats a step's
+    command, or names an action of the same kind as a blocked step, replaces
+    that step; other actions become new steps. The remaining new segments are
+    details (a deadline, a time, a title) given to the first blocked step they
+    complete. Ready steps whose command still matches their hash are kept
+    without running the segment rules, so a follow-up turn costs the same
+    however many steps are already resolved.
+    Returns (actions, segment hashes, whether any step changed).
+    """
+    seen = list(hinted["segments"])
+    known = set(seen)
+    actions = list(hinted["actions"][:MAX_PLAN_ACTIONS])
+    by_command: dict[str, int] = {}
+    for position, step in enumerate(actions):
+        by_command.setdefault(_segment_hash(step["command"]), position)
+    replaced: set[int] = set()
+    fresh: list[PlannerStep] = []
+    details: list[str] = []
+    changed = False
+    for segment in segments:
+        segment_hash = _segment_hash(segment)
+        if segment_hash in known:
+            continue
+        known.add(segment_hash)
+        seen.append(segment_hash)
+        action = _planner_action_from_segment(segment, 0, parsed)
+        target = by_command.get(segment_hash)
+        if target is None and action is not None:
+            target = next(
+                (
+                    position
+                    for position, step in enumerate(actions)
+                    if position not in replaced and step["status"] == "blocked" and step["kind"] == action["kind"]
+                ),
+                None,
+            )
+        if target is None:
+            if action is None:
+                details.append(segment)
+            else:
+                fresh.append(action)
+                changed = True
+            continue
+        if target in replaced:
+            continue
+        replaced.add(target)
+        step = actions[target]
+        if action is None:
+            # A kind the segment rules do not produce; the hint already planned this text.
+            actions[target] = {**step, "segment_hash": segment_hash}
+            continue
+        action["id"] = step["id"]
+        changed = changed or action != {**step, "segment_hash": action["segment_hash"]}
+        actions[target] = action
+
+    for position, step in enumerate(actions):
+        if position in replaced:
+            continue
+        command_hash = _segment_hash(step["command"])
+        # Ready steps from hints that predate segment hashes are trusted as they are.
+        verified = step["segment_hash"] == command_hash or (step["segment_hash"] == "" and step["status"] == "ready")
+        rechecked = None if verified else _planner_action_from_segment(step["command"], 0)
+        if rechecked is None:
+            # Verified, or a kind the segment rules do not produce.
+            actions[position] = {**step, "segment_hash": command_hash}
+            continue
+        rechecked["id"] = step["id"]
+        changed = changed or rechecked != {**step, "segment_hash": rechecked["segment_hash"]}
+        actions[position] = rechecked
+
+    taken = {action["id"] for action in actions}
+    index = len(actions)
+    for action in fresh:
+        if len(actions) >= MAX_PLAN_ACTIONS:
+            break
+        index += 1
+        while f"step_{index}" in taken:
+            index += 1
+        action["id"] = f"step_{index}"
+        actions.append(action)
+
+    detail = " ".join(details)
+    for position, step in enumerate(actions if detail else []):
+        if step["status"] != "blocked":
+            continue
+        completed = _planner_action_from_segment(f"{step['command']} {detail}"[:MAX_MESSAGE_LEN], 0)
+        if completed is not None and completed["kind"] == step["kind"] and len(completed["missing"]) < len(step["missing"]):
+            completed["id"] = step["id"]
+            actions[position] = completed
+            changed = True
+            break
+    return actions, seen[-MAX_PLAN_SEGMENTS:], changed
+
+
 def _build_planner(
     message: str,
     intent: str,
     memory: dict[str, Any],
     planner_hint: dict[str, Any] | None = None,
+    parsed: ParsedMessage | None = None,
 ) -> PlannerFrame:
     hinted = _normalize_planner_hint(planner_hint)
-    normalized = normalize_message(message)
-    segments = [
-        part.strip()
-        for part in re.split(r"\s*(?:;|(?:,\s*)?(?:dan|lalu|kemudian|terus|habis itu|setelah itu))\s*", normalized, flags=re.IGNORECASE)
-        if part.strip()
-    ]
-    if not segments and normalized:
-        segments = [normalized]
+    segments = _planner_segments(normalize_message(message))
 
     actions: list[PlannerStep] = []
-    if hinted and hinted.get("actions"):
-        actions = hinted.get("actions", [])[:MAX_PLAN_ACTIONS]
+    # A hinted plan already tracks what is missing per step, so the memory
+    # fallback below must not re-ask for fields its steps have resolved.
+    from_hint = bool(hinted and hinted.get("actions"))
+    if from_hint:
+        actions, seen, changed = _replan_from_hint(hinted, segments, parsed)
+        if changed:
+            # The hinted clarifications, summary and labels describe the old steps.
+            hinted = None
     else:
+        seen = hinted["segments"] if hinted else []
+        for segment_hash in map(_segment_hash, segments):
+            if segment_hash not in seen:
+                seen.append(segment_hash)
+        seen = seen[-MAX_PLAN_SEGMENTS:]
         for idx, segment in enumerate(segments, start=1):
-            action = _planner_action_from_segment(segment, idx)
+            action = _planner_action_from_segment(segment, idx, parsed)
             if action is not None:
                 actions.append(action)
             elif len(segments) == 1:
@@ -497,6 +678,7 @@ def _build_planner(
                     "status": "ready",
                     "command": segment,
                     "missing": [],
+                    "segment_hash": _segment_hash(segment),
                 })
             if len(actions) >= MAX_PLAN_ACTIONS:
                 break
@@ -516,7 +698,7 @@ def _build_planner(
                 clarifications.append({"action_id": action["id"], "field": field, "question": question})
 
     unresolved_fields = memory.get("unresolved_fields", [])
-    if not clarifications and isinstance(unresolved_fields, list) and unresolved_fields and intent == "fallback":
+    if not clarifications and not from_hint and isinstance(unresolved_fields, list) and unresolved_fields and intent == "fallback":
         for field in unresolved_fields[:2]:
             if field == "deadline":
                 question = "Deadline-nya kapan?"
@@ -555,27 +737,27 @@ def _build_planner(
         "actions": actions,
         "summary": summary,
         "next_best_action": next_best_action,
+        "segments": seen,
     }
 
 
-def _detect_focus_domain(message: str) -> str:
-    lower = message.lower()
-    if re.search(r"\b(kuliah|assignment|deadline|ipk|makalah|quiz|ujian)\b", lower):
+def _detect_focus_domain(parsed: ParsedMessage) -> str:
+    if parsed.has_any(_DOMAIN_KULIAH_WORDS):
         return "kuliah"
-    if re.search(r"\b(belajar|study plan|jadwal belajar|sesi belajar)\b", lower):
+    if parsed.has_any(_DOMAIN_STUDY_WORDS):
         return "kuliah"
-    if re.search(r"\b(habit|kebiasaan|olahraga|health|tidur)\b", lower):
+    if parsed.has_any(_DOMAIN_HABIT_WORDS):
         return "habit"
     return "umum"
 
 
-def _build_context(message: str, intent: str, hint: dict[str, Any]) -> dict[str, str]:
+def _build_context(parsed: ParsedMessage, intent: str, hint: dict[str, Any]) -> dict[str, str]:
     partner_label = "pasangan kalian"
-    if re.search(r"\baku\b|\bsaya\b", message.lower()):
+    if parsed.has_any(_SELF_WORDS):
         partner_label = "kalian berdua"
     return {
         "partner_label": partner_label,
-        "domain": _detect_focus_domain(message),
+        "domain": _detect_focus_domain(parsed),
         "intent": intent,
         "focus_window": str(hint.get("focus_window", "any")),
     }
@@ -588,11 +770,9 @@ def _parse_focus_minutes_from_message(message: str) -> int | None:
     return _clamp(_safe_int(hit.group(1), 25), 10, 180)
 
 
-def _infer_adaptive_profile(message: str, context: dict[str, str], hint: dict[str, Any]) -> AdaptiveProfile:
-    lower = message.lower()
-
+def _infer_adaptive_profile(parsed: ParsedMessage, context: dict[str, str], hint: dict[str, Any]) -> AdaptiveProfile:
     tone_mode = str(hint.get("tone_mode", "supportive"))
-    if re.search(r"\b(toxic|tegas|gaspol|no excuse|push keras)\b", lower):
+    if parsed.has_any(_STRICT_WORDS):
         style = "strict"
     elif tone_mode == "strict":
         style = "strict"
@@ -601,20 +781,20 @@ def _infer_adaptive_profile(message: str, context: dict[str, str], hint: dict[st
     else:
         style = "supportive"
 
-    focus_minutes = _parse_focus_minutes_from_message(message)
+    focus_minutes = parsed.focus_minutes
     if focus_minutes is None:
         focus_minutes = _clamp(_safe_int(hint.get("focus_minutes", 25), 25), 10, 180)
 
-    if re.search(r"\b(urgent|asap|deadline|besok|hari ini|sekarang juga|telat)\b", lower):
+    if parsed.has_any(_URGENCY_HIGH_WORDS):
         urgency = "high"
-    elif re.search(r"\b(target|goal|reminder|ingatkan|check-in|progres)\b", lower):
+    elif parsed.has_any(_URGENCY_MEDIUM_WORDS):
         urgency = "medium"
     else:
         urgency = "low"
 
-    if re.search(r"\b(lelah|capek|ngantuk|burnout|drop|mager)\b", lower):
+    if parsed.has_any(_ENERGY_LOW_WORDS):
         energy = "low"
-    elif re.search(r"\b(semangat|fokus|gas|mantap)\b", lower):
+    elif parsed.has_any(_ENERGY_HIGH_WORDS):
         energy = "high"
     else:
         energy = "normal"
@@ -641,21 +821,21 @@ def _adaptive_tail(profile: AdaptiveProfile) -> str:
 
 def _apply_adaptive_followup(
     intent: str,
-    message: str,
+    parsed: ParsedMessage,
     reply: str,
     context: dict[str, str],
     profile: AdaptiveProfile,
     memory: dict[str, Any],
     planner: PlannerFrame,
 ) -> str:
-    lower = message.lower()
+    message = parsed.text
     domain = context.get("domain", "umum")
     focus_minutes = int(profile.get("focus_minutes", 25))
 
     if intent in {"create_task", "create_assignment"}:
         kind = "tugas kuliah" if intent == "create_assignment" else "tugas"
         title = _extract_item_title_candidate(message, kind)
-        deadline = _extract_time_or_deadline_fragment(message)
+        deadline = parsed.deadline_fragment
         missing = _planner_missing_fields(planner)
 
         if missing:
@@ -687,7 +867,7 @@ def _apply_adaptive_followup(
         return f"{base} {tail}".strip() if tail else base
 
     if intent == "set_reminder":
-        due = _extract_time_or_deadline_fragment(message)
+        due = parsed.deadline_fragment
         if due:
             base = f"Oke, reminder aku set untuk {due}. Supaya kejadian, mulai dengan 1 langkah kecil sekarang."
         else:
@@ -710,9 +890,9 @@ def _apply_adaptive_followup(
         return f"{base} {tail}".strip() if tail else base
 
     if intent == "affirmation":
-        if re.search(r"\b(evaluasi|review|refleksi)\b", lower):
+        if parsed.has_any(_FOLLOWUP_EVALUATION_WORDS):
             base = pick_response("evaluation", message, context)
-        elif re.search(r"\b(reminder|ingat|notifikasi|alarm)\b", lower):
+        elif parsed.has_any(_FOLLOWUP_REMINDER_WORDS):
             base = f"Sip, pengingatnya kebaca. Lanjut {focus_minutes} menit fokus sekarang, lalu kirim update singkat."
         elif domain == "kuliah":
             base = f"Sip, lanjut tugas kuliah paling dekat dulu {focus_minutes} menit. Setelah itu evaluasi cepat 3 poin."
@@ -730,23 +910,130 @@ def _apply_adaptive_followup(
     return f"{reply} {tail}".strip() if tail else reply
 
 
-def _dedupe_suggestions(items: list[QuickSuggestion]) -> list[QuickSuggestion]:
-    seen_commands: set[str] = set()
-    out: list[QuickSuggestion] = []
-    for item in items:
-        label = str(item.get("label", "")).strip()
-        command = str(item.get("command", "")).strip()
-        tone = str(item.get("tone", "info")).strip() or "info"
-        if not label or not command:
-            continue
-        cmd_key = command.lower()
-        if cmd_key in seen_commands:
-            continue
-        seen_commands.add(cmd_key)
-        out.append({"label": label, "command": command, "tone": tone})
-        if len(out) >= MAX_SUGGESTIONS:
-            break
-    return out
+# (label, command, tone, uses_focus). Commands are stored stripped and
+# lowercase; "{m}" in a focus suggestion is the adaptive focus length.
+_SuggestionSpec = tuple[str, str, str, bool]
+
+
+def _spec(label: str, command: str, tone: str) -> _SuggestionSpec:
+    return (label, command, tone, "{m}" in command)
+
+
+_SUGGESTIONS_BY_INTENT: Mapping[str, tuple[_SuggestionSpec, ...]] = MappingProxyType({
+    "create_assignment": (
+        _spec("Isi Deadline", "deadline besok 21:00", "warning"),
+        _spec("Tambah Deskripsi", "deskripsi: rangkum 3 referensi utama", "info"),
+        _spec("Pecah Langkah", "pecah tugas kuliah ini jadi 3 langkah", "success"),
+    ),
+    "create_task": (
+        _spec("Isi Deadline", "deadline besok 19:00", "warning"),
+        _spec("Prioritas Tinggi", "set prioritas tinggi", "critical"),
+        _spec("Mulai 25m", "mulai sekarang 25 menit", "success"),
+    ),
+    "set_reminder": (
+        _spec("Hari Ini 19:30", "ingatkan aku hari ini 19:30", "warning"),
+        _spec("Besok 07:00", "ingatkan aku besok 07:00", "info"),
+        _spec("Check-In Malam", "ingatkan check-in malam ini 21:00", "success"),
+    ),
+    "daily_brief": (
+        _spec("Prioritas Utama", "tugas paling mendesak saya apa", "warning"),
+        _spec("Risiko 24 Jam", "risiko deadline 24 jam ke depan", "critical"),
+        _spec("Rencana Besok", "rencana fokus besok pagi", "info"),
+    ),
+    "greeting": (
+        _spec("Cek Target", "cek target harian pasangan", "info"),
+        _spec("Rekomendasi Tugas", "rekomendasi tugas kuliah", "success"),
+        _spec("Evaluasi", "evaluasi hari ini", "info"),
+    ),
+    "check_daily_target": (
+        _spec("Check-In Progres", "check-in progres hari ini", "info"),
+        _spec("Fokus {m}m", "ingatkan aku fokus {m} menit", "warning"),
+        _spec("Evaluasi", "evaluasi malam ini", "info"),
+    ),
+    "reminder_ack": (
+        _spec("Mulai {m}m", "oke mulai fokus {m} menit", "success"),
+        _spec("Check-In", "check-in progres sekarang", "info"),
+        _spec("Evaluasi", "evaluasi singkat", "info"),
+    ),
+    "checkin_progress": (
+        _spec("Rekomendasi", "rekomendasi tugas berikutnya", "success"),
+        _spec("Target Besok", "cek target harian besok", "info"),
+        _spec("Motivasi Tegas", "toxic motivasi", "warning"),
+    ),
+    "evaluation": (
+        _spec("Rencana Besok", "cek target harian besok", "success"),
+        _spec("Prioritas Kuliah", "rekomendasi tugas kuliah", "warning"),
+        _spec("Check-In", "check-in progres sekarang", "info"),
+    ),
+    "affirmation": (
+        _spec("Rekomendasi", "rekomendasi tugas sekarang", "success"),
+        _spec("Evaluasi", "evaluasi hari ini", "info"),
+        _spec("Fokus {m}m", "ingatkan aku fokus {m} menit", "warning"),
+    ),
+    "recommend_task": (
+        _spec("Mulai Sekarang", "oke mulai sekarang", "success"),
+        _spec("Pecah Langkah", "pecah tugas jadi langkah kecil", "info"),
+        _spec("Check-In", "check-in progres tugas", "info"),
+    ),
+    "study_schedule": (
+        _spec("Besok Pagi", "jadwal belajar besok pagi 120 menit", "info"),
+        _spec("Target 180m", "jadwal belajar 180 menit", "success"),
+        _spec("Mode Malam", "jadwal belajar malam 90 menit", "warning"),
+    ),
+    "toxic_motivation": (
+        _spec("Gas {m}m", "oke gas fokus {m} menit", "critical"),
+        _spec("Tugas Prioritas", "rekomendasi tugas prioritas", "warning"),
+        _spec("Evaluasi", "evaluasi cepat", "info"),
+    ),
+    "fallback": (
+        _spec("Cek Target", "cek target harian pasangan", "info"),
+        _spec("Fokus {m}m", "ingatkan aku fokus {m} menit", "warning"),
+        _spec("Rekomendasi", "rekomendasi tugas kuliah", "success"),
+    ),
+})
+# Overlays placed ahead of the intent suggestions, highest priority first.
+_CLARIFY_SUGGESTION = _spec("Lengkapi Detail", "oke saya lengkapi detailnya", "warning")
+_BUNDLE_SUGGESTION = _spec("Jalankan Bundle", "oke jalankan rencana ini", "success")
+_TITLE_SUGGESTION = _spec("Isi Judul", "judul tugas [isi judul]", "info")
+_DEADLINE_SUGGESTION = _spec("Isi Deadline", "deadline besok 19:00", "warning")
+_EXECUTE_SUGGESTION = _spec("Eksekusi Sekarang", "oke mulai sekarang", "success")
+_STRICT_SUGGESTION = _spec("Mode Tegas", "toxic motivasi sekarang", "critical")
+_KULIAH_SUGGESTION = _spec("Prioritas Kuliah", "rekomendasi tugas kuliah paling mendesak", "warning")
+_OVERLAY_SUGGESTIONS: tuple[_SuggestionSpec, ...] = (
+    _CLARIFY_SUGGESTION,
+    _BUNDLE_SUGGESTION,
+    _TITLE_SUGGESTION,
+    _DEADLINE_SUGGESTION,
+    _EXECUTE_SUGGESTION,
+    _STRICT_SUGGESTION,
+    _KULIAH_SUGGESTION,
+)
+
+
+def _suggestion_specs(
+    intent: str,
+    domain: str,
+    style: str,
+    recent_evaluation: bool,
+    unresolved: Any,
+    planner: PlannerFrame,
+) -> Iterator[_SuggestionSpec]:
+    if planner.get("requires_clarification"):
+        yield _CLARIFY_SUGGESTION
+    elif planner.get("mode") == "bundle":
+        yield _BUNDLE_SUGGESTION
+    if isinstance(unresolved, list):
+        if "title" in unresolved:
+            yield _TITLE_SUGGESTION
+        if "deadline" in unresolved:
+            yield _DEADLINE_SUGGESTION
+    if recent_evaluation:
+        yield _EXECUTE_SUGGESTION
+    if style == "strict":
+        yield _STRICT_SUGGESTION
+    if domain == "kuliah":
+        yield _KULIAH_SUGGESTION
+    yield from _SUGGESTIONS_BY_INTENT.get(intent, _SUGGESTIONS_BY_INTENT["fallback"])
 
 
 def _build_quick_suggestions(
@@ -757,175 +1044,67 @@ def _build_quick_suggestions(
     memory: dict[str, Any],
     planner: PlannerFrame,
 ) -> list[QuickSuggestion]:
-    domain = context.get("domain", "umum")
-    focus_minutes = int(profile.get("focus_minutes", 25))
-    style = str(profile.get("style", "supportive"))
-    recent = [str(x).lower() for x in hint.get("recent_intents", [])]
+    """Pick up to MAX_SUGGESTIONS chips from the static tables.
+
+    Overlays (planner state, unresolved fields, recent evaluation, strict
+    style, kuliah domain) go first, then the intent's own suggestions; avoided
+    commands are dropped and preferred ones move to the front. Only the
+    returned dicts are allocated.
+    """
+    focus = str(int(profile.get("focus_minutes", 25)))
+    recent_evaluation = any(str(x).lower() == "evaluation" for x in hint.get("recent_intents", []))
     preferred_commands = _normalize_string_list(hint.get("preferred_commands", []), limit=6)
-    avoid_commands = set(_normalize_string_list(hint.get("avoid_commands", []), limit=6))
-
-    by_intent: dict[str, list[QuickSuggestion]] = {
-        "create_assignment": [
-            {"label": "Isi Deadline", "command": "deadline besok 21:00", "tone": "warning"},
-            {"label": "Tambah Deskripsi", "command": "deskripsi: rangkum 3 referensi utama", "tone": "info"},
-            {"label": "Pecah Langkah", "command": "pecah tugas kuliah ini jadi 3 langkah", "tone": "success"},
-        ],
-        "create_task": [
-            {"label": "Isi Deadline", "command": "deadline besok 19:00", "tone": "warning"},
-            {"label": "Prioritas Tinggi", "command": "set prioritas tinggi", "tone": "critical"},
-            {"label": "Mulai 25m", "command": "mulai sekarang 25 menit", "tone": "success"},
-        ],
-        "set_reminder": [
-            {"label": "Hari Ini 19:30", "command": "ingatkan aku hari ini 19:30", "tone": "warning"},
-            {"label": "Besok 07:00", "command": "ingatkan aku besok 07:00", "tone": "info"},
-            {"label": "Check-In Malam", "command": "ingatkan check-in malam ini 21:00", "tone": "success"},
-        ],
-        "daily_brief": [
-            {"label": "Prioritas Utama", "command": "tugas paling mendesak saya apa", "tone": "warning"},
-            {"label": "Risiko 24 Jam", "command": "risiko deadline 24 jam ke depan", "tone": "critical"},
-            {"label": "Rencana Besok", "command": "rencana fokus besok pagi", "tone": "info"},
-        ],
-        "greeting": [
-            {"label": "Cek Target", "command": "cek target harian pasangan", "tone": "info"},
-            {"label": "Rekomendasi Tugas", "command": "rekomendasi tugas kuliah", "tone": "success"},
-            {"label": "Evaluasi", "command": "evaluasi hari ini", "tone": "info"},
-        ],
-        "check_daily_target": [
-            {"label": "Check-In Progres", "command": "check-in progres hari ini", "tone": "info"},
-            {"label": f"Fokus {focus_minutes}m", "command": f"ingatkan aku fokus {focus_minutes} menit", "tone": "warning"},
-            {"label": "Evaluasi", "command": "evaluasi malam ini", "tone": "info"},
-        ],
-        "reminder_ack": [
-            {"label": f"Mulai {focus_minutes}m", "command": f"oke mulai fokus {focus_minutes} menit", "tone": "success"},
-            {"label": "Check-In", "command": "check-in progres sekarang", "tone": "info"},
-            {"label": "Evaluasi", "command": "evaluasi singkat", "tone": "info"},
-        ],
-        "checkin_progress": [
-            {"label": "Rekomendasi", "command": "rekomendasi tugas berikutnya", "tone": "success"},
-            {"label": "Target Besok", "command": "cek target harian besok", "tone": "info"},
-            {"label": "Motivasi Tegas", "command": "toxic motivasi", "tone": "warning"},
-        ],
-        "evaluation": [
-            {"label": "Rencana Besok", "command": "cek target harian besok", "tone": "success"},
-            {"label": "Prioritas Kuliah", "command": "rekomendasi tugas kuliah", "tone": "warning"},
-            {"label": "Check-In", "command": "check-in progres sekarang", "tone": "info"},
-        ],
-        "affirmation": [
-            {"label": "Rekomendasi", "command": "rekomendasi tugas sekarang", "tone": "success"},
-            {"label": "Evaluasi", "command": "evaluasi hari ini", "tone": "info"},
-            {"label": f"Fokus {focus_minutes}m", "command": f"ingatkan aku fokus {focus_minutes} menit", "tone": "warning"},
-        ],
-        "recommend_task": [
-            {"label": "Mulai Sekarang", "command": "oke mulai sekarang", "tone": "success"},
-            {"label": "Pecah Langkah", "command": "pecah tugas jadi langkah kecil", "tone": "info"},
-            {"label": "Check-In", "command": "check-in progres tugas", "tone": "info"},
-        ],
-        "study_schedule": [
-            {"label": "Besok Pagi", "command": "jadwal belajar besok pagi 120 menit", "tone": "info"},
-            {"label": "Target 180m", "command": "jadwal belajar 180 menit", "tone": "success"},
-            {"label": "Mode Malam", "command": "jadwal belajar malam 90 menit", "tone": "warning"},
-        ],
-        "toxic_motivation": [
-            {"label": f"Gas {focus_minutes}m", "command": f"oke gas fokus {focus_minutes} menit", "tone": "critical"},
-            {"label": "Tugas Prioritas", "command": "rekomendasi tugas prioritas", "tone": "warning"},
-            {"label": "Evaluasi", "command": "evaluasi cepat", "tone": "info"},
-        ],
-        "fallback": [
-            {"label": "Cek Target", "command": "cek target harian pasangan", "tone": "info"},
-            {"label": f"Fokus {focus_minutes}m", "command": f"ingatkan aku fokus {focus_minutes} menit", "tone": "warning"},
-            {"label": "Rekomendasi", "command": "rekomendasi tugas kuliah", "tone": "success"},
-        ],
-    }
-
-    suggestions = list(by_intent.get(intent, by_intent["fallback"]))
-
-    if domain == "kuliah":
-        suggestions.insert(0, {"label": "Prioritas Kuliah", "command": "rekomendasi tugas kuliah paling mendesak", "tone": "warning"})
-
-    if style == "strict":
-        suggestions.insert(0, {"label": "Mode Tegas", "command": "toxic motivasi sekarang", "tone": "critical"})
-
-    if "evaluation" in recent:
-        suggestions.insert(0, {"label": "Eksekusi Sekarang", "command": "oke mulai sekarang", "tone": "success"})
-
-    unresolved = memory.get("unresolved_fields", [])
-    if isinstance(unresolved, list):
-        if "deadline" in unresolved:
-            suggestions.insert(0, {"label": "Isi Deadline", "command": "deadline besok 19:00", "tone": "warning"})
-        if "title" in unresolved:
-            suggestions.insert(0, {"label": "Isi Judul", "command": "judul tugas [isi judul]", "tone": "info"})
-
-    if planner.get("requires_clarification"):
-        suggestions.insert(0, {"label": "Lengkapi Detail", "command": "oke saya lengkapi detailnya", "tone": "warning"})
-    elif planner.get("mode") == "bundle":
-        suggestions.insert(0, {"label": "Jalankan Bundle", "command": "oke jalankan rencana ini", "tone": "success"})
-
+    avoid_commands = _normalize_string_list(hint.get("avoid_commands", []), limit=6)
+
+    candidates: Iterator[tuple[str, str, str]] = (
+        (label.replace("{m}", focus), command.replace("{m}", focus), tone) if uses_focus else (label, command, tone)
+        for label, command, tone, uses_focus in _suggestion_specs(
+            intent,
+            context.get("domain", "umum"),
+            str(profile.get("style", "supportive")),
+            recent_evaluation,
+            memory.get("unresolved_fields", []),
+            planner,
+        )
+    )
     if avoid_commands:
-        suggestions = [
-            item for item in suggestions
-            if str(item.get("command", "")).strip().lower() not in avoid_commands
-        ]
-
+        candidates = (item for item in candidates if item[1] not in avoid_commands)
     if preferred_commands:
-        by_command = {}
-        for item in suggestions:
-            cmd = str(item.get("command", "")).strip().lower()
-            if not cmd or cmd in by_command:
-                continue
-            by_command[cmd] = item
+        pool = list(candidates)
+        by_command: dict[str, tuple[str, str, str]] = {}
+        for item in pool:
+            by_command.setdefault(item[1], item)
+        candidates = itertools.chain(
+            (by_command.get(cmd) or (cmd[:30].strip(), cmd, "success") for cmd in preferred_commands),
+            (item for item in pool if item[1] not in preferred_commands),
+        )
 
-        prioritized: list[QuickSuggestion] = []
-        for cmd in preferred_commands:
-            if cmd in by_command:
-                prioritized.append(by_command[cmd])
-            else:
-                label = cmd[:30] if len(cmd) > 30 else cmd
-                prioritized.append({"label": label, "command": cmd, "tone": "success"})
+    seen_commands: set[str] = set()
+    out: list[QuickSuggestion] = []
+    for label, command, tone in candidates:
+        if command in seen_commands:
+            continue
+        seen_commands.add(command)
+        out.append({"label": label, "command": command, "tone": tone})
+        if len(out) >= MAX_SUGGESTIONS:
+            break
+    return out
 
-        for item in suggestions:
-            cmd = str(item.get("command", "")).strip().lower()
-            if cmd in preferred_commands:
-                continue
-            prioritized.append(item)
-        suggestions = prioritized
-
-    return _dedupe_suggestions(suggestions)
-
-
-def _extract_message_topics(message: str) -> list[str]:
-    lower = str(message).lower()
-    topics: list[str] = []
-
-    def push(value: str) -> None:
-        if value not in topics:
-            topics.append(value)
-
-    if re.search(r"\b(kuliah|assignment|deadline|ujian|quiz|makalah)\b", lower):
-        push("kuliah")
-    if re.search(r"\b(target|goal|prioritas)\b", lower):
-        push("target")
-    if re.search(r"\b(reminder|ingat|alarm|notifikasi)\b", lower):
-        push("reminder")
-    if re.search(r"\b(check-?in|progres|progress|sync)\b", lower):
-        push("checkin")
-    if re.search(r"\b(evaluasi|review|refleksi)\b", lower):
-        push("evaluation")
-    if re.search(r"\b(mood|lelah|burnout|stress)\b", lower):
-        push("mood")
-    if re.search(r"\b(couple|pasangan|partner)\b", lower):
-        push("couple")
+
+def _extract_message_topics(parsed: ParsedMessage) -> list[str]:
+    topics = [topic for topic, words in _TOPIC_WORDS if parsed.has_any(words)]
     if not topics:
-        push("general")
+        topics.append("general")
     return topics[:5]
 
 
 def _build_memory_update(
     intent: str,
-    message: str,
+    parsed: ParsedMessage,
     memory: dict[str, Any],
     planner: PlannerFrame,
 ) -> MemoryUpdate:
-    topics = _extract_message_topics(message)
+    topics = _extract_message_topics(parsed)
     unresolved_fields: list[str] = []
     for item in planner.get("clarifications", []):
         field = str(item.get("field", "")).strip().lower()
@@ -958,50 +1137,290 @@ def _build_memory_update(
     }
 
 
+# Quick-suggestion commands the client echoes back verbatim, plus bare
+# greetings/affirmations.
+_ALL_SUGGESTION_SPECS = (*_OVERLAY_SUGGESTIONS, *itertools.chain.from_iterable(_SUGGESTIONS_BY_INTENT.values()))
+CANNED_COMMANDS: tuple[str, ...] = tuple(dict.fromkeys(spec[1] for spec in _ALL_SUGGESTION_SPECS if not spec[3]))
+# Suggestions that embed the adaptive focus length ("{m}"); precomputed for
+# the durations clients actually send, other lengths take the normal path.
+CANNED_FOCUS_COMMANDS: tuple[str, ...] = tuple(dict.fromkeys(spec[1] for spec in _ALL_SUGGESTION_SPECS if spec[3]))
+CANNED_FOCUS_MINUTES: tuple[int, ...] = (10, 15, 20, 25, 30, 45, 50, 60, 90, 120)
+CANNED_SHORT_REPLIES: tuple[str, ...] = (
+    "halo", "hai", "hi", "hello", "hey", "halo z ai",
+    "oke", "ok", "siap", "gas", "lanjut", "deal", "sip", "mantap", "yuk",
+    "oke lanjut", "siap gas", "oke gas", "ok lanjut", "sip lanjut",
+)
+
+
+class _CannedResponse(NamedTuple):
+    """Hint-independent part of the payload for one exact message."""
+
+    parsed: ParsedMessage
+    intent: str
+    partner_label: str
+    domain: str
+    reply: str  # pick_response() before the adaptive follow-up
+    planner: PlannerFrame  # planner without a planner hint
+
+
+def _copy_planner(planner: PlannerFrame) -> PlannerFrame:
+    return {
+        **planner,
+        "clarifications": [dict(item) for item in planner["clarifications"]],
+        "actions": [{**action, "missing": list(action["missing"])} for action in planner["actions"]],
+        "segments": list(planner["segments"]),
+    }
+
+
+def _build_canned_response(message: str) -> _CannedResponse | None:
+    # Only rule-matched messages: a neural guess depends on runtime config.
+    intent = DEFAULT_RULE_ENGINE.first_match(message)
+    if not intent:
+        return None
+    parsed = ParsedMessage(message)
+    # Fill the cached properties now so shared instances are never written later.
+    parsed.focus_minutes, parsed.deadline_fragment, parsed.has_deadline_signal
+    context = _build_context(parsed, intent, {})
+    return _CannedResponse(
+        parsed=parsed,
+        intent=intent,
+        partner_label=context["partner_label"],
+        domain=context["domain"],
+        reply=pick_response(intent, message, context),
+        # Memory only reaches the planner for fallback, which rules never return.
+        planner=_build_planner(message, intent, {}, None, parsed),
+    )
+
+
+# Entries are built the first time each message arrives, so a cold start
+# only pays for the commands it actually receives.
+_CANNED_MESSAGES: frozenset[str] = frozenset(
+    normalize_message(raw)[:MAX_MESSAGE_LEN]
+    for raw in (
+        *CANNED_COMMANDS,
+        *(template.replace("{m}", str(minutes)) for template in CANNED_FOCUS_COMMANDS for minutes in CANNED_FOCUS_MINUTES),
+        *CANNED_SHORT_REPLIES,
+        *(text.capitalize() for text in CANNED_SHORT_REPLIES),
+    )
+) - {""}
+_CANNED_RESPONSES: dict[str, _CannedResponse | None] = {}
+
+
+def _canned_response(message: str) -> _CannedResponse | None:
+    if message not in _CANNED_MESSAGES:
+        return None
+    if message in _CANNED_RESPONSES:
+        return _CANNED_RESPONSES[message]
+    entry = _CANNED_RESPONSES[message] = _build_canned_response(message)
+    return entry
+
+
+def parse_message(message: str) -> ParsedMessage:
+    """ParsedMessage for a normalized message, reusing the canned entry's when there is one."""
+    canned = _canned_response(message)
+    return canned.parsed if canned is not None else ParsedMessage(message)
+
+
+def warm_canned_responses() -> int:
+    """Build every canned entry up front (long-lived workers); returns how many apply."""
+    return sum(_canned_response(message) is not None for message in _CANNED_MESSAGES)
+
+
 def process_message_payload(
     raw_message: str,
     context_hint: dict | None = None,
     memory_hint: dict | None = None,
     planner_hint: dict | None = None,
+    timer: StageTimer = NULL_TIMER,
+    parsed: ParsedMessage | None = None,
+) -> dict:
+    """Build the chatbot reply payload for one message.
+
+    Pass a StageTimer to get per-stage milliseconds (parse, rules, neural,
+    context, planner, reply, memory, suggestions); the default is a no-op.
+    ``parsed`` is a parse_message result the caller already has; it is used
+    when its text is the normalized message.
+    """
+    timer.skip()
+    return _process_message(
+        raw_message, _normalize_context_hint(context_hint), _normalize_memory_hint(memory_hint), planner_hint, timer, parsed
+    )
+
+
+def _process_message(
+    raw_message: str,
+    hint: dict[str, Any],
+    memory: dict[str, Any],
+    planner_hint: dict | None,
+    timer: StageTimer,
+    parsed: ParsedMessage | None = None,
 ) -> dict:
+    """process_message_payload for context and memory hints that are already normalized."""
     message = normalize_message(raw_message)[:MAX_MESSAGE_LEN]
-    hint = _normalize_context_hint(context_hint)
-    memory = _normalize_memory_hint(memory_hint)
+    canned = _canned_response(message)
+    if canned is not None:
+        parsed = canned.parsed
+    elif parsed is None or parsed.text != message:
+        parsed = ParsedMessage(message)
+    timer.lap("parse")
 
     if not message:
         context = {"domain": "umum", "intent": "fallback", "partner_label": "pasangan kalian", "focus_window": str(hint.get("focus_window", "any"))}
-        adaptive = _infer_adaptive_profile("", context, hint)
+        adaptive = _infer_adaptive_profile(parsed, context, hint)
+        timer.lap("context")
         planner = _build_planner("", "fallback", memory, planner_hint)
+        timer.lap("planner")
         reply = pick_response("fallback", "", context)
-        memory_update = _build_memory_update("fallback", "", memory, planner)
+        timer.lap("reply")
+        memory_update = _build_memory_update("fallback", parsed, memory, planner)
+        timer.lap("memory")
+        suggestions = _build_quick_suggestions("fallback", context, adaptive, hint, memory, planner)
+        timer.lap("suggestions")
         return {
             "reply": reply[:MAX_REPLY_LEN].strip(),
             "intent": "fallback",
             "planner": planner,
-            "suggestions": _build_quick_suggestions("fallback", context, adaptive, hint, memory, planner),
+            "suggestions": suggestions,
             "adaptive": adaptive,
             "memory_update": memory_update,
         }
 
-    intent = detect_intent(message)
-    context = _build_context(message, intent, hint)
-    adaptive = _infer_adaptive_profile(message, context, hint)
-    planner = _build_planner(message, intent, memory, planner_hint)
-
-    reply = pick_response(intent, message, context)
-    reply = _apply_adaptive_followup(intent, message, reply, context, adaptive, memory, planner)
-    memory_update = _build_memory_update(intent, message, memory, planner)
+    if canned is not None:
+        # Exact canned command: only the hint-dependent stages run.
+        intent = canned.intent
+        context = {
+            "partner_label": canned.partner_label,
+            "domain": canned.domain,
+            "intent": intent,
+            "focus_window": str(hint.get("focus_window", "any")),
+        }
+        adaptive = _infer_adaptive_profile(parsed, context, hint)
+        timer.lap("context")
+        if isinstance(planner_hint, dict):
+            planner = _build_planner(message, intent, memory, planner_hint, parsed)
+        else:
+            planner = _copy_planner(canned.planner)
+        timer.lap("planner")
+        reply = canned.reply
+    else:
+        intent = detect_intent(message, timer=timer)
+        timer.skip()
+        context = _build_context(parsed, intent, hint)
+        adaptive = _infer_adaptive_profile(parsed, context, hint)
+        timer.lap("context")
+        planner = _build_planner(message, intent, memory, planner_hint, parsed)
+        timer.lap("planner")
+        reply = pick_response(intent, message, context)
+
+    reply = _apply_adaptive_followup(intent, parsed, reply, context, adaptive, memory, planner)
+    timer.lap("reply")
+    memory_update = _build_memory_update(intent, parsed, memory, planner)
+    timer.lap("memory")
+    suggestions = _build_quick_suggestions(intent, context, adaptive, hint, memory, planner)
+    timer.lap("suggestions")
 
     return {
         "reply": reply[:MAX_REPLY_LEN].strip(),
         "intent": intent,
         "planner": planner,
-        "suggestions": _build_quick_suggestions(intent, context, adaptive, hint, memory, planner),
+        "suggestions": suggestions,
         "adaptive": adaptive,
         "memory_update": memory_update,
     }
 
 
+def _copy_memory(memory: MemoryUpdate) -> MemoryUpdate:
+    return {key: list(value) if isinstance(value, list) else value for key, value in memory.items()}
+
+
+def process_session_message(
+    session_id: str,
+    raw_message: str,
+    context_hint: dict | None = None,
+    memory_hint: dict | None = None,
+    planner_hint: dict | None = None,
+    store: SessionStore | None = None,
+    timer: StageTimer = NULL_TIMER,
+    parsed: ParsedMessage | None = None,
+) -> dict:
+    """process_message_payload with the hints kept server-side under ``session_id``.
+
+    Hint fields sent with the request override the stored ones (a client can
+    send just ``{"pending_tasks": 3}`` as memory); stored hints are already
+    normalized and used as they are. Afterwards the session keeps the context
+    hint, the memory_update and, for one follow-up turn, a planner that asked
+    for clarification. ``store`` defaults to the CHATBOT_SESSION_STORE store;
+    with sessions off this is process_message_payload.
+    """
+    if store is None:
+        store = default_session_store()
+        if store is None:
+            return process_message_payload(raw_message, context_hint, memory_hint, planner_hint, timer=timer, parsed=parsed)
+    timer.skip()
+    state = store.get(session_id) or SessionState(None, None, None)
+    hint = state.context
+    if hint is None or isinstance(context_hint, dict):
+        hint = _normalize_context_hint({**(hint or {}), **context_hint} if isinstance(context_hint, dict) else hint)
+    memory = state.memory
+    if memory is None or isinstance(memory_hint, dict):
+        memory = _normalize_memory_hint({**(memory or {}), **memory_hint} if isinstance(memory_hint, dict) else memory)
+    planner_in = planner_hint if isinstance(planner_hint, dict) else state.planner
+    timer.lap("session")
+
+    payload = _process_message(raw_message, hint, memory, planner_in, timer, parsed)
+
+    planner = payload["planner"]
+    # Same rule as replay_transcripts --planner-feedback clarify: a plan that
+    # was itself carried over is not carried again.
+    carried = _copy_planner(planner) if planner_in is None and planner.get("requires_clarification") else None
+    store.put(session_id, SessionState(hint, _copy_memory(payload["memory_update"]), carried))
+    timer.lap("session")
+    return payload
+
+
+def process_message_batch(items: list[Any], timer: StageTimer = NULL_TIMER) -> list[dict]:
+    """Run process_message_payload over a batch, keeping input order.
+
+    Invalid items yield ``{"error": ...}`` in place instead of failing the batch.
+    Items with a ``session_id`` go through process_session_message, in order.
+    Stage timings of all items accumulate in ``timer``.
+    """
+    batch = list(items[:MAX_BATCH_ITEMS]) if isinstance(items, list) else []
+    messages = [
+        normalize_message(item.get("message"))[:MAX_MESSAGE_LEN]
+        for item in batch
+        if isinstance(item, dict) and isinstance(item.get("message"), str)
+    ]
+    timer.skip()
+    prefetch_neural_embeddings(messages)
+    timer.lap("neural")
+
+    results: list[dict] = []
+    for item in batch:
+        if not isinstance(item, dict):
+            results.append({"error": "item must be an object"})
+            continue
+        message = item.get("message")
+        if not isinstance(message, str) or not message.strip():
+            results.append({"error": "message is required"})
+            continue
+        context = item.get("context") if isinstance(item.get("context"), dict) else None
+        memory = item.get("memory") if isinstance(item.get("memory"), dict) else None
+        planner = item.get("planner") if isinstance(item.get("planner"), dict) else None
+        session_id = item.get("session_id")
+        if session_id is not None and not valid_session_id(session_id):
+            results.append({"error": "invalid session_id"})
+            continue
+        try:
+            if session_id is not None:
+                results.append(process_session_message(session_id, message, context, memory, planner, timer=timer))
+            else:
+                results.append(process_message_payload(message, context, memory, planner, timer=timer))
+        except Exception:
+            results.append({"error": "processing_failed"})
+    return results
+
+
 def process_message(raw_message: str) -> str:
     payload = process_message_payload(raw_message)
     return str(payload.get("reply", "")).strip()
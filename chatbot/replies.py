@@ -0,0 +1,55 @@
+"""Chat request bodies to response bodies, shared by the Python endpoints.
+
+``api/chat.py`` answers single messages with ``chat_reply``; the combined
+``api/assistant_turn.py`` endpoint calls it next to the brain decision.
+"""
+
+from __future__ import annotations
+
+from chatbot.processor import ParsedMessage, process_message_payload, process_session_message
+from chatbot.sessions import valid_session_id
+from chatbot.timing import NULL_TIMER, StageTimer
+
+
+def shape_result(result: dict) -> dict:
+    reply = str(result.get("reply", "")).strip()
+    suggestions = result.get("suggestions")
+    intent = str(result.get("intent", "")).strip()
+    adaptive = result.get("adaptive")
+    planner_out = result.get("planner")
+    memory_update = result.get("memory_update")
+
+    payload_out = {"reply": reply}
+    if isinstance(suggestions, list):
+        payload_out["suggestions"] = suggestions[:4]
+    if intent:
+        payload_out["intent"] = intent
+    if isinstance(adaptive, dict):
+        payload_out["adaptive"] = adaptive
+    if isinstance(planner_out, dict):
+        payload_out["planner"] = planner_out
+    if isinstance(memory_update, dict):
+        payload_out["memory_update"] = memory_update
+    return payload_out
+
+
+def chat_reply(payload: dict, timer: StageTimer = NULL_TIMER, parsed: ParsedMessage | None = None) -> tuple[int, dict]:
+    """(status, body) for a single-message chat request body; ``parsed`` as for process_message_payload."""
+    message = payload.get("message")
+    if not isinstance(message, str) or not message.strip():
+        return 400, {"error": "message is required"}
+
+    session_id = payload.get("session_id")
+    if session_id is not None and not valid_session_id(session_id):
+        return 400, {"error": "invalid session_id"}
+
+    context = payload.get("context") if isinstance(payload.get("context"), dict) else None
+    memory = payload.get("memory") if isinstance(payload.get("memory"), dict) else None
+    planner = payload.get("planner") if isinstance(payload.get("planner"), dict) else None
+    if session_id is not None:
+        result = process_session_message(session_id, message, context, memory, planner, timer=timer, parsed=parsed)
+    else:
+        result = process_message_payload(message, context, memory, planner, timer=timer, parsed=parsed)
+    body = shape_result(result)
+    timer.lap("shape")
+    return 200, body
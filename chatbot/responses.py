@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import hashlib
 from typing import Mapping
 
 
@@ -91,6 +90,8 @@ RESPONSE_TEMPLATES = {
 
 
 def _stable_index(seed: str, size: int) -> int:
+    import hashlib  # deferred: not needed until the first reply
+
     # Stable hashing keeps response variation deterministic and stateless.
     digest = hashlib.md5(seed.encode("utf-8")).hexdigest()
     return int(digest[:8], 16) % max(size, 1)
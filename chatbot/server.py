@@ -0,0 +1,378 @@
+"""Long-lived asyncio HTTP server for the Python chatbot and brain endpoints.
+
+Usage: python -m chatbot.server [--host 127.0.0.1] [--port 8787] [--workers 4] [--pool process|thread]
+
+Serves the same routes as the Vercel functions by running the unchanged
+``api/chat.py``, ``api/assistant_brain.py`` and ``api/assistant_turn.py``
+handler classes, so auth headers, body limits and responses are identical. The event loop only does
+socket I/O; each request's handler (rule matching, planner, JSON) runs on a
+worker pool whose processes or threads keep their caches warm between requests.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import io
+import json
+import os
+import signal
+import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from email.message import Message
+from http import HTTPStatus
+from multiprocessing import get_context
+from typing import Iterable
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+API_MODULES = {"chat": "chat.py", "brain": "assistant_brain.py", "turn": "assistant_turn.py"}
+MAX_HEAD_BYTES = 16 * 1024
+MAX_HEADERS = 100
+DEFAULT_MAX_BODY_BYTES = 96 * 1024
+DEFAULT_IDLE_TIMEOUT_S = 15.0
+DEFAULT_GRACE_S = 10.0
+
+_LOADED_MODULES: dict[str, object] = {}
+_LOAD_LOCK = threading.Lock()
+
+
+def load_api_module(route: str):
+    """Import one api/*.py handler module once per process."""
+    module = _LOADED_MODULES.get(route)
+    if module is not None:
+        return module
+    with _LOAD_LOCK:
+        module = _LOADED_MODULES.get(route)
+        if module is None:
+            if ROOT not in sys.path:
+                sys.path.insert(0, ROOT)
+            spec = importlib.util.spec_from_file_location(f"api_{route}", os.path.join(ROOT, "api", API_MODULES[route]))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _LOADED_MODULES[route] = module
+    return module
+
+
+def route_for(path: str) -> str | None:
+    for route in API_MODULES:
+        if path in load_api_module(route).ALLOWED_PATHS:
+            return route
+    return None
+
+
+def run_handler(
+    handler_cls,
+    method: str,
+    path: str,
+    body: bytes = b"",
+    headers: Iterable[tuple[str, str]] | dict[str, str] = (),
+) -> bytes:
+    """Run one request through a BaseHTTPRequestHandler subclass without a socket.
+
+    Returns the raw HTTP response (status line, headers and body).
+    """
+    request = handler_cls.__new__(handler_cls)
+    message = Message()
+    pairs = headers.items() if isinstance(headers, dict) else headers
+    has_length = False
+    for key, value in pairs:
+        message[key] = value
+        has_length = has_length or key.lower() == "content-length"
+    if not has_length:
+        message["Content-Length"] = str(len(body))
+    request.headers = message
+    request.rfile = io.BytesIO(body)
+    request.wfile = io.BytesIO()
+    request.command = method
+    request.path = path
+    request.request_version = "HTTP/1.1"
+    request.protocol_version = "HTTP/1.1"
+    request.requestline = f"{method} {path} HTTP/1.1"
+    request.client_address = ("127.0.0.1", 0)
+    # Connection handling belongs to the caller; the handler only asks to
+    # close (and says so in a header) when the request could not be framed.
+    request.close_connection = False
+    getattr(request, f"do_{method}")()
+    return request.wfile.getvalue()
+
+
+def parse_response(raw: bytes) -> tuple[int, dict[str, str], bytes]:
+    """Split a raw response from run_handler into (status, headers, body)."""
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    lines = head.decode("iso-8859-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    response_headers = {}
+    for line in lines[1:]:
+        key, _, value = line.partition(":")
+        response_headers[key.strip()] = value.strip()
+    return status, response_headers, payload
+
+
+def handle_request(route: str, method: str, path: str, headers: tuple[tuple[str, str], ...], body: bytes) -> bytes:
+    """Worker-pool entry point: one request in, one raw response out."""
+    return run_handler(load_api_module(route).handler, method, path, body, headers)
+
+
+def warm_worker() -> None:
+    for route in API_MODULES:
+        load_api_module(route)
+    # Serverless cold starts build these lazily; a long-lived worker pays once up front.
+    from chatbot.intents import warm_intent_rules
+    from chatbot.processor import warm_canned_responses
+
+    warm_intent_rules()
+    warm_canned_responses()
+
+
+def _warm_process_worker() -> None:
+    # Ctrl+C reaches the whole process group; only the parent should react.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    warm_worker()
+
+
+def _json_response(status: int, payload: dict, close: bool = False) -> bytes:
+    body = json.dumps(payload, ensure_ascii=True).encode("utf-8")
+    head = [
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+        "Content-Type: application/json; charset=utf-8",
+        "Cache-Control: no-store",
+        f"Content-Length: {len(body)}",
+    ]
+    if close:
+        head.append("Connection: close")
+    return ("\r\n".join(head) + "\r\n\r\n").encode("ascii") + body
+
+
+def _with_connection_close(raw: bytes) -> bytes:
+    status_line, sep, rest = raw.partition(b"\r\n")
+    return status_line + sep + b"Connection: close\r\n" + rest
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class ChatbotServer:
+    """Accepts HTTP/1.1 connections and hands each request to the worker pool."""
+
+    def __init__(
+        self,
+        executor: Executor,
+        host: str = "127.0.0.1",
+        port: int = 8787,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+        idle_timeout_s: float = DEFAULT_IDLE_TIMEOUT_S,
+    ) -> None:
+        self.executor = executor
+        self.host = host
+        self.port = port
+        self.max_body_bytes = max_body_bytes
+        self.idle_timeout_s = idle_timeout_s
+        self.closing = False
+        self._server: asyncio.base_events.Server | None = None
+        self._busy: dict[asyncio.Task, bool] = {}
+        self._drained = asyncio.Event()
+        self._drained.set()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._on_client, self.host, self.port, limit=MAX_HEAD_BYTES)
+        sockets = self._server.sockets or []
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> tuple[str, str, str, list[tuple[str, str]], int]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError as exc:
+            raise _BadRequest(431, "Request headers too large") from exc
+        lines = head.decode("iso-8859-1").split("\r\n")
+        parts = lines[0].split(" ")
+        if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+            raise _BadRequest(400, "Bad request line")
+        method, target, version = parts
+
+        headers: list[tuple[str, str]] = []
+        for line in lines[1:]:
+            if not line:
+                continue
+            key, sep, value = line.partition(":")
+            if not sep or not key.strip():
+                raise _BadRequest(400, "Bad header line")
+            headers.append((key.strip(), value.strip()))
+        if len(headers) > MAX_HEADERS:
+            raise _BadRequest(431, "Too many headers")
+
+        lowered = {key.lower(): value for key, value in headers}
+        if "transfer-encoding" in lowered:
+            raise _BadRequest(411, "Content-Length required")
+        try:
+            length = int(lowered.get("content-length", "0") or "0")
+        except ValueError as exc:
+            raise _BadRequest(400, "Bad Content-Length") from exc
+        if length < 0:
+            raise _BadRequest(400, "Bad Content-Length")
+        return method, target, version, headers, length
+
+    def _keep_alive(self, version: str, headers: list[tuple[str, str]]) -> bool:
+        connection = next((value.lower() for key, value in headers if key.lower() == "connection"), "")
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    async def _on_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._busy[task] = False
+        loop = asyncio.get_running_loop()
+        try:
+            while not self.closing:
+                try:
+                    method, target, version, headers, length = await asyncio.wait_for(
+                        self._read_request(reader), self.idle_timeout_s
+                    )
+                except _BadRequest as exc:
+                    writer.write(_json_response(exc.status, {"error": str(exc)}, close=True))
+                    await writer.drain()
+                    return
+
+                self._busy[task] = True
+                self._drained.clear()
+                try:
+                    if length > self.max_body_bytes:
+                        # The body is never read, so the connection cannot be reused.
+                        writer.write(_json_response(413, {"error": "Payload too large"}, close=True))
+                        await writer.drain()
+                        return
+                    body = await asyncio.wait_for(reader.readexactly(length), self.idle_timeout_s) if length else b""
+
+                    path = target.split("?", 1)[0]
+                    route = route_for(path)
+                    if route is None:
+                        raw = _json_response(404, {"error": "Not Found"})
+                    elif method not in {"GET", "POST"}:
+                        raw = _json_response(405, {"error": "Method Not Allowed"})
+                    else:
+                        raw = await loop.run_in_executor(
+                            self.executor, handle_request, route, method, target, tuple(headers), body
+                        )
+
+                    keep_alive = self._keep_alive(version, headers) and not self.closing
+                    writer.write(raw if keep_alive else _with_connection_close(raw))
+                    await writer.drain()
+                    if not keep_alive:
+                        return
+                finally:
+                    self._busy[task] = False
+                    if not any(self._busy.values()):
+                        self._drained.set()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            return
+        except asyncio.CancelledError:
+            return
+        except Exception:
+            if not writer.is_closing():
+                writer.write(_json_response(500, {"error": "Internal Server Error"}, close=True))
+        finally:
+            self._busy.pop(task, None)
+            if not any(self._busy.values()):
+                self._drained.set()
+            writer.close()
+
+    async def shutdown(self, grace_s: float = DEFAULT_GRACE_S) -> None:
+        """Stop accepting, let in-flight requests finish (up to ``grace_s``), then stop the pool."""
+        self.closing = True
+        if self._server is not None:
+            self._server.close()
+
+        # Idle keep-alive connections are only waiting for a next request.
+        for task, busy in list(self._busy.items()):
+            if not busy:
+                task.cancel()
+        try:
+            await asyncio.wait_for(self._drained.wait(), grace_s)
+        except asyncio.TimeoutError:
+            pass
+        for task in list(self._busy):
+            task.cancel()
+        if self._busy:
+            await asyncio.gather(*self._busy, return_exceptions=True)
+
+        await asyncio.to_thread(self.executor.shutdown, wait=True, cancel_futures=True)
+
+
+def build_executor(pool: str, workers: int) -> Executor:
+    workers = max(1, int(workers))
+    if pool == "thread":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chatbot-worker", initializer=warm_worker)
+    # spawn: never fork a process that already runs an event loop and threads.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"), initializer=_warm_process_worker)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    executor = build_executor(args.pool, args.workers)
+    server = ChatbotServer(
+        executor,
+        host=args.host,
+        port=args.port,
+        max_body_bytes=args.max_body_bytes,
+        idle_timeout_s=args.idle_timeout_s,
+    )
+    # The parent needs the route tables; filling the pool before accepting
+    # keeps the first requests from paying for imports.
+    warm_worker()
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(executor, warm_worker) for _ in range(args.workers)))
+    await server.start()
+    print(f"chatbot server listening on http://{server.host}:{server.port} ({args.pool} pool x{args.workers})", flush=True)
+
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):  # pragma: no cover - Windows
+            pass
+    await stop.wait()
+    print("shutting down: draining in-flight requests", flush=True)
+    await server.shutdown(args.grace_s)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(str(os.getenv(name, "")).strip() or default)
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(str(os.getenv(name, "")).strip() or default)
+    except ValueError:
+        return default
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=os.getenv("CHATBOT_SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=_env_int("CHATBOT_SERVER_PORT", 8787))
+    parser.add_argument("--workers", type=int, default=_env_int("CHATBOT_SERVER_WORKERS", min(4, os.cpu_count() or 1)))
+    parser.add_argument("--pool", choices=("process", "thread"), default=os.getenv("CHATBOT_SERVER_POOL", "process"))
+    parser.add_argument("--max-body-bytes", type=int, default=_env_int("CHATBOT_SERVER_MAX_BODY_BYTES", DEFAULT_MAX_BODY_BYTES))
+    parser.add_argument("--idle-timeout-s", type=float, default=_env_float("CHATBOT_SERVER_IDLE_TIMEOUT_S", DEFAULT_IDLE_TIMEOUT_S))
+    parser.add_argument("--grace-s", type=float, default=_env_float("CHATBOT_SERVER_GRACE_S", DEFAULT_GRACE_S))
+    args = parser.parse_args(argv)
+    args.workers = max(1, args.workers)
+    asyncio.run(serve(args))
+    return 0
+
+
+if __name__ == "__main__":
+    # Re-enter through the package module so worker-pool callables pickle as
+    # chatbot.server.* rather than __main__.*.
+    sys.path.insert(0, ROOT)
+    from chatbot import server as _server
+
+    sys.exit(_server.main())
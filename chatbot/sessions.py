@@ -0,0 +1,275 @@
+"""Server-side session state for the chatbot (memory, context hint, pending planner).
+
+With a ``session_id`` the client no longer echoes ``memory_update`` and its
+hints back on every turn: the processor loads the state here, runs the turn
+and stores the result. Two backends: an in-process LRU (one worker) and
+SQLite (several worker processes sharing one file). Both expire sessions
+``ttl_s`` seconds after their last update and keep at most ``max_sessions``.
+
+Sessions are off unless CHATBOT_SESSION_STORE selects a backend. Session ids
+are chosen by the client and not bound to an authenticated user, so anyone
+who knows an id can continue that conversation; enable a store only where
+callers are trusted (e.g. behind the shared secret). Neither backend is
+shared across hosts: on serverless deployments (Vercel) every instance has
+its own store and a turn routed to another instance starts from empty state.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple
+
+# sqlite3 and tempfile load with the SQLite store; the in-process store and
+# sessionless requests never need them.
+
+DEFAULT_TTL_S = 6 * 3600.0
+DEFAULT_MAX_SESSIONS = 10000
+MAX_SESSION_ID_LEN = 128
+_SESSION_ID_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_.:")
+
+
+class SessionState(NamedTuple):
+    """Normalized hints carried between turns; the store owns these objects, callers must not mutate them."""
+
+    context: dict[str, Any] | None
+    memory: dict[str, Any] | None
+    planner: dict[str, Any] | None
+
+
+def valid_session_id(raw: Any) -> bool:
+    return isinstance(raw, str) and 0 < len(raw) <= MAX_SESSION_ID_LEN and _SESSION_ID_CHARS.issuperset(raw)
+
+
+class MemorySessionStore:
+    """Thread-safe in-process LRU of session states with a TTL and a hard size cap."""
+
+    backend = "memory"
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, ttl_s: float = DEFAULT_TTL_S) -> None:
+        self.max_sessions = max(1, int(max_sessions))
+        self.ttl_s = max(0.0, float(ttl_s))
+        self._items: OrderedDict[str, tuple[float, SessionState]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, session_id: str) -> SessionState | None:
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(session_id)
+            if item is None:
+                self.misses += 1
+                return None
+            stored_at, state = item
+            if self.ttl_s and now - stored_at > self.ttl_s:
+                del self._items[session_id]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._items.move_to_end(session_id)
+            self.hits += 1
+            return state
+
+    def put(self, session_id: str, state: SessionState) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._items[session_id] = (now, state)
+            self._items.move_to_end(session_id)
+            # Least recently used first, which is also the oldest update.
+            while self._items:
+                oldest_id, (stored_at, _) = next(iter(self._items.items()))
+                if len(self._items) > self.max_sessions:
+                    self.evictions += 1
+                elif self.ttl_s and now - stored_at > self.ttl_s:
+                    self.expirations += 1
+                else:
+                    break
+                del self._items[oldest_id]
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._items.pop(session_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.backend,
+                "size": len(self._items),
+                "max_sessions": self.max_sessions,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SQLiteSessionStore:
+    """Session states in one SQLite file, shared by every worker process on the host.
+
+    Each thread gets its own connection (WAL mode, so readers never wait for a
+    writer). Expired rows are ignored on read and purged, together with the
+    least recently updated rows beyond ``max_sessions``, every
+    ``purge_every`` writes in a process.
+    """
+
+    backend = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        ttl_s: float = DEFAULT_TTL_S,
+        purge_every: int = 64,
+    ) -> None:
+        self.path = path
+        self.max_sessions = max(1, int(max_sessions))
+        self.ttl_s = max(0.0, float(ttl_s))
+        self.purge_every = max(1, int(purge_every))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS chatbot_sessions ("
+            "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._connect().execute("CREATE INDEX IF NOT EXISTS chatbot_sessions_updated ON chatbot_sessions (updated_at)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3
+
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _expired_before(self) -> float:
+        return time.time() - self.ttl_s if self.ttl_s else float("-inf")
+
+    def get(self, session_id: str) -> SessionState | None:
+        row = self._connect().execute(
+            "SELECT state FROM chatbot_sessions WHERE session_id = ? AND updated_at >= ?",
+            (session_id, self._expired_before()),
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        try:
+            context, memory, planner = json.loads(row[0])
+        except (ValueError, TypeError):
+            return None
+        return SessionState(context, memory, planner)
+
+    def put(self, session_id: str, state: SessionState) -> None:
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO chatbot_sessions (session_id, state, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+            (session_id, json.dumps(list(state), ensure_ascii=False, separators=(",", ":")), time.time()),
+        )
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % self.purge_every == 0
+        if purge:
+            self.purge()
+
+    def purge(self) -> None:
+        conn = self._connect()
+        conn.execute("DELETE FROM chatbot_sessions WHERE updated_at < ?", (self._expired_before(),))
+        conn.execute(
+            "DELETE FROM chatbot_sessions WHERE session_id IN ("
+            "SELECT session_id FROM chatbot_sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,),
+        )
+
+    def delete(self, session_id: str) -> None:
+        self._connect().execute("DELETE FROM chatbot_sessions WHERE session_id = ?", (session_id,))
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM chatbot_sessions")
+
+    def stats(self) -> dict[str, Any]:
+        size = self._connect().execute(
+            "SELECT COUNT(*) FROM chatbot_sessions WHERE updated_at >= ?", (self._expired_before(),)
+        ).fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.backend,
+                "size": size,
+                "max_sessions": self.max_sessions,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+SessionStore = MemorySessionStore | SQLiteSessionStore
+
+_DEFAULT_STORE: SessionStore | None = None
+_DEFAULT_STORE_READY = False
+_DEFAULT_STORE_LOCK = threading.Lock()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(str(os.getenv(name, "")).strip() or default)
+    except ValueError:
+        return default
+
+
+def session_store_from_env() -> SessionStore | None:
+    """Build the store selected by CHATBOT_SESSION_STORE (memory | sqlite | off)."""
+    backend = str(os.getenv("CHATBOT_SESSION_STORE", "off")).strip().lower()
+    if backend in {"", "off", "none", "false", "0"}:
+        return None
+    max_sessions = int(max(1.0, _env_float("CHATBOT_SESSION_MAX", DEFAULT_MAX_SESSIONS)))
+    ttl_s = max(0.0, _env_float("CHATBOT_SESSION_TTL_S", DEFAULT_TTL_S))
+    if backend == "sqlite":
+        path = str(os.getenv("CHATBOT_SESSION_DB", "")).strip()
+        if not path:
+            import tempfile
+
+            path = os.path.join(tempfile.gettempdir(), "chatbot_sessions.sqlite3")
+        return SQLiteSessionStore(path, max_sessions=max_sessions, ttl_s=ttl_s)
+    return MemorySessionStore(max_sessions=max_sessions, ttl_s=ttl_s)
+
+
+def default_session_store() -> SessionStore | None:
+    """Process-wide store from the environment, created on first use; None when disabled."""
+    global _DEFAULT_STORE, _DEFAULT_STORE_READY
+    if not _DEFAULT_STORE_READY:
+        with _DEFAULT_STORE_LOCK:
+            if not _DEFAULT_STORE_READY:
+                _DEFAULT_STORE = session_store_from_env()
+                _DEFAULT_STORE_READY = True
+    return _DEFAULT_STORE
+
+
+def session_store_stats() -> dict[str, Any]:
+    """Stats of the default store without creating it (a health check must stay cheap)."""
+    if not _DEFAULT_STORE_READY:
+        return {"backend": "not_started"}
+    if _DEFAULT_STORE is None:
+        return {"backend": "off"}
+    return _DEFAULT_STORE.stats()
@@ -0,0 +1,233 @@
+"""Shared date/time expression parsing for the chatbot and the assistant brain."""
+
+from __future__ import annotations
+
+import re
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+
+from chatbot.lazy import LazyPattern
+
+
+MONTH_WORD_PATTERN = (
+    r"(?:jan(?:uari)?|january|"
+    r"feb(?:ruari|ruary)?|febuari|pebruari|"
+    r"mar(?:et|ch)?|apr(?:il)?|mei|may|"
+    r"jun(?:i|e)?|jul(?:i|y)?|"
+    r"agu(?:stus)?|ags|agt|aug(?:ust)?|"
+    r"sep(?:t(?:ember)?)?|"
+    r"okt(?:ober)?|oct(?:ober)?|"
+    r"nov(?:ember)?|"
+    r"des(?:ember)?|dec(?:ember)?)"
+)
+MONTH_NUMBERS = {
+    "jan": 1, "feb": 2, "peb": 2, "mar": 3, "apr": 4, "mei": 5, "may": 5, "jun": 6, "jul": 7,
+    "agu": 8, "ags": 8, "agt": 8, "aug": 8, "sep": 9, "okt": 10, "oct": 10, "nov": 11, "des": 12, "dec": 12,
+}
+RELATIVE_DAY_OFFSETS = (
+    # Checked in this order, so "besok atau lusa" resolves to lusa.
+    (("lusa", "day after tomorrow"), 2),
+    (("besok", "tomorrow"), 1),
+    (("hari ini", "today"), 0),
+)
+FRAGMENT_PRIORITY = ("iso", "day_month", "month_day", "dmy", "relative", "time")
+
+# Every alternative sits inside one lookahead, so a single finditer visits each
+# position once and records which kind starts there. Alternatives are ordered by
+# FRAGMENT_PRIORITY: when two kinds start at the same position the higher one
+# wins, which is exactly the one a kind-by-kind search would have returned.
+_TEMPORAL_SCAN = LazyPattern(
+    r"(?="
+    r"\b(?P<iso>\d{4}-\d{2}-\d{2}(?:\s+\d{1,2}:\d{2})?)\b|"
+    rf"\b(?P<day_month>(?:tanggal\s*)?\d{{1,2}}\s*(?:[\/.,-]\s*)?{MONTH_WORD_PATTERN}(?:\s+\d{{4}})?)\b|"
+    rf"\b(?P<month_day>{MONTH_WORD_PATTERN}\s+\d{{1,2}}(?!:)(?:\s+\d{{4}})?)\b|"
+    r"\b(?P<dmy>\d{1,2}[\/.-]\d{1,2}(?:[\/.-]\d{4})?)\b|"
+    r"\b(?P<relative>(?:hari ini|today|besok|tomorrow|lusa|day after tomorrow)(?:\s+\d{1,2}:\d{2})?)\b|"
+    r"\b(?P<time>\d{1,2}:\d{2})\b"
+    r")",
+    re.IGNORECASE,
+)
+_DEADLINE_SIGNAL = LazyPattern(
+    rf"("
+    rf"\bdeadline\b|\bdue\b|\btanggal\b|"
+    rf"\bbesok\b|\blusa\b|\bhari ini\b|\btoday\b|"
+    rf"\d{{1,2}}:\d{{2}}|\d{{4}}-\d{{2}}-\d{{2}}|"
+    rf"\d{{1,2}}[\/.-]\d{{1,2}}(?:[\/.-]\d{{4}})?|"
+    rf"(?:tanggal\s*)?\d{{1,2}}\s*(?:[\/.,-]\s*)?{MONTH_WORD_PATTERN}\b|"
+    rf"{MONTH_WORD_PATTERN}\s+\d{{1,2}}(?!:)\b"
+    rf")",
+    re.IGNORECASE,
+)
+# Every _DEADLINE_SIGNAL alternative except these keywords needs a digit, so
+# digit-free text (most chat) only has to be checked for the keywords.
+_DEADLINE_KEYWORDS = LazyPattern(r"\b(?:deadline|due|tanggal|besok|lusa|hari ini|today)\b", re.IGNORECASE)
+_DIGIT = LazyPattern(r"\d")
+_TIME_PART = LazyPattern(r"(\d{1,2}):(\d{2})")
+_DAY_MONTH_PARTS = LazyPattern(r"(\d{1,2})\s*(?:[\/.,-]\s*)?([a-z]+)(?:\s+(\d{4}))?$")
+_MONTH_DAY_PARTS = LazyPattern(r"([a-z]+)\s+(\d{1,2})(?:\s+(\d{4}))?$")
+_DMY_PARTS = LazyPattern(r"(\d{1,2})[\/.-](\d{1,2})[\/.-](\d{4})$")
+
+
+# collections.namedtuple rather than typing.NamedTuple: the assistant brain
+# imports this module and would otherwise load typing on every cold start.
+class TemporalScan(namedtuple("TemporalScan", ("fragments", "relative_words", "has_deadline_signal"))):
+    """Date-independent view of the temporal expressions in one text.
+
+    ``fragments`` maps kind -> every occurrence in text order (read-only);
+    ``relative_words`` holds the lowercased relative day words found.
+    """
+
+    __slots__ = ()
+
+    @property
+    def kind(self) -> str:
+        for kind in FRAGMENT_PRIORITY:
+            if kind in self.fragments:
+                return kind
+        return ""
+
+    @property
+    def fragment(self) -> str:
+        kind = self.kind
+        return self.fragments[kind][0] if kind else ""
+
+
+class TemporalParse(namedtuple("TemporalParse", ("kind", "fragment", "date", "time", "has_deadline_signal"))):
+    """Temporal scan resolved against a reference date (``date`` and ``time`` may be None)."""
+
+    __slots__ = ()
+
+    def at(self, default_time: str) -> datetime | None:
+        if self.date is None:
+            return None
+        hh, mm = _valid_time(self.time) or _valid_time(default_time) or (21, 0)
+        return datetime(self.date.year, self.date.month, self.date.day, hh, mm)
+
+
+@lru_cache(maxsize=2048)
+def scan_temporal(text: str) -> TemporalScan:
+    fragments: dict[str, tuple[str, ...]] = {}
+    relative_words: set[str] = set()
+    for match in _TEMPORAL_SCAN.finditer(text):
+        kind = match.lastgroup or ""
+        value = match.group(kind).strip()
+        fragments[kind] = fragments.get(kind, ()) + (value,)
+        if kind == "relative":
+            relative_words.add(_TIME_PART.sub("", value).strip().lower())
+    return TemporalScan(
+        fragments=MappingProxyType(fragments),
+        relative_words=frozenset(relative_words),
+        has_deadline_signal=bool((_DEADLINE_SIGNAL if _DIGIT.search(text) else _DEADLINE_KEYWORDS).search(text)),
+    )
+
+
+def _valid_time(raw: str | None) -> tuple[int, int] | None:
+    hit = _TIME_PART.search(raw or "")
+    if not hit:
+        return None
+    hh, mm = int(hit.group(1)), int(hit.group(2))
+    if hh > 23 or mm > 59:
+        return None
+    return hh, mm
+
+
+def _safe_date(year: int, month: int, day: int) -> date | None:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _upcoming(month: int, day: int, reference: date) -> date | None:
+    candidate = _safe_date(reference.year, month, day)
+    if candidate is not None and candidate < reference:
+        candidate = _safe_date(reference.year + 1, month, day)
+    return candidate
+
+
+def _resolve_date(kind: str, fragment: str, reference: date) -> date | None:
+    lower = fragment.lower()
+    if kind == "iso":
+        return _safe_date(int(lower[0:4]), int(lower[5:7]), int(lower[8:10]))
+    if kind in {"day_month", "month_day"}:
+        lower = re.sub(r"^tanggal\s*", "", lower)
+        hit = (_DAY_MONTH_PARTS if kind == "day_month" else _MONTH_DAY_PARTS).search(lower)
+        if not hit:
+            return None
+        day_raw, month_raw = (hit.group(1), hit.group(2)) if kind == "day_month" else (hit.group(2), hit.group(1))
+        month = MONTH_NUMBERS.get(month_raw[:3])
+        if month is None:
+            return None
+        if hit.group(3):
+            return _safe_date(int(hit.group(3)), month, int(day_raw))
+        return _upcoming(month, int(day_raw), reference)
+    if kind == "dmy":
+        # Day/month without a four-digit year ("3.5", "12/03", "1.2.30") is too
+        # ambiguous to schedule.
+        hit = _DMY_PARTS.search(lower)
+        if not hit:
+            return None
+        year = int(hit.group(3))
+        if year < 1000:
+            return None
+        return _safe_date(year, int(hit.group(2)), int(hit.group(1)))
+    return None
+
+
+def _attached_time(text: str, fragment: str) -> str | None:
+    hit = re.search(re.escape(fragment) + r"\s+(\d{1,2}:\d{2})\b", text)
+    return _time_text(hit.group(1)) if hit else None
+
+
+def _time_text(raw: str | None) -> str | None:
+    parts = _valid_time(raw)
+    return f"{parts[0]:02d}:{parts[1]:02d}" if parts else None
+
+
+@lru_cache(maxsize=1024)
+def _parse_temporal_cached(text: str, reference: date) -> TemporalParse:
+    return _resolve_temporal(text, reference, scan_temporal(text))
+
+
+def _resolve_temporal(text: str, reference: date, scan: TemporalScan) -> TemporalParse:
+    resolved: date | None = None
+    time_text: str | None = None
+    for kind in FRAGMENT_PRIORITY[:4]:
+        for fragment in scan.fragments.get(kind, ()):
+            resolved = _resolve_date(kind, fragment, reference)
+            if resolved is not None:
+                # An explicit date only takes a time written right after it.
+                time_text = _time_text(fragment) or _attached_time(text, fragment)
+                break
+        if resolved is not None:
+            break
+
+    if resolved is None:
+        for words, offset in RELATIVE_DAY_OFFSETS:
+            if not scan.relative_words.isdisjoint(words):
+                resolved = reference + timedelta(days=offset)
+                break
+        # Relative days (and bare times) take the first valid hh:mm anywhere.
+        time_text = next(filter(None, map(_time_text, scan.fragments.get("time", ()))), None)
+
+    return TemporalParse(
+        kind=scan.kind,
+        fragment=scan.fragment,
+        date=resolved,
+        time=time_text,
+        has_deadline_signal=scan.has_deadline_signal,
+    )
+
+
+def parse_temporal(text: str, reference: date | None = None, scan: TemporalScan | None = None) -> TemporalParse:
+    """Parse ISO, d/m/y, day-month word and relative-day expressions in one scan.
+
+    Results are memoized per (text, reference date); ``reference`` defaults to today.
+    ``scan`` is ``scan_temporal(text)`` when the caller already has it (a message
+    parsed once for the chat reply and the brain) and is resolved directly.
+    """
+    if scan is not None:
+        return _resolve_temporal(str(text or ""), reference or date.today(), scan)
+    return _parse_temporal_cached(str(text or ""), reference or date.today())
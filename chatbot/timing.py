@@ -0,0 +1,63 @@
+"""Per-stage request timing for the chatbot endpoint (``Server-Timing``)."""
+
+from __future__ import annotations
+
+import re
+from time import perf_counter
+
+_METRIC_NAME_UNSAFE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class StageTimer:
+    """Accumulates wall-clock milliseconds per named stage.
+
+    ``lap(name)`` charges the time since the previous lap (or construction) to
+    ``name``; repeated stages, e.g. one per batch item, add up.
+    """
+
+    __slots__ = ("started", "_last", "stages")
+
+    def __init__(self) -> None:
+        self.started = self._last = perf_counter()
+        self.stages: dict[str, float] = {}
+
+    def lap(self, name: str) -> None:
+        now = perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + (now - self._last) * 1000.0
+        self._last = now
+
+    def skip(self) -> None:
+        """Restart the lap clock without charging the elapsed time to any stage."""
+        self._last = perf_counter()
+
+    def total_ms(self) -> float:
+        return (perf_counter() - self.started) * 1000.0
+
+    def as_dict(self) -> dict[str, float]:
+        out = {name: round(ms, 3) for name, ms in self.stages.items()}
+        out["total"] = round(self.total_ms(), 3)
+        return out
+
+    def server_timing(self) -> str:
+        return ", ".join(
+            f"{_METRIC_NAME_UNSAFE.sub('_', name)};dur={ms:.3f}" for name, ms in self.as_dict().items()
+        )
+
+
+class _NullTimer(StageTimer):
+    """Drop-in for StageTimer when timing is off: laps are no-ops."""
+
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        self.started = self._last = 0.0
+        self.stages = {}
+
+    def lap(self, name: str) -> None:
+        return
+
+    def skip(self) -> None:
+        return
+
+
+NULL_TIMER: StageTimer = _NullTimer()
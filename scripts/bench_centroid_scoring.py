@@ -0,0 +1,105 @@
+"""Microbenchmark neural centroid scoring: legacy lists vs array('f') vs NumPy.
+
+Usage: python scripts/bench_centroid_scoring.py [--dim 1536] [--rounds 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chatbot.embeddings import CentroidMatrix, mean_vector, normalize_vector, optional_numpy  # noqa: E402
+from chatbot.intents import INTENT_PROTOTYPES  # noqa: E402
+
+np = optional_numpy()
+
+
+def _legacy_normalize(vec: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vec))
+    return [x / norm for x in vec] if norm > 0.0 else []
+
+
+def _legacy_cosine(a: list[float], b: list[float]) -> float:
+    n = min(len(a), len(b))
+    return sum(a[i] * b[i] for i in range(n))
+
+
+def _legacy_mean(bucket: list[list[float]]) -> list[float]:
+    dim = min(len(vec) for vec in bucket)
+    summed = [0.0] * dim
+    for vec in bucket:
+        for i in range(dim):
+            summed[i] += vec[i]
+    return [value / len(bucket) for value in summed]
+
+
+def _legacy_top2(query: list[float], centroids: dict[str, list[float]]) -> tuple[str, float, float]:
+    best_intent, best_score, second_score = "", -1.0, -1.0
+    for name, centroid in centroids.items():
+        score = _legacy_cosine(query, centroid)
+        if score > best_score:
+            second_score, best_score, best_intent = best_score, score, name
+        elif score > second_score:
+            second_score = score
+    return best_intent, best_score, second_score
+
+
+def _bench(label: str, fn, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    per_call = (time.perf_counter() - started) / rounds * 1e6
+    print(f"{label:<34} {per_call:10.1f} us")
+    return per_call
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    buckets = {name: [[rng.gauss(0, 1) for _ in range(args.dim)] for _ in samples] for name, samples in INTENT_PROTOTYPES.items()}
+    centroids = {name: _legacy_normalize(_legacy_mean(bucket)) for name, bucket in buckets.items()}
+    raw_query = [rng.gauss(0, 1) for _ in range(args.dim)]
+    query = _legacy_normalize(raw_query)
+
+    array_matrix = CentroidMatrix(centroids, use_numpy=False)
+    expected = _legacy_top2(query, centroids)
+    got = array_matrix.top2(query)
+    if got[0] != expected[0] or abs(got[1] - expected[1]) > 1e-4 or abs(got[2] - expected[2]) > 1e-4:
+        print(f"array('f') mismatch: {got} vs {expected}")
+        return 1
+
+    print(f"intents={len(centroids)} dim={args.dim} numpy={'yes' if np is not None else 'no'}")
+    print("-- centroid averaging (per intent)")
+    bucket = next(iter(buckets.values()))
+    _bench("legacy nested loop", lambda: _legacy_mean(bucket), max(1, args.rounds // 10))
+    _bench("mean_vector", lambda: mean_vector(bucket), max(1, args.rounds // 10))
+    print("-- query normalization")
+    _bench("legacy _normalize_vector", lambda: _legacy_normalize(raw_query), args.rounds)
+    _bench("normalize_vector", lambda: normalize_vector(raw_query), args.rounds)
+    print("-- score all intents (top-2)")
+    legacy_us = _bench("legacy per-intent cosine", lambda: _legacy_top2(query, centroids), args.rounds)
+    array_us = _bench("CentroidMatrix array('f')", lambda: array_matrix.top2(query), args.rounds)
+    print(f"array('f') speed-up: {legacy_us / array_us:.2f}x")
+    if np is not None:
+        numpy_matrix = CentroidMatrix(centroids, use_numpy=True)
+        got = numpy_matrix.top2(query)
+        if got[0] != expected[0] or abs(got[1] - expected[1]) > 1e-4:
+            print(f"numpy mismatch: {got} vs {expected}")
+            return 1
+        numpy_us = _bench("CentroidMatrix numpy", lambda: numpy_matrix.top2(query), args.rounds)
+        print(f"numpy speed-up: {legacy_us / numpy_us:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Benchmark the anchor-prefiltered rule engine against the plain ordered loop.
+
+Usage: python scripts/bench_intent_rules.py [--rounds 200] [--fuzz 20000]
+
+Exits non-zero if any message resolves to a different first-match intent.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chatbot.intents import DEFAULT_RULE_ENGINE, INTENT_RULES, normalize_message  # noqa: E402
+
+
+CORPUS = (
+    "halo",
+    "hai z ai",
+    "cek target harian pasangan",
+    "ingatkan aku fokus 25 menit",
+    "evaluasi hari ini",
+    "rekomendasi tugas kuliah paling prioritas",
+    "check-in progres tugas hari ini",
+    "oke lanjut",
+    "jadwal belajar besok pagi 120 menit",
+    "buat task review basis data deadline besok 19:00",
+    "buat assignment makalah ai deadline 2026-03-01 21:00",
+    "buat task review basis data deadline besok 19:00 dan buat assignment ringkasan ai deadline besok 21:00 lalu jelaskan urutan eksekusinya",
+    "ringkasan hari ini",
+    "mode tegas sekarang",
+    "reminder oke aktifkan",
+    "kenapa performa belajar gue drop minggu ini",
+    "yang tadi tolong lanjutkan sekalian jelasin kenapanya",
+    "aku lagi capek banget hari ini",
+    "bandingkan fokus pagi vs malam dari data konteksku",
+    "terima kasih banyak ya",
+    "what should i do next with my thesis draft",
+    ("kemarin aku sempat bingung soal pembagian waktu antara kerja paruh waktu dan kuliah " * 8)[:600],
+)
+
+FUZZ_WORDS = sorted(
+    {word for rule in INTENT_RULES for group in rule.anchors for word in group}
+    | {"aku", "kamu", "dan", "lalu", "ini", "in", "to", "-", "todo", "to-do", "check-in", "jadwal", "study",
+       "free", "slot", "kosong", "ſiap", "TASK", "İni", "Kita", "\n", "besok", "19:00"}
+)
+
+
+def _legacy_first_match(text: str) -> str | None:
+    for rule in INTENT_RULES:
+        if rule.pattern.search(text):
+            return rule.name
+    return None
+
+
+def _legacy_all_matches(text: str) -> list[str]:
+    return [rule.name for rule in INTENT_RULES if rule.pattern.search(text)]
+
+
+def _fuzz_corpus(count: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        normalize_message(" ".join(rng.choice(FUZZ_WORDS) for _ in range(rng.randint(1, 9))))
+        for _ in range(count)
+    ]
+
+
+def _time_per_message(fn, corpus: list[str], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in corpus:
+            fn(text)
+    elapsed = time.perf_counter() - started
+    return elapsed / (rounds * len(corpus)) * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--fuzz", type=int, default=20000)
+    args = parser.parse_args()
+
+    corpus = [normalize_message(text) for text in CORPUS]
+    mismatches = [
+        text for text in corpus + _fuzz_corpus(args.fuzz)
+        if text and (
+            DEFAULT_RULE_ENGINE.first_match(text) != _legacy_first_match(text)
+            or DEFAULT_RULE_ENGINE.all_matches(text) != _legacy_all_matches(text)
+        )
+    ]
+    for text in mismatches[:10]:
+        print(f"MISMATCH {text!r}: engine={DEFAULT_RULE_ENGINE.all_matches(text)} legacy={_legacy_all_matches(text)}")
+
+    legacy_us = _time_per_message(_legacy_first_match, corpus, args.rounds)
+    engine_us = _time_per_message(DEFAULT_RULE_ENGINE.first_match, corpus, args.rounds)
+    print(f"corpus={len(corpus)} fuzz={args.fuzz} mismatches={len(mismatches)}")
+    print(f"ordered loop   {legacy_us:8.2f} us/msg")
+    print(f"rule engine    {engine_us:8.2f} us/msg  ({legacy_us / engine_us:.2f}x)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
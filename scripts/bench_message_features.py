@@ -0,0 +1,111 @@
+"""Benchmark ParsedMessage against the per-helper regex scans it replaced.
+
+Usage: python scripts/bench_message_features.py [--rounds 300]
+
+Both paths derive domain, partner label, style, urgency, energy, follow-up
+keywords and topics for every corpus message; the script exits non-zero if
+they disagree, then reports the per-message CPU of each path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chatbot import processor  # noqa: E402
+from chatbot.intents import normalize_message  # noqa: E402
+from bench_intent_rules import CORPUS  # noqa: E402
+
+
+def _legacy_features(message: str) -> tuple:
+    lower = message.lower()
+    if re.search(r"\b(kuliah|assignment|deadline|ipk|makalah|quiz|ujian)\b", lower):
+        domain = "kuliah"
+    elif re.search(r"\b(belajar|study plan|jadwal belajar|sesi belajar)\b", lower):
+        domain = "kuliah"
+    elif re.search(r"\b(habit|kebiasaan|olahraga|health|tidur)\b", lower):
+        domain = "habit"
+    else:
+        domain = "umum"
+    self_ref = bool(re.search(r"\baku\b|\bsaya\b", message.lower()))
+    strict = bool(re.search(r"\b(toxic|tegas|gaspol|no excuse|push keras)\b", lower))
+    if re.search(r"\b(urgent|asap|deadline|besok|hari ini|sekarang juga|telat)\b", lower):
+        urgency = "high"
+    elif re.search(r"\b(target|goal|reminder|ingatkan|check-in|progres)\b", lower):
+        urgency = "medium"
+    else:
+        urgency = "low"
+    if re.search(r"\b(lelah|capek|ngantuk|burnout|drop|mager)\b", lower):
+        energy = "low"
+    elif re.search(r"\b(semangat|fokus|gas|mantap)\b", lower):
+        energy = "high"
+    else:
+        energy = "normal"
+    followup_eval = bool(re.search(r"\b(evaluasi|review|refleksi)\b", lower))
+    followup_reminder = bool(re.search(r"\b(reminder|ingat|notifikasi|alarm)\b", lower))
+    topics = []
+    for topic, pattern in (
+        ("kuliah", r"\b(kuliah|assignment|deadline|ujian|quiz|makalah)\b"),
+        ("target", r"\b(target|goal|prioritas)\b"),
+        ("reminder", r"\b(reminder|ingat|alarm|notifikasi)\b"),
+        ("checkin", r"\b(check-?in|progres|progress|sync)\b"),
+        ("evaluation", r"\b(evaluasi|review|refleksi)\b"),
+        ("mood", r"\b(mood|lelah|burnout|stress)\b"),
+        ("couple", r"\b(couple|pasangan|partner)\b"),
+    ):
+        if re.search(pattern, lower):
+            topics.append(topic)
+    return domain, self_ref, strict, urgency, energy, followup_eval, followup_reminder, topics or ["general"]
+
+
+def _parsed_features(message: str) -> tuple:
+    parsed = processor.ParsedMessage(message)
+    context = processor._build_context(parsed, "fallback", {})
+    profile = processor._infer_adaptive_profile(parsed, context, {})
+    return (
+        context["domain"],
+        context["partner_label"] == "kalian berdua",
+        parsed.has_any(processor._STRICT_WORDS),
+        profile["urgency"],
+        profile["energy"],
+        parsed.has_any(processor._FOLLOWUP_EVALUATION_WORDS),
+        parsed.has_any(processor._FOLLOWUP_REMINDER_WORDS),
+        processor._extract_message_topics(parsed),
+    )
+
+
+def _time_us(fn, corpus: list[str], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in corpus:
+            fn(text)
+    return (time.perf_counter() - started) / (rounds * len(corpus)) * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=300)
+    args = parser.parse_args()
+
+    corpus = [normalize_message(text)[:processor.MAX_MESSAGE_LEN] for text in CORPUS]
+    mismatches = [text for text in corpus if _legacy_features(text) != _parsed_features(text)]
+    for text in mismatches[:5]:
+        print(f"MISMATCH {text!r}: legacy={_legacy_features(text)} parsed={_parsed_features(text)}")
+
+    legacy_us = _time_us(_legacy_features, corpus, args.rounds)
+    parsed_us = _time_us(_parsed_features, corpus, args.rounds)
+    payload_us = _time_us(processor.process_message_payload, corpus, max(1, args.rounds // 5))
+    print(f"corpus={len(corpus)} mismatches={len(mismatches)}")
+    print(f"legacy per-helper scans   {legacy_us:8.2f} us/msg")
+    print(f"ParsedMessage single pass {parsed_us:8.2f} us/msg  ({legacy_us / parsed_us:.2f}x)")
+    print(f"process_message_payload   {payload_us:8.2f} us/msg")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
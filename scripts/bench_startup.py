@@ -0,0 +1,182 @@
+"""Measure cold start of the Python serverless functions in fresh interpreters.
+
+Usage: python scripts/bench_startup.py [--runs 15] [--top 8] [--check]
+
+Each run starts a new interpreter (like a Vercel cold start) and times:
+the stdlib modules every handler needs (http.server, json, re, datetime;
+reported, not budgeted), then the import of ``api/chat.py``,
+``api/assistant_brain.py`` or ``api/assistant_turn.py`` on top of them, the first GET (health check), the
+first POST (pays for lazily compiled regexes) and a second POST. Reports the
+median and max of each, plus the slowest modules by self time from
+``-X importtime``. Bytecode for chatbot/ and api/ is compiled first, as
+in a deployed bundle (--source-compile skips that). With --check, exits non-zero when a median exceeds the
+budget below (scale it with --budget-scale on slower machines).
+"""
+
+from __future__ import annotations
+
+import argparse
+import compileall
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+TARGETS = {
+    "chat": {
+        "file": "chat.py",
+        "get": "/api/chatbot",
+        "post": "/api/chatbot",
+        "body": {"message": "buat task revisi bab 2 deadline besok 19:00"},
+        "warm_body": {"message": "tambah tugas baca jurnal deadline lusa 08:00"},
+    },
+    "brain": {
+        "file": "assistant_brain.py",
+        "get": "/api/assistant-brain",
+        "post": "/api/assistant-brain",
+        "body": {"message": "buat tugas kuliah makalah ai deadline 12 maret 2026 jam 21:00", "user": "Zaldy"},
+        "warm_body": {"message": "tugas apa yang belum selesai", "user": "Zaldy"},
+    },
+    "turn": {
+        "file": "assistant_turn.py",
+        "get": "/api/assistant-turn",
+        "post": "/api/assistant-turn",
+        "body": {"message": "buat task revisi bab 2 deadline besok 19:00", "user": "Zaldy"},
+        "warm_body": {"message": "tambah tugas baca jurnal deadline lusa 08:00", "user": "Zaldy"},
+    },
+}
+# Median milliseconds per stage on a single-core CI box.
+BUDGET_MS = {
+    "chat": {"import": 20.0, "get": 1.0, "post": 25.0, "warm_post": 3.0},
+    "brain": {"import": 6.0, "get": 1.0, "post": 20.0, "warm_post": 4.0},
+    "turn": {"import": 22.0, "get": 1.0, "post": 30.0, "warm_post": 4.0},
+}
+STAGES = ("stdlib", "import", "get", "post", "warm_post")
+
+# Runs in the child interpreter; argv: api file, GET path, POST path, bodies.
+_CHILD = r"""
+import importlib.util, json, os, sys, time
+started = time.perf_counter()
+import datetime, http.server, re
+stdlib = time.perf_counter()
+root, name, get_path, post_path, body, warm_body = sys.argv[1:7]
+sys.path.insert(0, root)
+spec = importlib.util.spec_from_file_location("api_module", os.path.join(root, "api", name))
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+imported = time.perf_counter()
+
+from chatbot.server import run_handler  # not timed: stands in for the platform's socket glue
+
+def timed(method, path, payload=b""):
+    t0 = time.perf_counter()
+    raw = run_handler(module.handler, method, path, payload, {"Content-Type": "application/json"})
+    elapsed = (time.perf_counter() - t0) * 1000.0
+    assert raw.startswith(b"HTTP/1.1 200"), raw[:200]
+    return elapsed
+
+out = {"stdlib": (stdlib - started) * 1000.0, "import": (imported - stdlib) * 1000.0}
+out["get"] = timed("GET", get_path)
+out["post"] = timed("POST", post_path, body.encode())
+out["warm_post"] = timed("POST", post_path, warm_body.encode())
+print(json.dumps(out))
+"""
+
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ, CHATBOT_NEURAL_INTENT_ENABLED="false")
+    for key in ("CHATBOT_SHARED_SECRET", "ASSISTANT_BRAIN_SHARED_SECRET", "PYTHONPATH", "PYTHONDONTWRITEBYTECODE"):
+        env.pop(key, None)
+    return env
+
+
+def _child_args(target: dict) -> list[str]:
+    return [
+        ROOT, target["file"], target["get"], target["post"],
+        json.dumps(target["body"]), json.dumps(target["warm_body"]),
+    ]
+
+
+def run_once(target: dict) -> dict[str, float]:
+    proc = subprocess.run(
+        [sys.executable, "-c", _CHILD, *_child_args(target)],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(target: dict, top: int) -> list[tuple[str, int]]:
+    """Modules imported by the api file, sorted by self time (microseconds)."""
+    snippet = (
+        "import importlib.util, os, sys; sys.path.insert(0, sys.argv[1]); "
+        "spec = importlib.util.spec_from_file_location('api_module', os.path.join(sys.argv[1], 'api', sys.argv[2])); "
+        "spec.loader.exec_module(importlib.util.module_from_spec(spec))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", snippet, ROOT, target["file"]],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    rows: list[tuple[str, int]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((name, int(self_us)))
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--top", type=int, default=8, help="slowest imported modules to list (0 to skip)")
+    parser.add_argument("--target", choices=tuple(TARGETS), action="append")
+    parser.add_argument("--check", action="store_true", help="exit non-zero when a median is over budget")
+    parser.add_argument("--budget-scale", type=float, default=1.0)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--source-compile", action="store_true", help="do not precompile bytecode first")
+    args = parser.parse_args()
+
+    if not args.source_compile:
+        for package in ("chatbot", "api"):
+            compileall.compile_dir(os.path.join(ROOT, package), quiet=1)
+
+    report: dict[str, dict] = {}
+    over: list[str] = []
+    for name in args.target or TARGETS:
+        target = TARGETS[name]
+        runs = [run_once(target) for _ in range(max(1, args.runs))]
+        stages = {}
+        for stage in STAGES:
+            values = [run[stage] for run in runs]
+            stages[stage] = {"median_ms": round(statistics.median(values), 3), "max_ms": round(max(values), 3)}
+            budget = BUDGET_MS[name].get(stage, float("inf")) * args.budget_scale
+            if stages[stage]["median_ms"] > budget:
+                over.append(f"{name} {stage}: median {stages[stage]['median_ms']:.2f} ms > budget {budget:.2f} ms")
+        report[name] = {"runs": len(runs), "stages": stages}
+        if args.top > 0:
+            report[name]["slowest_imports_us"] = slowest_imports(target, args.top)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, entry in report.items():
+            print(f"{name} ({entry['runs']} fresh interpreters)")
+            for stage, values in entry["stages"].items():
+                budget = BUDGET_MS[name].get(stage)
+                limit = f"budget {budget * args.budget_scale:6.1f} ms" if budget is not None else ""
+                print(f"  {stage:10} median {values['median_ms']:8.2f} ms   max {values['max_ms']:8.2f} ms   {limit}".rstrip())
+            for module, self_us in entry.get("slowest_imports_us", []):
+                print(f"    {self_us / 1000:7.2f} ms  {module}")
+    if args.check and over:
+        for line in over:
+            print(f"OVER BUDGET {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""Latency benchmark suite for the Python chat and brain hot paths.
+
+Usage:
+  python scripts/bench_suite.py [--rounds 10] [--out .bench/latest.json]
+  python scripts/bench_suite.py --save-baseline            # record .bench/baseline.json
+  python scripts/bench_suite.py --baseline .bench/baseline.json [--tolerance 0.25] [--min-delta-us 10]
+
+Times detect_intent, process_message_payload, chatbot.brain._detect_intent
+and both handlers' do_POST (in-process, no sockets) over a generated
+Indonesian/English corpus of greetings, create_task/assignment commands,
+multi-step planner bundles, fallbacks and 600-char inputs. Reports
+p50/p95/p99 and throughput per target and category. With --baseline, exits
+non-zero when any target's p50 or p95 regresses by more than --tolerance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+# The suite measures the local hot path; a remote embeddings round trip would
+# only add network noise. Set CHATBOT_NEURAL_INTENT_ENABLED explicitly to override.
+os.environ.setdefault("CHATBOT_NEURAL_INTENT_ENABLED", "false")
+
+from chatbot import brain  # noqa: E402
+from chatbot.intents import detect_intent  # noqa: E402
+from chatbot.processor import MAX_MESSAGE_LEN, process_message_payload  # noqa: E402
+from chatbot.server import load_api_module, parse_response, run_handler  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, ".bench", "baseline.json")
+SUITE_VERSION = 1
+
+GREETINGS = ("halo", "hai z ai", "hi", "pagi", "selamat malam", "hello there", "halo, cek target harian kita")
+TASK_TITLES = ("review basis data", "laporan praktikum", "slide presentasi", "cuci motor", "bayar kos", "draft bab 2")
+ASSIGNMENT_TITLES = ("makalah ai", "ringkasan jurnal", "essay etika", "laporan statistik", "quiz kalkulus")
+DEADLINES = ("besok 19:00", "lusa", "hari ini 21:00", "2026-03-01 21:00", "12/03/2026", "12 maret", "tomorrow 08:30")
+BUNDLE_JOINERS = (" dan ", " lalu ", " terus ", ", kemudian ", " then ")
+FALLBACKS = (
+    "kenapa performa belajar gue drop minggu ini",
+    "yang tadi tolong lanjutkan sekalian jelasin kenapanya",
+    "what should i do next with my thesis draft",
+    "aku lagi capek banget hari ini",
+    "bandingkan fokus pagi vs malam dari data konteksku",
+    "gimana caranya biar ga overthinking pas mau tidur",
+)
+BRAIN_QUERIES = (
+    "tugas apa yang belum selesai",
+    "list assignment kuliah pending",
+    "risiko deadline minggu ini",
+    "ringkasan hari ini",
+    "tampilkan memory graph",
+    "jadwal belajar besok",
+    "selesaikan task 12",
+    "ubah deadline task 4 ke besok 20:00",
+)
+LONG_FILLER = (
+    "kemarin aku sempat bingung soal pembagian waktu antara kerja paruh waktu dan kuliah "
+    "so i tried to plan everything in one sitting but it did not really work out "
+)
+
+
+def build_corpus(seed: int = 20260301, per_category: int = 40) -> dict[str, list[str]]:
+    """Deterministic message corpus, grouped by category."""
+    rng = random.Random(seed)
+
+    def task() -> str:
+        verb = rng.choice(("buat task", "tambah tugas", "create task", "buatkan task"))
+        extra = rng.choice(("", " priority high", " prioritas sedang", " untuk nesya", " for zaldy"))
+        return f"{verb} {rng.choice(TASK_TITLES)}{extra} deadline {rng.choice(DEADLINES)}"
+
+    def assignment() -> str:
+        verb = rng.choice(("buat assignment", "tambah tugas kuliah", "create assignment"))
+        return f"{verb} {rng.choice(ASSIGNMENT_TITLES)} deadline {rng.choice(DEADLINES)}"
+
+    def bundle() -> str:
+        steps = [task(), assignment(), "ingatkan aku fokus 25 menit", "jelaskan urutan eksekusinya", "cek target harian"]
+        rng.shuffle(steps)
+        parts = steps[: rng.randint(2, 4)]
+        text = parts[0]
+        for part in parts[1:]:
+            text += rng.choice(BUNDLE_JOINERS) + part
+        return text
+
+    def long_text() -> str:
+        start = rng.randrange(len(LONG_FILLER))
+        text = (LONG_FILLER * 8)[start:start + MAX_MESSAGE_LEN - 40]
+        return f"{text} {rng.choice(FALLBACKS)}"[:MAX_MESSAGE_LEN]
+
+    generators: dict[str, Callable[[], str]] = {
+        "greeting": lambda: rng.choice(GREETINGS),
+        "create_task": task,
+        "create_assignment": assignment,
+        "planner_bundle": bundle,
+        "fallback": lambda: rng.choice(FALLBACKS),
+        "brain_query": lambda: rng.choice(BRAIN_QUERIES),
+        "long_600": long_text,
+    }
+    return {name: [make() for _ in range(per_category)] for name, make in generators.items()}
+
+
+def invoke_handler(handler_cls, method: str, path: str, body: bytes = b"", headers: dict[str, str] | None = None):
+    """Run one request in-process; returns (status, response headers, response body)."""
+    return parse_response(run_handler(handler_cls, method, path, body, headers or {}))
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), int(-(-pct * len(sorted_values) // 100))))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples_us: list[float]) -> dict[str, float]:
+    ordered = sorted(samples_us)
+    total_s = sum(ordered) / 1e6
+    return {
+        "count": len(ordered),
+        "p50_us": round(percentile(ordered, 50), 2),
+        "p95_us": round(percentile(ordered, 95), 2),
+        "p99_us": round(percentile(ordered, 99), 2),
+        "mean_us": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+        "throughput_per_s": round(len(ordered) / total_s, 1) if total_s > 0 else 0.0,
+    }
+
+
+def _measure(fn: Callable[[str], object], corpus: dict[str, list[str]], rounds: int) -> dict[str, object]:
+    for texts in corpus.values():  # warm regex caches, lru caches and lazy singletons
+        for text in texts[:3]:
+            fn(text)
+
+    by_category: dict[str, list[float]] = {name: [] for name in corpus}
+    clock = time.perf_counter_ns
+    gc.collect()
+    gc.disable()  # keep collector pauses out of the percentiles
+    try:
+        for _ in range(rounds):
+            for name, texts in corpus.items():
+                bucket = by_category[name]
+                for text in texts:
+                    started = clock()
+                    fn(text)
+                    bucket.append((clock() - started) / 1000.0)
+    finally:
+        gc.enable()
+
+    overall = [sample for samples in by_category.values() for sample in samples]
+    return {
+        **summarize(overall),
+        "categories": {name: summarize(samples) for name, samples in by_category.items()},
+    }
+
+
+def build_targets() -> dict[str, Callable[[str], object]]:
+    chat_api = load_api_module("chat")
+    brain_api = load_api_module("brain")
+
+    chat_headers = {"Content-Type": "application/json"}
+    if os.getenv("CHATBOT_SHARED_SECRET"):
+        chat_headers["X-Chatbot-Secret"] = str(os.getenv("CHATBOT_SHARED_SECRET")).strip()
+    brain_headers = {"Content-Type": "application/json"}
+    if os.getenv("ASSISTANT_BRAIN_SHARED_SECRET"):
+        brain_headers["X-Brain-Secret"] = str(os.getenv("ASSISTANT_BRAIN_SHARED_SECRET")).strip()
+
+    def chat_post(text: str) -> object:
+        body = json.dumps({"message": text}).encode("utf-8")
+        return invoke_handler(chat_api.handler, "POST", "/api/chatbot", body, chat_headers)
+
+    def brain_post(text: str) -> object:
+        body = json.dumps({"message": text, "user": "Zaldy"}).encode("utf-8")
+        return invoke_handler(brain_api.handler, "POST", "/api/assistant-brain", body, brain_headers)
+
+    return {
+        "chat.detect_intent": detect_intent,
+        "chat.process_message_payload": process_message_payload,
+        "chat.handler.do_POST": chat_post,
+        "brain._detect_intent": lambda text: brain._detect_intent(text, "Zaldy"),
+        "brain.handler.do_POST": brain_post,
+    }
+
+
+def run_suite(rounds: int, per_category: int, only: list[str] | None = None) -> dict[str, object]:
+    corpus = build_corpus(per_category=per_category)
+    targets = build_targets()
+    results = {}
+    for name, fn in targets.items():
+        if only and not any(token in name for token in only):
+            continue
+        results[name] = _measure(fn, corpus, rounds)
+    return {
+        "suite_version": SUITE_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "rounds": rounds,
+        "corpus_sizes": {name: len(texts) for name, texts in corpus.items()},
+        "targets": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float, min_delta_us: float = 0.0) -> list[str]:
+    """Return one line per target whose p50 or p95 regressed beyond tolerance.
+
+    Slowdowns smaller than ``min_delta_us`` in absolute terms are treated as noise.
+    """
+    regressions = []
+    for name, stats in current.get("targets", {}).items():
+        base = baseline.get("targets", {}).get(name)
+        if not base:
+            continue
+        for key in ("p50_us", "p95_us"):
+            before, after = float(base.get(key, 0.0)), float(stats.get(key, 0.0))
+            if before > 0 and after > before * (1.0 + tolerance) and after - before >= min_delta_us:
+                regressions.append(f"{name} {key}: {before:.1f} -> {after:.1f} us (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def _write_json(path: str, data: dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def _print_table(report: dict, baseline: dict | None) -> None:
+    print(f"{'target':32} {'p50':>9} {'p95':>9} {'p99':>9} {'ops/s':>10}  vs baseline p50")
+    for name, stats in report["targets"].items():
+        line = f"{name:32} {stats['p50_us']:9.1f} {stats['p95_us']:9.1f} {stats['p99_us']:9.1f} {stats['throughput_per_s']:10.1f}"
+        base = (baseline or {}).get("targets", {}).get(name)
+        if base and base.get("p50_us"):
+            line += f"  {(stats['p50_us'] / base['p50_us'] - 1) * 100:+6.1f}%"
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--per-category", type=int, default=40)
+    parser.add_argument("--only", action="append", help="substring filter on target names (repeatable)")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--baseline", help="compare against this JSON report")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help=f"write the report as baseline (default {DEFAULT_BASELINE})")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50/p95 slowdown as a fraction")
+    parser.add_argument("--min-delta-us", type=float, default=10.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    report = run_suite(max(1, args.rounds), max(1, args.per_category), args.only)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    _print_table(report, baseline)
+    if args.out:
+        _write_json(args.out, report)
+    if args.save_baseline:
+        _write_json(args.save_baseline, report)
+        print(f"baseline saved -> {args.save_baseline}")
+
+    if baseline is None:
+        return 0
+    if baseline.get("suite_version") != SUITE_VERSION:
+        print("baseline was recorded by a different suite version; re-record it", file=sys.stderr)
+        return 2
+    regressions = compare(report, baseline, args.tolerance, args.min_delta_us)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Benchmark the shared temporal scanner against the kind-by-kind searches it replaced.
+
+Usage: python scripts/bench_temporal.py [--rounds 200] [--fuzz 20000]
+
+Exits non-zero if the deadline fragment or deadline signal differs from the
+legacy processor implementation on any corpus or fuzzed message. The legacy
+patterns carry the two later fixes: a month-day day may not run into a clock
+("jan 25:00") and day/month dates need a four-digit year ("1.2.30"). Exits
+non-zero as well if a message in EXPECTED resolves differently.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chatbot.temporal import MONTH_WORD_PATTERN, parse_temporal, scan_temporal  # noqa: E402
+from bench_intent_rules import CORPUS  # noqa: E402
+
+
+FUZZ_WORDS = (
+    "besok", "lusa", "hari ini", "today", "tomorrow", "day after tomorrow", "19:00", "7:5", "25:99",
+    "12 maret", "maret 12", "12/03/2026", "3.5", "4/5/26", "1.2.30", "jan 25:00", "2026-03-01", "2026-03-01 21:00",
+    "tanggal 5 mei", "5-jan 2027", "Des 3", "deadline", "due", "tugas", "aku", "İ", "ſ", "-", ",",
+)
+
+# Resolved (kind, fragment, date, time) against EXPECTED_REFERENCE.
+EXPECTED_REFERENCE = date(2026, 3, 10)
+EXPECTED = {
+    "jan 25:00": ("time", "25:00", None, None),
+    "deadline jan 25 19:00": ("month_day", "jan 25", date(2027, 1, 25), "19:00"),
+    "1.2.30": ("dmy", "1.2", None, None),
+    "4/5/26": ("dmy", "4/5", None, None),
+    "12/03/2026": ("dmy", "12/03/2026", date(2026, 3, 12), None),
+}
+
+
+def _legacy_signal(text: str) -> bool:
+    return bool(
+        re.search(
+            rf"("
+            rf"\bdeadline\b|\bdue\b|\btanggal\b|"
+            rf"\bbesok\b|\blusa\b|\bhari ini\b|\btoday\b|"
+            rf"\d{{1,2}}:\d{{2}}|\d{{4}}-\d{{2}}-\d{{2}}|"
+            rf"\d{{1,2}}[\/.-]\d{{1,2}}(?:[\/.-]\d{{4}})?|"
+            rf"(?:tanggal\s*)?\d{{1,2}}\s*(?:[\/.,-]\s*)?{MONTH_WORD_PATTERN}\b|"
+            rf"{MONTH_WORD_PATTERN}\s+\d{{1,2}}(?!:)\b"
+            rf")",
+            text,
+            flags=re.IGNORECASE,
+        )
+    )
+
+
+def _legacy_fragment(source: str) -> str:
+    for pattern, flags, group in (
+        (r"\b(\d{4}-\d{2}-\d{2}(?:\s+\d{1,2}:\d{2})?)\b", 0, 1),
+        (rf"\b((?:tanggal\s*)?\d{{1,2}}\s*(?:[\/.,-]\s*)?{MONTH_WORD_PATTERN}(?:\s+\d{{4}})?)\b", re.IGNORECASE, 1),
+        (rf"\b({MONTH_WORD_PATTERN}\s+\d{{1,2}}(?!:)(?:\s+\d{{4}})?)\b", re.IGNORECASE, 1),
+        (r"\b(\d{1,2}[\/.-]\d{1,2}(?:[\/.-]\d{4})?)\b", 0, 1),
+        (r"\b(hari ini|today|besok|tomorrow|lusa|day after tomorrow)(?:\s+\d{1,2}:\d{2})?\b", re.IGNORECASE, 0),
+        (r"\b(\d{1,2}:\d{2})\b", 0, 1),
+    ):
+        hit = re.search(pattern, source, flags=flags)
+        if hit:
+            return hit.group(group).strip()
+    return ""
+
+
+def _legacy(text: str) -> tuple[str, bool]:
+    return _legacy_fragment(text), _legacy_signal(text)
+
+
+def _shared(text: str) -> tuple[str, bool]:
+    scan = scan_temporal(text)
+    return scan.fragment, scan.has_deadline_signal
+
+
+def _fuzz_corpus(count: int, seed: int = 11) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(FUZZ_WORDS) for _ in range(rng.randint(1, 8))) for _ in range(count)]
+
+
+def _time_us(fn, corpus: list[str], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in corpus:
+            fn(text)
+    return (time.perf_counter() - started) / (rounds * len(corpus)) * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--fuzz", type=int, default=20000)
+    args = parser.parse_args()
+
+    corpus = list(CORPUS)
+    checked = corpus + _fuzz_corpus(args.fuzz)
+    mismatches = [text for text in checked for variant in (text, text.lower()) if _legacy(variant) != _shared(variant)]
+    for text in mismatches[:10]:
+        print(f"MISMATCH {text!r}: legacy={_legacy(text)} shared={_shared(text)}")
+    wrong = 0
+    for text, expected in EXPECTED.items():
+        got = tuple(parse_temporal(text, EXPECTED_REFERENCE)[:4])
+        if got != expected:
+            wrong += 1
+            print(f"WRONG {text!r}: expected={expected} got={got}")
+
+    legacy_us = _time_us(_legacy, corpus, args.rounds)
+    scan_temporal.cache_clear()
+    cold_us = _time_us(lambda text: (scan_temporal.cache_clear(), _shared(text)), corpus, args.rounds)
+    warm_us = _time_us(_shared, corpus, args.rounds)
+    today = date.today()
+    parse_us = _time_us(lambda text: parse_temporal(text, today), corpus, args.rounds)
+    print(f"corpus={len(corpus)} fuzz={args.fuzz} mismatches={len(mismatches)}")
+    print(f"legacy kind-by-kind search {legacy_us:8.2f} us/msg")
+    print(f"single scan (cold)         {cold_us:8.2f} us/msg  ({legacy_us / cold_us:.2f}x)")
+    print(f"single scan (memoized)     {warm_us:8.2f} us/msg  ({legacy_us / warm_us:.2f}x)")
+    print(f"parse_temporal (memoized)  {parse_us:8.2f} us/msg")
+    return 1 if mismatches or wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Embed INTENT_PROTOTYPES once and write the centroid file shipped with the bundle.
+
+Usage: python scripts/build_intent_centroids.py [--out chatbot/intent_centroids.json]
+
+Uses the same CHATBOT_NEURAL_* / CHATBOT_LLM_API_KEY env vars as the runtime,
+so the written entry key (api base + model + prototype hash) matches what a
+cold container looks up. Existing entries for other models are kept.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chatbot.intents import (  # noqa: E402
+    BUNDLED_CENTROID_FILE,
+    _build_intent_centroids,
+    _centroid_cache_key,
+    _neural_config,
+    _read_centroid_file,
+    write_centroid_file,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=BUNDLED_CENTROID_FILE)
+    args = parser.parse_args()
+
+    config = _neural_config()
+    if not config.get("api_key"):
+        print("CHATBOT_LLM_API_KEY or OPENAI_API_KEY is required to embed prototypes.", file=sys.stderr)
+        return 1
+
+    # Build-time calls can afford a longer timeout than the request path.
+    centroids = _build_intent_centroids({**config, "timeout_s": 30.0})
+    if not centroids:
+        print("Embedding request failed; centroid file left unchanged.", file=sys.stderr)
+        return 1
+
+    key = _centroid_cache_key(str(config["api_base"]), str(config["model"]))
+    prefix = key.rsplit("|", 1)[0] + "|"
+    entries = {k: v for k, v in _read_centroid_file(args.out).items() if not k.startswith(prefix)}
+    entries[key] = centroids
+    write_centroid_file(args.out, entries)
+    print(f"wrote {len(centroids)} centroids for {key} -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""Check the combined /api/assistant-turn endpoint against the two endpoints it replaces, and time it.
+
+Usage: python scripts/check_assistant_turn.py [--messages 300] [--repeat 300]
+
+Every message (chat and brain commands, hints, session ids, whitespace runs,
+inputs over the chat length limit) is sent to /api/assistant-turn and to
+/api/chatbot + /api/assistant-brain; the combined body must be exactly
+{"chat": <chat body>, "brain": <brain body>}. Also checks status codes for a
+missing message, an invalid session_id, an oversized body, a wrong path and
+either shared secret, and that a combined turn scans the message once for
+both sides. Exits non-zero on failure, then reports in-process time
+for one combined request vs the two separate ones.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("CHATBOT_NEURAL_INTENT_ENABLED", "false")
+os.environ["CHATBOT_SERVER_TIMING"] = "false"
+
+from chatbot import brain, processor, temporal  # noqa: E402
+from chatbot.server import load_api_module, parse_response, run_handler  # noqa: E402
+
+APIS = {route: load_api_module(route) for route in ("chat", "brain", "turn")}
+PATHS = {"chat": "/api/chatbot", "brain": "/api/assistant-brain", "turn": "/api/assistant-turn"}
+SECRET_HEADERS = {"CHATBOT_SHARED_SECRET": "X-Chatbot-Secret", "ASSISTANT_BRAIN_SHARED_SECRET": "X-Brain-Secret"}
+
+MESSAGES = (
+    "halo", "buat task revisi bab 2 deadline besok 19:00", "tugas apa yang belum selesai",
+    "buat task laporan lalu cek risiko deadline", "buat assignment makalah AI deadline lusa",
+    "aku lagi capek banget hari ini", "ringkasan hari ini", "selesaikan task 12",
+    "jadwal belajar 45 menit", "cek target harian", "kenapa performa belajar gue drop minggu ini",
+)
+CONTEXTS = ({"tone_mode": "strict", "focus_minutes": 45}, None)
+
+
+def _post(route: str, payload: dict | None, raw: bytes | None = None, headers: dict | None = None) -> tuple[int, bytes]:
+    body = raw if raw is not None else json.dumps(payload).encode("utf-8")
+    request_headers = {"Content-Type": "application/json", **{header: os.environ[env] for env, header in SECRET_HEADERS.items() if os.getenv(env)}}
+    status, _, response = parse_response(run_handler(APIS[route].handler, "POST", PATHS[route], body, {**request_headers, **(headers or {})}))
+    return status, response
+
+
+def _requests(count: int, seed: int = 20260420) -> list[dict]:
+    rng = random.Random(seed)
+    requests = []
+    for index in range(count):
+        message = rng.choice(MESSAGES)
+        roll = rng.random()
+        if roll < 0.15:
+            message = f"  {message}   \n  {rng.choice(MESSAGES)}  "
+        elif roll < 0.2:
+            message = (message + " ") * 80
+        payload = {"message": message, "user": rng.choice(("Zaldy", "Nesya", ""))}
+        if rng.random() < 0.3:
+            payload["context"] = rng.choice(CONTEXTS)
+            payload["memory"] = {"pending_tasks": rng.randint(0, 5)}
+        if rng.random() < 0.2:
+            payload["session_id"] = f"turn-{index % 7}"
+        requests.append(payload)
+    return requests
+
+
+def check_equivalence(requests: list[dict]) -> list[str]:
+    failures = []
+    for index, payload in enumerate(requests):
+        # Separate session ids per side so each conversation advances once per side.
+        separate = {**payload, "session_id": f"split-{payload['session_id']}"} if "session_id" in payload else payload
+        chat_status, chat = _post("chat", separate)
+        brain_status, brain = _post("brain", payload)
+        turn_status, turn = _post("turn", payload)
+        if (chat_status, brain_status, turn_status) != (200, 200, 200):
+            failures.append(f"request {index}: statuses chat={chat_status} brain={brain_status} turn={turn_status}")
+        elif json.loads(turn) != {"chat": json.loads(chat), "brain": json.loads(brain)}:
+            failures.append(f"request {index} ({payload['message'][:40]!r}) differs from the separate endpoints")
+    return failures[:5]
+
+
+def check_errors() -> list[str]:
+    failures = []
+    cases = [
+        ("missing message", {"user": "Zaldy"}, None, {}, 400),
+        ("blank message", {"message": "   "}, None, {}, 400),
+        ("invalid session_id", {"message": "halo", "session_id": "bad id!"}, None, {}, 400),
+        ("oversized body", None, json.dumps({"message": "x" * APIS["turn"].MAX_BODY_BYTES}).encode(), {}, 413),
+    ]
+    for label, payload, raw, headers, expected in cases:
+        status, _ = _post("turn", payload, raw, headers)
+        if status != expected:
+            failures.append(f"{label}: status {status}, expected {expected}")
+    status, _, _ = parse_response(run_handler(APIS["turn"].handler, "POST", "/api/nope", b"{}", {}))
+    if status != 404:
+        failures.append(f"wrong path: status {status}")
+    for env, header in SECRET_HEADERS.items():
+        original = os.environ.get(env)
+        os.environ[env] = "s3cret"
+        try:
+            missing, _ = _post("turn", {"message": "halo"}, headers={header: ""})
+            granted, _ = _post("turn", {"message": "halo"}, headers={header: "s3cret"})
+        finally:
+            if original is None:
+                os.environ.pop(env)
+            else:
+                os.environ[env] = original
+        if (missing, granted) != (401, 200):
+            failures.append(f"{env}: statuses {missing} without / {granted} with {header}")
+    return failures
+
+
+def _scans_of(message: str, run) -> int:
+    """How often run() scans exactly ``message`` for temporal expressions, memo bypassed."""
+    scanned = []
+    memoized = temporal.scan_temporal
+    unmemoized = memoized.__wrapped__
+
+    def counted(text):
+        scanned.append(text)
+        return unmemoized(text)
+
+    original_cache = brain._DECISION_CACHE
+    brain._DECISION_CACHE = brain.DecisionCache(0)
+    temporal._parse_temporal_cached.cache_clear()
+    processor.scan_temporal = temporal.scan_temporal = counted
+    try:
+        run()
+    finally:
+        processor.scan_temporal = temporal.scan_temporal = memoized
+        brain._DECISION_CACHE = original_cache
+    return scanned.count(message)
+
+
+def check_shared_parse() -> list[str]:
+    failures = []
+    # Messages both the chat processor and the brain read dates from.
+    for message in ("buat task revisi bab 2 deadline besok 19:00", "buat assignment makalah AI deadline lusa"):
+        payload = {"message": message, "user": "Zaldy"}
+        combined = _scans_of(message, lambda: _post("turn", payload))
+        separate = _scans_of(message, lambda: (_post("chat", payload), _post("brain", payload)))
+        if (combined, separate) != (1, 2):
+            failures.append(f"{message!r}: {combined} scan(s) combined, {separate} separate; expected 1 and 2")
+    return failures
+
+
+def report_timing(repeat: int) -> None:
+    print("per message (in-process handlers, no network):")
+    for message in ("buat task revisi bab 2 deadline besok 19:00", "tugas apa yang belum selesai", "aku lagi capek banget hari ini"):
+        payload = {"message": message, "user": "Zaldy"}
+        best = {}
+        for name, run in (
+            ("combined", lambda: _post("turn", payload)),
+            ("separate", lambda: (_post("chat", payload), _post("brain", payload))),
+        ):
+            samples = []
+            for _ in range(3):
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    run()
+                samples.append((time.perf_counter() - started) / repeat * 1e6)
+            best[name] = min(samples)
+        print(f"  combined {best['combined']:7.1f} us (1 request)   chat + brain {best['separate']:7.1f} us (2 requests)   {message!r}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    failures = check_equivalence(_requests(max(1, args.messages))) + check_errors() + check_shared_parse()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        print(f"{len(failures)} failure(s)")
+        return 1
+    print(f"messages={args.messages}: identical to /api/chatbot + /api/assistant-brain")
+    report_timing(max(1, args.repeat))
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""Check the brain decision cache against uncached planning, and time hits vs misses.
+
+Usage: python scripts/check_brain_cache.py [--requests 2000] [--repeat 2000]
+
+A skewed stream of brain requests (repeated reads, retried create commands,
+two users) is sent through the handler with the cache on and off; every
+response body must be identical. Also checks that a new local date drops the
+old bucket (relative deadlines move with it), LRU eviction, that responses
+never leak into cached steps, and that the GET health response reports the
+hit rate. Exits non-zero on failure, then reports per-request time for hits
+and misses.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chatbot import brain  # noqa: E402
+from chatbot.server import load_api_module, parse_response, run_handler  # noqa: E402
+
+brain_api = load_api_module("brain")
+
+COMMANDS = (
+    "lihat task pending",
+    "tugas apa yang belum selesai",
+    "lihat tugas kuliah pending",
+    "cek risiko deadline minggu ini",
+    "ringkasan hari ini",
+    "buat task revisi bab 2 deadline besok 19:00 priority high",
+    "buat assignment makalah AI deadline lusa 21:00",
+    "buat task laporan lalu cek risiko deadline",
+    "selesaikan task 12",
+    "halo apa kabar",
+)
+USERS = ("Zaldy", "Nesya")
+HEADERS = {"Content-Type": "application/json"}
+if os.getenv("ASSISTANT_BRAIN_SHARED_SECRET"):
+    HEADERS["X-Brain-Secret"] = str(os.getenv("ASSISTANT_BRAIN_SHARED_SECRET")).strip()
+
+
+def _post(message: str, user: str = "Zaldy") -> bytes:
+    body = json.dumps({"message": message, "user": user}).encode("utf-8")
+    status, _, payload = parse_response(run_handler(brain_api.handler, "POST", "/api/assistant-brain", body, HEADERS))
+    if status != 200:
+        raise AssertionError(f"status {status} for {message!r}")
+    return payload
+
+
+def _health() -> dict:
+    return json.loads(parse_response(run_handler(brain_api.handler, "GET", "/api/assistant-brain"))[2])
+
+
+def _stream(count: int, seed: int = 20260415) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    # Zipf-like: a few commands make up most of the traffic.
+    weights = [1 / (rank + 1) for rank in range(len(COMMANDS))]
+    return [(rng.choices(COMMANDS, weights)[0], rng.choice(USERS)) for _ in range(count)]
+
+
+def _with_cache(cache, run):
+    original = brain._DECISION_CACHE
+    brain._DECISION_CACHE = cache
+    try:
+        return run()
+    finally:
+        brain._DECISION_CACHE = original
+
+
+def _on_date(day: datetime, run):
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return day
+
+    original = brain.datetime
+    brain.datetime = FixedDatetime
+    try:
+        return run()
+    finally:
+        brain.datetime = original
+
+
+def check_equivalence(stream) -> list[str]:
+    cache = brain.DecisionCache(64)
+    cached = _with_cache(cache, lambda: [_post(message, user) for message, user in stream])
+    uncached = _with_cache(brain.DecisionCache(0), lambda: [_post(message, user) for message, user in stream])
+    failures = [f"request {index} ({stream[index][0]!r}) differs from uncached" for index, (a, b) in enumerate(zip(cached, uncached)) if a != b]
+    stats = cache.stats()
+    if stats["hits"] + stats["misses"] != len(stream) or stats["hits"] < len(stream) - 2 * len(COMMANDS):
+        failures.append(f"unexpected cache counters {stats}")
+    return failures[:5]
+
+
+def check_behaviour() -> list[str]:
+    failures = []
+    cache = brain.DecisionCache(64)
+    message = "buat task revisi bab 2 deadline besok 19:00"
+
+    def deadline(day: datetime) -> str:
+        return _on_date(day, lambda: json.loads(_post(message))["args"]["deadline"])
+
+    first, second = _with_cache(cache, lambda: (deadline(datetime(2026, 3, 1, 23, 59)), deadline(datetime(2026, 3, 2, 0, 1))))
+    if (first, second) != ("2026-03-02T19:00:00", "2026-03-03T19:00:00"):
+        failures.append(f"'besok' across midnight gave {first}, {second}")
+    if cache.stats()["size"] != 1 or cache.stats()["date"] != "2026-03-02":
+        failures.append("a new date did not drop the previous bucket")
+
+    small = brain.DecisionCache(3)
+    for command in COMMANDS[:5]:
+        small.put("2026-03-01", command, "Zaldy", [])
+    kept = [command for command in COMMANDS[:5] if small.get("2026-03-01", command, "Zaldy") is not None]
+    if kept != list(COMMANDS[2:5]) or small.stats()["evictions"] != 2:
+        failures.append(f"LRU kept {kept}")
+
+    def leak():
+        before = _post("buat task laporan lalu cek risiko deadline")
+        planned = brain._cached_plan("buat task laporan lalu cek risiko deadline", "Zaldy")
+        return before, planned, _post("buat task laporan lalu cek risiko deadline")
+
+    before, planned, after = _with_cache(brain.DecisionCache(8), leak)
+    if before != after or any("id" in step for step in planned):
+        failures.append("handler responses leaked into cached steps")
+
+    cache = brain.DecisionCache(8)
+    _with_cache(cache, lambda: [_post("lihat task pending") for _ in range(4)])
+    reported = _with_cache(cache, _health).get("decision_cache", {})
+    if reported.get("hit_rate") != 0.75 or reported.get("hits") != 3:
+        failures.append(f"GET reported {reported}, expected hit_rate 0.75")
+    return failures
+
+
+def report_timing(repeat: int) -> None:
+    print("per request (in-process handler):")
+    for message in ("lihat task pending", "buat task revisi bab 2 deadline besok 19:00 priority high", "buat task laporan lalu cek risiko deadline"):
+        best = {}
+        for name, size in (("miss", 0), ("hit", 8)):
+            cache = brain.DecisionCache(size)
+            samples = []
+            for _ in range(3):
+                started = time.perf_counter()
+                _with_cache(cache, lambda: [_post(message) for _ in range(repeat)])
+                samples.append((time.perf_counter() - started) / repeat * 1e6)
+            best[name] = min(samples)
+        print(f"  miss {best['miss']:7.1f} us   hit {best['hit']:7.1f} us   {message!r}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    stream = _stream(max(1, args.requests))
+    failures = check_equivalence(stream) + check_behaviour()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        print(f"{len(failures)} failure(s)")
+        return 1
+    print(f"requests={len(stream)}: identical to uncached planning")
+    report_timing(max(1, args.repeat))
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Check multi-step tool plans from one brain call against per-step brain calls, and time them.
+
+Usage: python scripts/check_brain_plans.py [--messages 400] [--repeat 300]
+
+Compound messages are built from single-intent steps and joiners ("lalu",
+"dan", ";", ...). The plan must list one step per command, in order, each the
+same decision _detect_intent gives for that command alone. Single-intent
+messages, including ones whose details contain a joiner ("beli sabun dan
+sampo", ", jam 19:00"), must plan as one step identical to _detect_intent.
+Through the handler every step's tool must be in ALLOWED_TOOLS, top-level
+fields must stay the first step's, and per-step clarifications must survive.
+Exits non-zero on failure, then reports one planned call vs one call per step.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chatbot import brain  # noqa: E402
+from chatbot.server import load_api_module, parse_response, run_handler  # noqa: E402
+
+brain_api = load_api_module("brain")
+
+STEPS = (
+    "buat task revisi bab {n} deadline besok 19:00 priority high",
+    "tambah tugas laporan praktikum {n} deadline lusa",
+    "buat task review basis data",
+    "buat assignment makalah AI {n} deadline 2026-03-01 21:00",
+    "tambah tugas kuliah essay etika deskripsi minimal {n} halaman deadline besok",
+    "selesaikan task {n}",
+    "tandai assignment {n} selesai",
+    "ubah deadline task {n} ke besok 20:00",
+    "cek risiko deadline minggu ini",
+    "lihat tugas kuliah pending",
+    "tampilkan task yang belum selesai",
+    "buka memory graph",
+    "cek konteks terbaru",
+    "susun jadwal belajar besok",
+    "rangkum ringkasan hari ini",
+)
+JOINERS = (" lalu ", " dan ", "; ", ", terus ", " kemudian ", ", ", " habis itu ", " then ")
+# Single intents whose details contain a joiner: they must not split.
+SINGLE = (
+    "buat task beli sabun dan sampo deadline besok 19:00",
+    "buat task laporan keuangan, deadline besok",
+    "halo, buat task laporan deadline besok",
+    "tambah tugas kuliah riset and development deadline lusa",
+    "buat task presentasi lalu jam 19:00 besok",
+    "tugas apa yang belum selesai",
+    "buat assignment makalah AI deskripsi bab 1 dan bab 2 deadline besok",
+    "risiko deadline; minggu ini",
+)
+HEADERS = {"Content-Type": "application/json"}
+if os.getenv("ASSISTANT_BRAIN_SHARED_SECRET"):
+    HEADERS["X-Brain-Secret"] = str(os.getenv("ASSISTANT_BRAIN_SHARED_SECRET")).strip()
+
+
+def _post(message: str) -> dict:
+    body = json.dumps({"message": message, "user": "Zaldy"}).encode("utf-8")
+    status, _, payload = parse_response(run_handler(brain_api.handler, "POST", "/api/assistant-brain", body, HEADERS))
+    if status != 200:
+        raise AssertionError(f"status {status} for {message!r}")
+    return json.loads(payload)
+
+
+def _compound(rng: random.Random) -> list[str]:
+    return [rng.choice(STEPS).format(n=rng.randint(1, 30)) for _ in range(rng.randint(2, brain.MAX_PLAN_STEPS))]
+
+
+def check_plans(count: int, seed: int = 20260401) -> list[str]:
+    rng = random.Random(seed)
+    failures = []
+    for _ in range(count):
+        commands = _compound(rng)
+        message = commands[0] + "".join(rng.choice(JOINERS) + command for command in commands[1:])
+        steps = brain._plan_intents(message, "Zaldy")
+        if [step["command"] for step in steps] != commands:
+            failures.append(f"{message!r}: planned {[step['command'] for step in steps]}")
+            continue
+        for step, command in zip(steps, commands):
+            if {key: value for key, value in step.items() if key != "command"} != brain._detect_intent(command, "Zaldy"):
+                failures.append(f"{message!r}: step {command!r} differs from a call for it alone")
+                break
+    for message in SINGLE + STEPS:
+        message = message.format(n=7)
+        steps = brain._plan_intents(message, "Zaldy")
+        expected = brain._detect_intent(message, "Zaldy")
+        if len(steps) != 1 or {key: value for key, value in steps[0].items() if key != "command"} != expected:
+            failures.append(f"{message!r}: single intent planned as {[step['command'] for step in steps]}")
+    too_many = "; ".join(STEPS[5:5 + brain.MAX_PLAN_STEPS + 2]).format(n=3)
+    if len(brain._plan_intents(too_many, "Zaldy")) != brain.MAX_PLAN_STEPS:
+        failures.append(f"plan not capped at MAX_PLAN_STEPS={brain.MAX_PLAN_STEPS}")
+    return failures[:5]
+
+
+def check_handler() -> list[str]:
+    failures = []
+    message = "buat task revisi bab 2 lalu cek risiko deadline dan tandai assignment 4 selesai"
+    payload = _post(message)
+    tools = [step["tool"] for step in payload.get("actions", [])]
+    if tools != ["create_task", "get_deadline_risk", "complete_assignment"]:
+        failures.append(f"handler planned {tools}")
+    elif [step["id"] for step in payload["actions"]] != ["step_1", "step_2", "step_3"]:
+        failures.append("step ids are not sequential")
+    if not payload.get("requires_clarification") or payload["actions"][0].get("mode") != "clarification_required":
+        failures.append("a step missing its deadline did not ask for clarification")
+    if not payload["actions"][0].get("clarifications") or "clarifications" in payload["actions"][1]:
+        failures.append("clarifications are not kept per step")
+    first = {key: value for key, value in payload["actions"][0].items() if key not in ("id", "command")}
+    if {key: payload.get(key) for key in first} != first:
+        failures.append("top-level fields differ from the first step")
+
+    single = _post("cek risiko deadline minggu ini")
+    if single.get("requires_clarification") is not False or len(single.get("actions", [])) != 1:
+        failures.append("a single-intent message did not plan one ready step")
+
+    original = brain.ALLOWED_TOOLS
+    brain.ALLOWED_TOOLS = original - {"get_deadline_risk"}
+    try:
+        filtered = _post(message)
+        rejected = _post("cek risiko deadline minggu ini")
+    finally:
+        brain.ALLOWED_TOOLS = original
+    if [step["tool"] for step in filtered.get("actions", [])] != ["create_task", "complete_assignment"]:
+        failures.append("a step with a tool outside ALLOWED_TOOLS was not dropped")
+    if rejected.get("reason") != "tool_not_allowed":
+        failures.append("a plan with no allowed tool was not rejected")
+    return failures
+
+
+def report_timing(repeat: int) -> None:
+    rng = random.Random(7)
+    print("one planned brain call vs one call per step (in-process handler, no network):")
+    for size in range(2, brain.MAX_PLAN_STEPS + 1):
+        commands = [rng.choice(STEPS).format(n=index) for index in range(size)]
+        message = " lalu ".join(commands)
+        best = {}
+        for name, run in (
+            ("planned", lambda: _post(message)),
+            ("per step", lambda: [_post(command) for command in commands]),
+        ):
+            samples = []
+            for _ in range(3):
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    run()
+                samples.append((time.perf_counter() - started) / repeat * 1e6)
+            best[name] = min(samples)
+        print(f"  {size} steps   planned {best['planned']:7.1f} us (1 round trip)   per step {best['per step']:7.1f} us ({size} round trips)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    failures = check_plans(max(1, args.messages)) + check_handler()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        print(f"{len(failures)} failure(s)")
+        return 1
+    print(f"messages={args.messages}: every step matches a brain call for it alone")
+    report_timing(max(1, args.repeat))
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Check the precomputed canned-command table against the full pipeline and time it.
+
+Usage: python scripts/check_canned_responses.py [--rounds 200]
+
+Every table entry is run through process_message_payload with and without the
+table across a grid of context/memory/planner hints; any payload difference is
+a failure. Every command _build_quick_suggestions can emit must be in the table
+or be one the rules cannot classify (those need the neural fallback). Exits
+non-zero on failure, then reports per-message CPU of both paths.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chatbot import processor  # noqa: E402
+from chatbot.intents import DEFAULT_RULE_ENGINE  # noqa: E402
+from chatbot.responses import RESPONSE_TEMPLATES  # noqa: E402
+
+CONTEXT_HINTS = (
+    None,
+    {"tone_mode": "strict", "focus_minutes": 45, "focus_window": "evening"},
+    {"tone_mode": "balanced", "recent_intents": ["evaluation"], "avoid_commands": ["evaluasi hari ini"]},
+    {"preferred_commands": ["rekomendasi tugas kuliah", "jadwal belajar 180 menit"], "focus_minutes": 7},
+)
+MEMORY_HINTS = (
+    None,
+    {"unresolved_fields": ["deadline", "title"], "pending_tasks": 3, "pending_assignments": 2},
+    {"recent_topics": ["kuliah"], "recent_intents": ["create_task"], "focus_topic": "target"},
+)
+PLANNER_HINTS = (
+    None,
+    {"summary": "Lanjut rencana", "confidence": "low"},
+    {"actions": [{"kind": "create_task", "summary": "Buat tugas", "command": "buat tugas", "missing": ["deadline"]}]},
+)
+
+
+def _slow(message: str, *hints) -> dict:
+    eligible, processor._CANNED_MESSAGES = processor._CANNED_MESSAGES, frozenset()
+    try:
+        return processor.process_message_payload(message, *hints)
+    finally:
+        processor._CANNED_MESSAGES = eligible
+
+
+def _emitted_commands() -> set[str]:
+    planners = (
+        {"requires_clarification": False, "mode": "single"},
+        {"requires_clarification": False, "mode": "bundle"},
+        {"requires_clarification": True, "mode": "single"},
+    )
+    extras = (({}, {}), ({"recent_intents": ["evaluation"]}, {"unresolved_fields": ["deadline", "title"]}))
+    grid = itertools.product(
+        [*RESPONSE_TEMPLATES, "unknown"], ("umum", "kuliah"), ("supportive", "strict"),
+        processor.CANNED_FOCUS_MINUTES, planners, extras,
+    )
+    commands: set[str] = set()
+    cap, processor.MAX_SUGGESTIONS = processor.MAX_SUGGESTIONS, 1000  # see every candidate, not just the top 4
+    try:
+        for intent, domain, style, minutes, planner, (hint, memory) in grid:
+            profile = {"style": style, "focus_minutes": minutes}
+            for item in processor._build_quick_suggestions(intent, {"domain": domain}, profile, hint, memory, planner):
+                commands.add(item["command"])
+    finally:
+        processor.MAX_SUGGESTIONS = cap
+    return commands
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    failures: list[str] = []
+    processor.warm_canned_responses()
+    table = {message: entry for message, entry in processor._CANNED_RESPONSES.items() if entry is not None}
+    for message in table:
+        for hints in itertools.product(CONTEXT_HINTS, MEMORY_HINTS, PLANNER_HINTS):
+            fast = processor.process_message_payload(message, *hints)
+            slow = _slow(message, *hints)
+            if fast != slow:
+                failures.append(f"{message!r} hints={hints}")
+            if fast["planner"] is table[message].planner:
+                failures.append(f"{message!r}: cached planner returned without copying")
+    # A caller mutating its payload must not leak into the next request.
+    first = processor.process_message_payload("evaluasi hari ini")
+    first["planner"]["actions"].clear()
+    if processor.process_message_payload("evaluasi hari ini") != _slow("evaluasi hari ini"):
+        failures.append("mutating a returned planner changed later payloads")
+
+    for command in sorted(_emitted_commands()):
+        key = processor.normalize_message(command)
+        if key not in table and DEFAULT_RULE_ENGINE.first_match(key):
+            failures.append(f"suggested command not precomputed: {command!r}")
+
+    for failure in failures[:20]:
+        print(f"FAIL {failure}")
+    if failures:
+        print(f"{len(failures)} failure(s)")
+        return 1
+
+    messages = list(table)
+    timings: dict[str, float] = {}
+    for name, run in (("full pipeline", _slow), ("canned table", processor.process_message_payload)):
+        started = time.process_time()
+        for _ in range(args.rounds):
+            for message in messages:
+                run(message)
+        timings[name] = (time.process_time() - started) / (args.rounds * len(messages)) * 1e6
+    print(f"entries={len(table)} hint combinations={len(CONTEXT_HINTS) * len(MEMORY_HINTS) * len(PLANNER_HINTS)}: identical")
+    for name, us in timings.items():
+        print(f"  {name:14} {us:8.1f} us/message")
+    print(f"  speed-up       {timings['full pipeline'] / timings['canned table']:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Exercise EmbeddingsClient against a local stand-in /v1/embeddings server.
+
+Usage: python scripts/check_embeddings_client.py
+
+Checks connection reuse, the single retry after the server drops an idle
+socket, and per-call connect/transfer timings. Exits non-zero on failure.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chatbot.embeddings import EmbeddingsClient  # noqa: E402
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    peers: set[tuple[str, int]] = set()
+    drop_next = threading.Event()
+
+    def log_message(self, fmt: str, *args) -> None:  # noqa: A003
+        return
+
+    def do_POST(self) -> None:  # noqa: N802
+        _StandIn.peers.add(self.client_address)
+        length = int(self.headers.get("Content-Length", "0") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        rows = [{"index": i, "embedding": [float(len(text)), 1.0]} for i, text in enumerate(payload.get("input", []))]
+        body = json.dumps({"data": rows}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if _StandIn.drop_next.is_set():
+            # Simulate an upstream idle timeout: close right after answering.
+            _StandIn.drop_next.clear()
+            self.close_connection = True
+            self.connection.shutdown(2)
+
+
+def main() -> int:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = EmbeddingsClient(f"http://127.0.0.1:{server.server_address[1]}")
+    failures: list[str] = []
+
+    def call(texts: list[str]) -> tuple[dict | None, dict]:
+        return client.create(texts, api_key="test", model="stand-in", timeout_s=2.0)
+
+    body, first = call(["halo", "oke besok ya"])
+    if not body or len(body.get("data", [])) != 2:
+        failures.append(f"unexpected body {body!r}")
+    if first.get("reused") or float(first.get("connect_ms", 0.0)) <= 0.0:
+        failures.append(f"first call should open a connection: {first}")
+
+    _, second = call(["lanjut dulu"])
+    if not second.get("reused") or second.get("connect_ms") != 0.0:
+        failures.append(f"second call should reuse the socket: {second}")
+    if len(_StandIn.peers) != 1:
+        failures.append(f"expected one client socket, saw {len(_StandIn.peers)}")
+
+    _StandIn.drop_next.set()
+    call(["sekali lagi"])
+    body, retried = call(["setelah putus"])
+    if not body or not retried.get("retried"):
+        failures.append(f"stale socket should be retried once: {retried}")
+    if float(retried.get("transfer_ms", 0.0)) <= 0.0:
+        failures.append(f"missing transfer timing: {retried}")
+
+    stats = client.stats()
+    client.close()
+    server.shutdown()
+    print(f"stats={stats}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("PASS" if not failures else f"{len(failures)} failure(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
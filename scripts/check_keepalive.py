@@ -0,0 +1,209 @@
+"""Serve the api/*.py handler classes with http.server and check HTTP/1.1 keep-alive.
+
+Usage: python scripts/check_keepalive.py [--requests 200]
+
+For both the chat and the brain handler, over raw sockets: several requests
+(GET, POST, pipelined) on one connection, 404/401/413 with a
+request body followed by a normal request on the same connection, exact
+Content-Length on every response, Connection: close for HTTP/1.0 clients,
+bodies that cannot be framed or drained, and the idle timeout. Then reports
+requests/s over one reused connection vs a new connection per request.
+Exits non-zero on failure.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ["CHATBOT_NEURAL_INTENT_ENABLED"] = "false"
+os.environ["CHATBOT_SHARED_SECRET"] = "check-secret"
+os.environ["ASSISTANT_BRAIN_SHARED_SECRET"] = "check-secret"
+
+from chatbot.keepalive import MAX_DRAIN_BYTES  # noqa: E402
+from chatbot.server import load_api_module  # noqa: E402
+
+IDLE_TIMEOUT_S = 0.5
+# Over both handlers' body limits, under MAX_DRAIN_BYTES.
+TOO_LARGE_BYTES = 100 * 1024
+TARGETS = {
+    "chat": {
+        "path": "/api/chatbot",
+        "secret_header": "X-Chatbot-Secret",
+        "body": {"message": "buat task revisi bab 2 deadline besok 19:00"},
+    },
+    "brain": {
+        "path": "/api/assistant-brain",
+        "secret_header": "X-Brain-Secret",
+        "body": {"message": "tugas apa yang belum selesai", "user": "Zaldy"},
+    },
+}
+
+
+class Closed(Exception):
+    pass
+
+
+def _request(method: str, path: str, body: bytes = b"", headers: dict[str, str] | None = None, version: str = "HTTP/1.1") -> bytes:
+    lines = [f"{method} {path} {version}", "Host: 127.0.0.1"]
+    for key, value in {"Content-Length": str(len(body)), **(headers or {})}.items():
+        lines.append(f"{key}: {value}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("ascii") + body
+
+
+def _read_response(sock: socket.socket, buffer: bytearray) -> tuple[int, dict[str, str], bytes]:
+    """Read exactly one response; relies on its Content-Length, as a keep-alive client must."""
+    while b"\r\n\r\n" not in buffer:
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise Closed("connection closed before a response")
+        buffer += chunk
+    head, _, _ = bytes(buffer).partition(b"\r\n\r\n")
+    del buffer[: len(head) + 4]
+    lines = head.decode("iso-8859-1").split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip()
+    length = int(headers["content-length"])
+    while len(buffer) < length:
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise Closed("connection closed mid-body")
+        buffer += chunk
+    body = bytes(buffer[:length])
+    del buffer[:length]
+    return int(lines[0].split(" ", 2)[1]), headers, body
+
+
+def _closed_by_server(sock: socket.socket, buffer: bytearray, wait_s: float = 2.0) -> bool:
+    if buffer:
+        return False
+    sock.settimeout(wait_s)
+    try:
+        return sock.recv(1) == b""
+    except (socket.timeout, ConnectionError):
+        return False
+
+
+def _serve(handler_cls) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def check_target(name: str, target: dict) -> list[str]:
+    handler_cls = type("handler", (load_api_module(name).handler,), {"timeout": IDLE_TIMEOUT_S})
+    server = _serve(handler_cls)
+    address = server.server_address
+    auth = {target["secret_header"]: "check-secret", "Content-Type": "application/json"}
+    body = json.dumps(target["body"]).encode("utf-8")
+    path = target["path"]
+    failures: list[str] = []
+
+    def expect(label: str, response: tuple[int, dict, bytes], status: int, close: bool = False) -> None:
+        got, headers, payload = response
+        if got != status:
+            failures.append(f"{name} {label}: status {got} != {status} ({payload[:120]!r})")
+        if (headers.get("connection", "").lower() == "close") != close:
+            failures.append(f"{name} {label}: Connection header {headers.get('connection')!r}, expected close={close}")
+
+    try:
+        with socket.create_connection(address, timeout=5) as sock:
+            buffer = bytearray()
+            steps = [
+                ("GET", _request("GET", path), 200),
+                ("POST", _request("POST", path, body, auth), 200),
+                ("404 with body", _request("POST", "/api/nope", body, auth), 404),
+                ("POST after 404", _request("POST", path, body, auth), 200),
+                ("401 with body", _request("POST", path, body, {"Content-Type": "application/json"}), 401),
+                ("POST after 401", _request("POST", path, body, auth), 200),
+                ("413 with body", _request("POST", path, b"x" * TOO_LARGE_BYTES, auth), 413),
+                ("POST after 413", _request("POST", path, body, auth), 200),
+            ]
+            for label, raw, status in steps:
+                sock.sendall(raw)
+                expect(label, _read_response(sock, buffer), status)
+            # Pipelined: both requests written before either response is read.
+            sock.sendall(_request("POST", path, body, auth) + _request("GET", path))
+            expect("pipelined POST", _read_response(sock, buffer), 200)
+            expect("pipelined GET", _read_response(sock, buffer), 200)
+            time.sleep(IDLE_TIMEOUT_S * 2)
+            if not _closed_by_server(sock, buffer):
+                failures.append(f"{name}: idle connection was not closed after the timeout")
+
+        cases = [
+            ("HTTP/1.0", _request("POST", path, body, auth, version="HTTP/1.0"), 200),
+            ("bad Content-Length", _request("POST", path, b"", {**auth, "Content-Length": "abc"}), 400),
+            ("chunked body", _request("POST", path, b"", {**auth, "Transfer-Encoding": "chunked"}), 400),
+            # Headers only: the declared body is too large to drain, so the server must hang up.
+            ("413 beyond drain limit", _request("POST", path, b"", {**auth, "Content-Length": str(MAX_DRAIN_BYTES + 1)}), 413),
+        ]
+        for label, raw, status in cases:
+            with socket.create_connection(address, timeout=5) as sock:
+                buffer = bytearray()
+                sock.sendall(raw)
+                expect(label, _read_response(sock, buffer), status, close=True)
+                if not _closed_by_server(sock, buffer):
+                    failures.append(f"{name} {label}: connection left open")
+    except (Closed, OSError, KeyError, ValueError) as exc:
+        failures.append(f"{name}: {type(exc).__name__}: {exc}")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return failures
+
+
+def throughput(name: str, target: dict, requests: int) -> dict[str, float]:
+    server = _serve(load_api_module(name).handler)
+    auth = {target["secret_header"]: "check-secret", "Content-Type": "application/json"}
+    raw = _request("POST", target["path"], json.dumps(target["body"]).encode("utf-8"), auth)
+    rates = {}
+    try:
+        started = time.perf_counter()
+        with socket.create_connection(server.server_address, timeout=5) as sock:
+            buffer = bytearray()
+            for _ in range(requests):
+                sock.sendall(raw)
+                _read_response(sock, buffer)
+        rates["keep-alive"] = requests / (time.perf_counter() - started)
+        started = time.perf_counter()
+        for _ in range(requests):
+            with socket.create_connection(server.server_address, timeout=5) as sock:
+                sock.sendall(raw)
+                _read_response(sock, bytearray())
+        rates["new connection"] = requests / (time.perf_counter() - started)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return rates
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    failures = [failure for name, target in TARGETS.items() for failure in check_target(name, target)]
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        print(f"{len(failures)} failure(s)")
+        return 1
+    for name, target in TARGETS.items():
+        rates = throughput(name, target, max(1, args.requests))
+        print(f"{name}: " + "   ".join(f"{mode} {rate:7.0f} req/s" for mode, rate in rates.items()))
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""Check incremental planner re-evaluation from planner hints against a full re-check, and time it.
+
+Usage: python scripts/check_planner_hints.py [--conversations 300] [--repeat 2000]
+
+Multi-turn conversations grow a bundle one turn at a time (new steps, details
+for blocked steps, repeated text) with the planner fed back as the hint. Each
+turn is compared with a reference that re-runs the segment rules on every
+step; plans must be identical. Hints without segment hashes (older clients,
+new text only; the Node-shaped planner api/chat.js builds from the same
+message) and hints whose command was edited under an unchanged hash are
+checked too. Also asserts that a follow-up turn runs the segment rules only
+for new text and blocked steps, then reports planner time per follow-up turn
+by bundle size. Exits non-zero on failure.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("CHATBOT_NEURAL_INTENT_ENABLED", "false")
+
+import chatbot.processor as processor  # noqa: E402
+from chatbot.intents import normalize_message  # noqa: E402
+
+STEPS = (
+    "buat task revisi bab {n}", "tambah tugas kuliah makalah {n}", "ingatkan aku fokus {n}0 menit",
+    "cek target harian", "evaluasi hari ini", "rekomendasi tugas kuliah", "ringkasan hari ini",
+    "buat task laporan praktikum {n} deadline besok",
+)
+DETAILS = ("besok 19:00", "deadline lusa", "jam 08:00", "2026-03-14", "judulnya laporan akhir", "hari ini 21:30")
+JOINERS = (" lalu ", " dan ", "; ", ", terus ")
+
+
+def _follow_up(rng: random.Random, previous: list[str]) -> str:
+    roll = rng.random()
+    if roll < 0.35:
+        return rng.choice(DETAILS)
+    if roll < 0.5 and previous:
+        # Client resends text the planner has already seen.
+        return rng.choice(previous)
+    parts = [rng.choice(STEPS).format(n=rng.randint(1, 9)) for _ in range(rng.randint(1, 2))]
+    if rng.random() < 0.3:
+        parts.append(rng.choice(DETAILS))
+    return rng.choice(JOINERS).join(parts)
+
+
+def _full_replan(message: str, hint: dict) -> tuple[list[dict], list[str]]:
+    """Reference: every hinted step goes through the segment rules again."""
+    hinted = processor._normalize_planner_hint(hint)
+    seen = list(hinted["segments"])
+    actions = [dict(step) for step in hinted["actions"][: processor.MAX_PLAN_ACTIONS]]
+    commands = [processor._segment_hash(step["command"]) for step in actions]
+    replaced, fresh, details = set(), [], []
+    for segment in processor._planner_segments(normalize_message(message)):
+        segment_hash = processor._segment_hash(segment)
+        if segment_hash in seen:
+            continue
+        seen.append(segment_hash)
+        action = processor._planner_action_from_segment(segment, 0)
+        target = commands.index(segment_hash) if segment_hash in commands else None
+        if target is None and action is not None:
+            blocked = [i for i, step in enumerate(actions) if i not in replaced and step["status"] == "blocked" and step["kind"] == action["kind"]]
+            target = blocked[0] if blocked else None
+        if target is None:
+            (details if action is None else fresh).append(action or segment)
+        elif target not in replaced:
+            replaced.add(target)
+            actions[target] = {**actions[target], "segment_hash": segment_hash} if action is None else {**action, "id": actions[target]["id"]}
+    for i, step in enumerate(actions):
+        if i in replaced:
+            continue
+        if step["segment_hash"] == "" and step["status"] == "ready":
+            actions[i] = {**step, "segment_hash": processor._segment_hash(step["command"])}
+            continue
+        rechecked = processor._planner_action_from_segment(step["command"], 0)
+        actions[i] = {**step, "segment_hash": processor._segment_hash(step["command"])} if rechecked is None else {**rechecked, "id": step["id"]}
+    for action in fresh:
+        if len(actions) >= processor.MAX_PLAN_ACTIONS:
+            break
+        action["id"] = f"step_{len(actions) + 1}"
+        actions.append(action)
+    detail = " ".join(details)
+    for i, step in enumerate(actions if detail else []):
+        completed = processor._planner_action_from_segment(f"{step['command']} {detail}"[: processor.MAX_MESSAGE_LEN], 0)
+        if step["status"] == "blocked" and completed and completed["kind"] == step["kind"] and len(completed["missing"]) < len(step["missing"]):
+            actions[i] = {**completed, "id": step["id"]}
+            break
+    return actions, seen[-processor.MAX_PLAN_SEGMENTS :]
+
+
+def _node_hint(message: str) -> dict:
+    """The planner api/chat.js sends in stateless mode: buildPlannerFrame(message), no hashes."""
+    steps = []
+    for segment in processor._planner_segments(normalize_message(message)):
+        action = processor._planner_action_from_segment(segment, 0)
+        if action is not None:
+            steps.append({**{key: value for key, value in action.items() if key != "segment_hash"}, "id": f"step_{len(steps) + 1}"})
+    clarifications = [{"action_id": step["id"], "field": field, "question": "Deadline-nya kapan?"} for step in steps for field in step["missing"]]
+    return {
+        "mode": "bundle" if len(steps) > 1 else "single",
+        "confidence": "medium" if clarifications else "high",
+        "requires_clarification": bool(clarifications),
+        "clarifications": clarifications,
+        "actions": steps,
+        "summary": " -> ".join(f"{i}. {step['summary']}" for i, step in enumerate(steps, start=1)),
+        "next_best_action": "Lengkapi detail yang kurang dulu." if clarifications else "Eksekusi: Buat tugas baru",
+    }
+
+
+def _strip_hashes(planner: dict) -> dict:
+    return {
+        **{key: value for key, value in planner.items() if key != "segments"},
+        "actions": [{key: value for key, value in action.items() if key != "segment_hash"} for action in planner["actions"]],
+    }
+
+
+def _count_rule_calls(run) -> int:
+    original = processor._planner_action_from_segment
+    calls = 0
+
+    def counted(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return original(*args, **kwargs)
+
+    processor._planner_action_from_segment = counted
+    try:
+        run()
+    finally:
+        processor._planner_action_from_segment = original
+    return calls
+
+
+def check_conversations(count: int, seed: int = 20260321) -> list[str]:
+    rng = random.Random(seed)
+    failures: list[str] = []
+    turns = 0
+    for conversation in range(count):
+        messages = [rng.choice(STEPS).format(n=rng.randint(1, 9)) + rng.choice(JOINERS) + rng.choice(STEPS).format(n=1)]
+        planner = processor._build_planner(messages[0], "fallback", {})
+        for _ in range(rng.randint(2, 6)):
+            message = _follow_up(rng, messages)
+            messages.append(message)
+            expected_actions, expected_segments = _full_replan(message, planner)
+            got = processor._build_planner(message, "fallback", {}, planner)
+            turns += 1
+            if got["actions"] != expected_actions or got["segments"] != expected_segments:
+                failures.append(f"conversation {conversation}: {message!r} differs from a full re-check")
+                break
+            # Without segment hashes resent text cannot be recognized, so only new text is comparable.
+            hashes = map(processor._segment_hash, processor._planner_segments(normalize_message(message)))
+            legacy = processor._build_planner(message, "fallback", {}, _strip_hashes(planner))
+            if planner["segments"] and set(hashes).isdisjoint(planner["segments"]) and legacy["actions"] != got["actions"]:
+                failures.append(f"conversation {conversation}: {message!r} differs for a hint without hashes")
+                break
+            planner = got
+    print(f"conversations={count} follow-up turns={turns}")
+    return failures[:5]
+
+
+def check_targeted() -> list[str]:
+    failures = []
+    first = processor._build_planner("buat task revisi bab 2 lalu cek target harian", "fallback", {})
+    edited = {**first, "actions": [dict(action) for action in first["actions"]]}
+    edited["actions"][1]["command"] = "buat tugas kuliah makalah ai"
+    replanned = processor._build_planner("", "fallback", {}, edited)
+    if replanned["actions"][1]["kind"] != "create_assignment":
+        failures.append("a ready step whose command no longer matches its hash was not re-checked")
+
+    # Node-shaped hints describe the same message: no step may be planned twice.
+    for message in ("buat task laporan deadline besok", "buat task laporan dan evaluasi hari ini", "ringkasan hari ini", "cek target harian lalu buat task revisi"):
+        expected = [(action["kind"], action["command"]) for action in processor.process_message_payload(message)["planner"]["actions"]]
+        node = processor.process_message_payload(message, None, None, _node_hint(message))["planner"]
+        if [(action["kind"], action["command"]) for action in node["actions"]] != expected:
+            failures.append(f"{message!r} with a Node-shaped hint planned {[(a['kind'], a['command']) for a in node['actions']]}")
+    # api/chat.js also plans kinds the segment rules do not produce; such a step is kept.
+    study = {"actions": [{"id": "step_1", "kind": "study_plan", "summary": "Susun jadwal belajar dari waktu kosong", "command": "jadwal belajar besok", "status": "ready", "missing": []}]}
+    kept = processor._build_planner("jadwal belajar besok", "fallback", {}, study)["actions"]
+    if [action["kind"] for action in kept] != ["study_plan"]:
+        failures.append(f"a Node-only step kind was not kept: {kept}")
+    explore = {"actions": [{"id": "step_1", "kind": "explore", "summary": "Klarifikasi kebutuhan utama", "command": "ringkasan hari ini", "status": "ready", "missing": []}]}
+    brief = processor._build_planner("ringkasan hari ini", "fallback", {}, explore)["actions"]
+    if [action["kind"] for action in brief] != ["daily_brief"]:
+        failures.append(f"a Node step of another kind for the same text was not replaced: {brief}")
+
+    retyped = processor._build_planner("buat task laporan deadline besok 19:00", "fallback", {}, processor._build_planner("buat task laporan", "fallback", {}))
+    if len(retyped["actions"]) != 1 or retyped["requires_clarification"] or retyped["actions"][0]["id"] != "step_1":
+        failures.append(f"retyping a blocked step did not replace it: {retyped['actions']}")
+    two_blocked = processor._build_planner("buat task laporan lalu ingatkan aku minum", "fallback", {})
+    answered = processor._build_planner("besok 19:00", "fallback", {}, two_blocked)
+    if [action["status"] for action in answered["actions"]] != ["ready", "blocked"]:
+        failures.append(f"a detail was given to more than one blocked step: {answered['actions']}")
+
+    resolved = processor._build_planner("besok 19:00", "fallback", {}, first)
+    if resolved["requires_clarification"] or resolved["actions"][0]["status"] != "ready":
+        failures.append("a detail follow-up did not resolve the blocked step")
+    again = processor._build_planner("besok 19:00", "fallback", {}, resolved)
+    if again["actions"] != resolved["actions"]:
+        failures.append("resending an already planned segment changed the plan")
+
+    # Two turns through the payload path: the first reply's memory still lists
+    # the missing deadline, which the follow-up's replanned step resolves.
+    turn = processor.process_message_payload("buat task laporan")
+    follow_up = processor.process_message_payload("deadline besok 19:00", None, turn["memory_update"], turn["planner"])
+    planner = follow_up["planner"]
+    if planner["requires_clarification"] or planner["clarifications"] or planner["actions"][0]["status"] != "ready":
+        failures.append(f"a resolved deadline was asked again: {planner['clarifications']}")
+    if "deadline" in follow_up["memory_update"]["unresolved_fields"]:
+        failures.append("a resolved deadline stayed in memory unresolved_fields")
+    return failures
+
+
+def _bundle(ready: int) -> dict:
+    message = " lalu ".join(["cek target harian", "evaluasi hari ini", "ringkasan hari ini", "rekomendasi tugas kuliah"][:ready] + ["buat task revisi bab 2"])
+    return processor._build_planner(message, "fallback", {})
+
+
+def check_rule_calls() -> list[str]:
+    failures = []
+    for ready in range(processor.MAX_PLAN_ACTIONS):
+        hint = _bundle(ready)
+        calls = _count_rule_calls(lambda: processor._build_planner("besok 19:00", "fallback", {}, hint))
+        # One for the new segment, one for the blocked step it completes.
+        if calls != 2:
+            failures.append(f"{ready} ready steps: {calls} segment rule calls on a follow-up, expected 2")
+    return failures
+
+
+def report_timing(repeat: int) -> None:
+    print("follow-up 'besok 19:00' against a bundle of N ready steps + 1 blocked step:")
+    for ready in range(processor.MAX_PLAN_ACTIONS):
+        hint = _bundle(ready)
+        best = {}
+        for name, run in (
+            ("incremental", lambda: processor._build_planner("besok 19:00", "fallback", {}, hint)),
+            ("full re-check", lambda: _full_replan("besok 19:00", hint)),
+        ):
+            samples = []
+            for _ in range(5):
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    run()
+                samples.append((time.perf_counter() - started) / repeat * 1e6)
+            best[name] = min(samples)
+        print(f"  N={ready}   incremental {best['incremental']:7.1f} us   full re-check {best['full re-check']:7.1f} us")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    failures = check_conversations(max(1, args.conversations)) + check_targeted() + check_rule_calls()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        print(f"{len(failures)} failure(s)")
+        return 1
+    report_timing(max(1, args.repeat))
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""Check that chatbot/brain regex matching stays linear in input length, and time the worst cases.
+
+Usage: python scripts/check_regex_safety.py [--samples 30000] [--budget-scale 1.0]
+
+Three parts:
+  lint        every regex literal in chatbot/*.py and api/*.py is free of
+              unbounded wildcards (``.*``/``.+``) and nested quantifiers; the
+              two-sided rules go through chatbot.lazy.SequencePattern and
+              ``keyword.*$`` cuts through cut_tail instead.
+  equivalence the rewritten rules give the same result as the original
+              regexes on random keyword soup (newlines, whitespace runs,
+              digits, ``#``).
+  latency     adversarial inputs (each keyword repeated with every separator,
+              plus random soup) at the request body limit through the chat
+              and brain entry points: the slowest must stay under the
+              ceiling and doubling the input may at most ~double the time.
+
+Exits non-zero on failure.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import glob
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ["CHATBOT_NEURAL_INTENT_ENABLED"] = "false"
+
+from chatbot import brain, processor  # noqa: E402
+from chatbot.intents import INTENT_RULES, match_all_intents  # noqa: E402
+from chatbot.lazy import LazyPattern, cut_tail  # noqa: E402
+from chatbot.server import load_api_module  # noqa: E402
+
+chat = load_api_module("chat")
+
+# The regexes as they were before the rewrite: the reference for equivalence.
+ORIGINAL_RULES = {
+    "create_assignment": r"(?:\b(buat|buatkan|tambah|add|create|catat|simpan)\b.*\b(assignment|tugas kuliah)\b)|(?:\b(tugas kuliah|assignment)\b.*\b(buat|tambahkan|catat|simpan)\b)",
+    "create_task": r"(?:\b(buat|buatkan|tambah|add|create|catat|simpan)\b.*\b(task|tugas|todo|to-do)\b)|(?:\b(task|tugas|todo|to-do)\b.*\b(buat|tambahkan|catat|simpan)\b)",
+    "study_schedule": r"(?:\b(jadwal belajar|study plan|rencana belajar|sesi belajar)\b.*\b(waktu kosong|jam kosong|slot kosong|free slot|free time|waktu luang)\b)|(?:\b(buat|buatkan|susun|atur|generate|carikan|rancang)\b.*\b(jadwal belajar|study plan|rencana belajar)\b)|(?:^(jadwal belajar|study plan)\b)",
+    "check_daily_target": r"(?:\b(target|goal)\b.*\b(harian|hari ini|today|pasangan|bareng|bersama)\b)|(?:\bcek\b.*\b(target|goal)\b)|(?:\btarget\b.*\b(kita|pasangan)\b)",
+    "reminder_ack": r"(?:\b(reminder|alarm|notifikasi)\b.*\b(ok|oke|siap|aktif|jalan)\b)|(?:\b(ok|oke|siap|aktif|jalan)\b.*\b(reminder|alarm|notifikasi)\b)",
+    "checkin_progress": r"(?:\b(check-?in|cek in|update)\b.*\b(progress|progres|tugas|belajar|goal|target)\b)|(?:\b(progress|progres)\b.*\b(hari ini|today|kita|pasangan)\b)",
+}
+ORIGINAL_BRAIN = {
+    "_UPDATE_DEADLINE": r"(?:ubah|update|ganti|reschedule|geser)\s+(?:deadline|due).*(?:task|tugas)(?:\s*id)?\s*#?(\d+)",
+    "_DEADLINE_RISK": r"(?:risk|resiko|risiko|berisiko|rawan|terlambat).*(?:deadline|task|tugas|assignment|kuliah)",
+    "_ASSIGNMENT_LIST": r"(?:assignment|tugas kuliah|kuliah).*(?:pending|belum|deadline|list|daftar|apa)",
+    "_TASK_LIST": r"(?:task|tugas|todo|to-do).*(?:pending|belum|deadline|list|daftar|apa)",
+}
+ORIGINAL_DESCRIPTION = r"(?:deskripsi|description|desc)\s+(.+?)(?=\s+(?:deadline|due)\b|$)"
+CUT_TAILS = (r"\b(?:deadline|due)\b", r"\b(?:deskripsi|description|desc)\b")
+
+# Worst case allowed for one request at the body limit, in ms on this class of
+# machine (scaled by --budget-scale), and for doubling the input length.
+LATENCY_CEILING_MS = {"chat": 25.0, "brain": 40.0, "rules": 15.0}
+MAX_DOUBLING_RATIO = 3.0
+SEPARATORS = (" ", "\n", "-", "#", "1 ", " 1 ", "\t", ". ")
+_UNBOUNDED_WILDCARD = re.compile(r"(?<!\\)\.[*+]")
+_NESTED_QUANTIFIER = re.compile(r"\((?:[^()\\]|\\.)*[*+](?:[^()\\]|\\.)*\)[*+]")
+
+
+def _regex_literals(path: str):
+    tree = ast.parse(open(path, encoding="utf-8-sig").read(), path)
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        name = node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, "id", "")
+        owner = getattr(node.func.value, "id", "") if isinstance(node.func, ast.Attribute) else ""
+        if not (owner == "re" or name in {"LazyPattern", "SequencePattern", "_compile", "_sequence"}):
+            continue
+        for arg in node.args[:2]:
+            parts = [arg] if isinstance(arg, ast.Constant) else (arg.values if isinstance(arg, ast.JoinedStr) else [])
+            text = "".join(part.value for part in parts if isinstance(part, ast.Constant) and isinstance(part.value, str))
+            if text:
+                yield node.lineno, text
+
+
+def check_lint() -> list[str]:
+    failures = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "chatbot", "*.py")) + glob.glob(os.path.join(ROOT, "api", "*.py"))):
+        for lineno, text in _regex_literals(path):
+            for label, pattern in (("unbounded wildcard", _UNBOUNDED_WILDCARD), ("nested quantifier", _NESTED_QUANTIFIER)):
+                if pattern.search(text):
+                    failures.append(f"{os.path.relpath(path, ROOT)}:{lineno}: {label} in {text!r}")
+    return failures
+
+
+def _vocabulary() -> list[str]:
+    words = set()
+    for pattern in (*ORIGINAL_RULES.values(), *ORIGINAL_BRAIN.values(), ORIGINAL_DESCRIPTION, *CUT_TAILS):
+        words.update(re.findall(r"[a-z][a-z\- ]*[a-z]", pattern.replace("\\b", " ").replace("|", " | ")))
+    return sorted({word.strip() for word in words if word.strip()} | {"id", "x", "12", "#7", "deadline besok"})
+
+
+def _soup(rng: random.Random, vocabulary: list[str], tokens: int) -> str:
+    parts = []
+    for _ in range(tokens):
+        parts.append(rng.choice(vocabulary))
+        parts.append(rng.choice(("", " ", " ", " ", "  ", "\n", "\t", "#", " 4", ". ")))
+    return "".join(parts)
+
+
+def check_equivalence(samples: int, seed: int = 20260322) -> list[str]:
+    rng = random.Random(seed)
+    vocabulary = _vocabulary()
+    rules = {rule.name: rule.pattern for rule in INTENT_RULES}
+    original = {name: re.compile(pattern, re.IGNORECASE) for name, pattern in ORIGINAL_RULES.items()}
+    original_brain = {name: re.compile(pattern) for name, pattern in ORIGINAL_BRAIN.items()}
+    original_description = re.compile(ORIGINAL_DESCRIPTION, re.I)
+    tails = [(LazyPattern(keyword, re.I), re.compile(keyword + r".*$", re.I)) for keyword in CUT_TAILS]
+    failures: dict[str, str] = {}
+    for _ in range(samples):
+        text = _soup(rng, vocabulary, rng.randint(1, 10))
+        lower = text.lower()
+        for name, pattern in original.items():
+            if bool(pattern.search(text)) != bool(rules[name].search(text)):
+                failures.setdefault(f"rule {name}", text)
+        for name, pattern in original_brain.items():
+            old, new = pattern.search(lower), getattr(brain, name).search(lower)
+            if bool(old) != bool(new) or (old and old.groups() and old.groups() != new.groups()):
+                failures.setdefault(f"brain {name}", text)
+        old_description = original_description.search(text)
+        if brain._collapse_spaces(old_description.group(1) if old_description else "") != brain._collapse_spaces(brain._extract_description(text)):
+            failures.setdefault("brain _extract_description", text)
+        for keyword, old_tail in tails:
+            if old_tail.sub("", text) != cut_tail(keyword, text):
+                failures.setdefault(f"cut_tail {keyword.pattern}", text)
+    return [f"{label} differs from the original regex on {text!r}" for label, text in failures.items()]
+
+
+def _brain_request(message: str) -> None:
+    # _plan_intents only parses for the matching tools; run both parsers regardless.
+    message = brain._collapse_spaces(message)
+    brain._plan_intents(message, "Zaldy")
+    brain._parse_create_task(message, "Zaldy")
+    brain._parse_create_assignment(message, "Zaldy")
+
+
+TARGETS = {
+    # The chat handler truncates messages to MAX_MESSAGE_LEN; the body limit bounds the rest.
+    "chat": (chat.MAX_BODY_BYTES - 64, lambda text: processor.process_message_payload(text)),
+    "brain": (load_api_module("brain").MAX_BODY_BYTES - 64, _brain_request),
+    "rules": (chat.MAX_BODY_BYTES - 64, match_all_intents),
+}
+
+
+def _best_ms(run, text: str, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(text)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def _adversarial(limit: int, rng: random.Random) -> list[str]:
+    inputs = [(word + sep) * (limit // (len(word) + len(sep)) + 1) for word in _vocabulary() for sep in SEPARATORS]
+    inputs += [_soup(rng, _vocabulary(), limit // 4) for _ in range(20)]
+    return [text[:limit] for text in inputs]
+
+
+def check_latency(budget_scale: float) -> tuple[list[str], list[str]]:
+    rng = random.Random(7)
+    failures, report = [], []
+    for name, (limit, run) in TARGETS.items():
+        ceiling = LATENCY_CEILING_MS[name] * budget_scale
+        worst = (0.0, "")
+        for text in _adversarial(limit, rng):
+            elapsed = _best_ms(run, text, repeat=1)
+            if elapsed > worst[0]:
+                worst = (elapsed, text)
+        elapsed = _best_ms(run, worst[1])
+        half = _best_ms(run, worst[1][: len(worst[1]) // 2])
+        ratio = elapsed / half if half > 0.05 else 1.0
+        report.append(f"  {name:6} limit {limit:5d} chars   worst {elapsed:7.2f} ms (ceiling {ceiling:5.1f})   x{ratio:.1f} per doubling   input {worst[1][:24]!r}...")
+        if elapsed > ceiling:
+            failures.append(f"{name}: {elapsed:.2f} ms on {worst[1][:40]!r}... exceeds the {ceiling:.1f} ms ceiling")
+        if ratio > MAX_DOUBLING_RATIO:
+            failures.append(f"{name}: doubling the input multiplied the time by {ratio:.1f} on {worst[1][:40]!r}...")
+    return failures, report
+
+
+def report_original(limit: int) -> str:
+    text = ("target " * (limit // 7 + 1))[:limit]
+    old = re.compile(ORIGINAL_RULES["check_daily_target"], re.IGNORECASE)
+    new = {rule.name: rule.pattern for rule in INTENT_RULES}["check_daily_target"]
+    return f"  'target ' x {limit // 7} (check_daily_target): original regex {_best_ms(old.search, text):.2f} ms, SequencePattern {_best_ms(new.search, text):.2f} ms"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=30000)
+    parser.add_argument("--budget-scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    failures = check_lint() + check_equivalence(max(1, args.samples))
+    latency_failures, report = check_latency(max(0.1, args.budget_scale))
+    failures += latency_failures
+    print("worst case at the body limit:")
+    print("\n".join(report))
+    print(report_original(chat.MAX_BODY_BYTES))
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        print(f"{len(failures)} failure(s)")
+        return 1
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
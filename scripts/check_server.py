@@ -0,0 +1,138 @@
+"""Start the asyncio chatbot server in a subprocess and exercise it over real sockets.
+
+Usage: python scripts/check_server.py [--pool process|thread] [--workers 2] [--requests 400]
+
+Checks both routes, shared-secret auth, body limits (an oversized single
+message is refused from its first 8 KB, a batch may use 96 KB), 404s,
+keep-alive reuse, concurrent throughput and that SIGTERM lets an in-flight
+request finish.
+Exits non-zero on failure.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SECRET = "check-secret"
+
+
+def _start(pool: str, workers: int) -> tuple[subprocess.Popen, int]:
+    env = dict(os.environ, CHATBOT_SHARED_SECRET=SECRET, CHATBOT_NEURAL_INTENT_ENABLED="false", PYTHONPATH=ROOT)
+    env.pop("ASSISTANT_BRAIN_SHARED_SECRET", None)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "chatbot.server", "--port", "0", "--pool", pool, "--workers", str(workers)],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    line = proc.stdout.readline()
+    if "listening on" not in line:
+        proc.kill()
+        raise RuntimeError(f"server did not start: {line!r}{proc.stdout.read()}")
+    return proc, int(line.split("http://", 1)[1].split(" ", 1)[0].rsplit(":", 1)[1])
+
+
+def _post(conn: http.client.HTTPConnection, path: str, payload: object, secret: bool = True) -> tuple[int, dict]:
+    headers = {"Content-Type": "application/json"}
+    if secret:
+        headers["X-Chatbot-Secret"] = SECRET
+    conn.request("POST", path, body=json.dumps(payload), headers=headers)
+    resp = conn.getresponse()
+    return resp.status, json.loads(resp.read() or b"{}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pool", choices=("process", "thread"), default="process")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=400)
+    args = parser.parse_args()
+
+    proc, port = _start(args.pool, args.workers)
+    failures: list[str] = []
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        checks = [
+            ("chat", _post(conn, "/api/chatbot", {"message": "halo"}), 200, "reply"),
+            ("chat auth", _post(conn, "/api/chatbot", {"message": "halo"}, secret=False), 401, "error"),
+            ("chat size", _post(conn, "/api/chatbot", {"message": "x" * 9000}), 413, "error"),
+            # Past 8 KB only a body whose top-level object has "items" is read in full.
+            ("chat size (batch limit)", _post(conn, "/api/chatbot", {"message": "x" * (64 * 1024)}), 413, "error"),
+            ("chat size (nested items)", _post(conn, "/api/chatbot", {"context": {"items": []}, "message": "x" * 9000}), 413, "error"),
+            ("chat batch", _post(conn, "/api/chatbot", {"timings": True, "items": [{"message": "y" * 500}] * 20}), 200, "results"),
+            ("brain", _post(conn, "/api/assistant-brain", {"message": "tugas apa yang belum selesai", "user": "Zaldy"}), 200, "tool"),
+            ("turn", _post(conn, "/api/assistant-turn", {"message": "tugas apa yang belum selesai", "user": "Zaldy"}), 200, "brain"),
+            ("unknown", _post(conn, "/api/nope", {}), 404, "error"),
+        ]
+        first_sock = conn.sock
+        for name, (status, body), want_status, want_key in checks:
+            if status != want_status or want_key not in body:
+                failures.append(f"{name}: status={status} body={body}")
+        if conn.sock is None or conn.sock is not first_sock:
+            failures.append("keep-alive connection was not reused")
+
+        big = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        big.request("POST", "/api/chatbot", body=b"x" * (200 * 1024))
+        resp = big.getresponse()
+        resp.read()
+        if resp.status != 413 or resp.getheader("Connection") != "close":
+            failures.append(f"oversized body: status={resp.status} connection={resp.getheader('Connection')}")
+
+        def worker(count: int) -> int:
+            local = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            ok = 0
+            for i in range(count):
+                status, _ = _post(local, "/api/chatbot", {"message": f"buat task review bab {i} deadline besok 19:00"})
+                ok += status == 200
+            local.close()
+            return ok
+
+        clients = 8
+        started = time.perf_counter()
+        with ThreadPoolExecutor(clients) as pool:
+            ok = sum(pool.map(worker, [args.requests // clients] * clients))
+        elapsed = time.perf_counter() - started
+        if ok != (args.requests // clients) * clients:
+            failures.append(f"load: only {ok} requests succeeded")
+        print(f"{args.pool} pool x{args.workers}: {ok} requests from {clients} clients in {elapsed:.2f}s ({ok / elapsed:.0f} req/s)")
+
+        # Graceful shutdown: headers sent, body still pending when SIGTERM lands.
+        body = json.dumps({"message": "buat task drain check deadline besok"}).encode("utf-8")
+        inflight = socket.create_connection(("127.0.0.1", port), timeout=5)
+        inflight.sendall(
+            b"POST /api/chatbot HTTP/1.1\r\nHost: check\r\nX-Chatbot-Secret: " + SECRET.encode()
+            + b"\r\nContent-Length: " + str(len(body)).encode() + b"\r\n\r\n"
+        )
+        time.sleep(0.2)
+        proc.send_signal(signal.SIGTERM)
+        time.sleep(0.2)
+        inflight.sendall(body)
+        reply = inflight.recv(65536)
+        if not reply.startswith(b"HTTP/1.1 200") or b"Connection: close" not in reply:
+            failures.append(f"in-flight request during shutdown: {reply[:120]!r}")
+        if proc.wait(timeout=15) != 0:
+            failures.append(f"server exit code {proc.returncode}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("PASS" if not failures else f"{len(failures)} failure(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""Check session-ID mode against clients that echo their hints, for both stores, and time it.
+
+Usage: python scripts/check_sessions.py [--conversations 40] [--turns 12]
+
+Interleaved synthetic conversations are run twice: once like today's client
+(context, memory_update and a clarifying planner sent back every turn) and
+once with only a session_id (context on the first turn). Every payload must
+be identical, with the in-process and the SQLite store. Also checks partial
+hint overrides, batch items with a session_id, that stored state is neither
+mutated by a turn nor by the caller, TTL expiry, LRU eviction and two SQLite
+stores (workers) sharing one file. Exits non-zero on failure, then reports request bytes and CPU per turn.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("CHATBOT_NEURAL_INTENT_ENABLED", "false")
+
+from chatbot.processor import process_message_batch, process_message_payload, process_session_message  # noqa: E402
+from chatbot.sessions import MemorySessionStore, SessionState, SQLiteSessionStore  # noqa: E402
+
+TURNS = (
+    "halo", "buat task revisi bab 2", "besok 19:00", "tambah tugas kuliah makalah ai deadline lusa",
+    "evaluasi hari ini", "aku lagi capek banget hari ini", "jadwal belajar 45 menit", "oke lanjut",
+    "buat task laporan praktikum lalu ingatkan aku fokus 25 menit", "cek target harian",
+    "kenapa performa belajar gue drop minggu ini", "rekomendasi tugas kuliah", "ringkasan hari ini",
+)
+CONTEXTS = (
+    {"tone_mode": "strict", "focus_minutes": 45, "focus_window": "evening"},
+    {"tone_mode": "balanced", "preferred_commands": ["rekomendasi tugas kuliah"], "avoid_commands": ["evaluasi hari ini"]},
+    None,
+)
+
+
+def _conversations(count: int, turns: int, seed: int = 20260301) -> list[tuple[str, str, dict | None]]:
+    """(session_id, message, context) rows, conversations interleaved."""
+    rng = random.Random(seed)
+    scripts = {f"conv-{index}": [rng.choice(TURNS) for _ in range(turns)] for index in range(count)}
+    contexts = {session_id: rng.choice(CONTEXTS) for session_id in scripts}
+    rows = []
+    for step in range(turns):
+        order = list(scripts)
+        rng.shuffle(order)
+        rows.extend((session_id, scripts[session_id][step], contexts[session_id]) for session_id in order)
+    return rows
+
+
+def _echo(rows):
+    state: dict[str, tuple[dict | None, dict | None]] = {}
+    for session_id, message, context in rows:
+        memory, planner_hint = state.get(session_id, (None, None))
+        payload = process_message_payload(message, context, memory, planner_hint)
+        planner = payload["planner"]
+        carried = planner if planner_hint is None and planner.get("requires_clarification") else None
+        state[session_id] = (payload["memory_update"], carried)
+        yield {"message": message, "context": context, "memory": memory, "planner": planner_hint}, payload
+
+
+def _session(rows, store):
+    seen: set[str] = set()
+    for session_id, message, context in rows:
+        first = session_id not in seen
+        seen.add(session_id)
+        payload = process_session_message(session_id, message, context if first else None, store=store)
+        request = {"message": message, "session_id": session_id}
+        if first and context is not None:
+            request["context"] = context
+        yield request, payload
+
+
+def _check_equivalence(rows, make_store) -> list[str]:
+    failures = []
+    store = make_store()
+    for index, ((_, expected), (_, got)) in enumerate(zip(_echo(rows), _session(rows, store))):
+        if expected != got:
+            failures.append(f"{store.backend}: turn {index} ({rows[index][1]!r}) differs from the echoing client")
+    return failures[:5]
+
+
+def _check_behaviour(make_store) -> list[str]:
+    failures = []
+    store = make_store()
+    process_session_message("s", "buat task revisi bab 2", store=store)
+    before = store.get("s")
+    snapshot = copy.deepcopy(before)
+    override = process_session_message("s", "evaluasi hari ini", None, {"pending_tasks": 3}, store=store)
+    expected = process_message_payload("evaluasi hari ini", None, {**snapshot.memory, "pending_tasks": 3}, snapshot.planner)
+    if override != expected:
+        failures.append(f"{store.backend}: partial memory override differs from a full hint")
+    if before != snapshot:
+        failures.append(f"{store.backend}: a turn mutated the stored state it loaded")
+    after = copy.deepcopy(store.get("s"))
+    override["memory_update"]["recent_topics"].append("leak")
+    override["planner"]["actions"].clear()
+    if store.get("s") != after:
+        failures.append(f"{store.backend}: mutating a returned payload changed the stored session")
+    return failures
+
+
+def _check_limits(tmp: str) -> list[str]:
+    failures = []
+    state = SessionState(None, {"focus_topic": "general"}, None)
+    for store in (MemorySessionStore(max_sessions=3, ttl_s=0.2), SQLiteSessionStore(os.path.join(tmp, "limits.db"), 3, 0.2, purge_every=1)):
+        for index in range(5):
+            store.put(f"s{index}", state)
+        kept = [index for index in range(5) if store.get(f"s{index}") is not None]
+        if kept != [2, 3, 4]:
+            failures.append(f"{store.backend}: LRU kept sessions {kept}, expected [2, 3, 4]")
+        time.sleep(0.3)
+        if store.get("s4") is not None:
+            failures.append(f"{store.backend}: session survived its TTL")
+    path = os.path.join(tmp, "shared.db")
+    first, second = SQLiteSessionStore(path), SQLiteSessionStore(path)
+    process_session_message("shared", "buat task revisi bab 2", store=first)
+    if second.get("shared") != first.get("shared"):
+        failures.append("sqlite: a second store on the same file did not see the session")
+    return failures
+
+
+def _check_batch(make_store) -> list[str]:
+    store = make_store()
+    items = [
+        {"message": "buat task revisi bab 2", "session_id": "batch"},
+        {"message": "besok 19:00", "session_id": "batch"},
+        {"message": "halo", "session_id": "bad id!"},
+    ]
+    expected = list(_session([("batch", item["message"], None) for item in items[:2]], make_store()))
+    import chatbot.processor as processor
+
+    original = processor.default_session_store
+    processor.default_session_store = lambda: store
+    try:
+        results = process_message_batch(items)
+    finally:
+        processor.default_session_store = original
+    failures = []
+    if results[:2] != [payload for _, payload in expected]:
+        failures.append(f"{store.backend}: batch items with a session_id differ from single requests")
+    if results[2] != {"error": "invalid session_id"}:
+        failures.append(f"{store.backend}: batch accepted an invalid session_id")
+    return failures
+
+
+def _time(run, rows) -> tuple[float, float]:
+    started = time.process_time()
+    request_bytes = 0
+    for request, _ in run(rows):
+        request_bytes += len(json.dumps(request, ensure_ascii=True))
+    return (time.process_time() - started) / len(rows) * 1e6, request_bytes / len(rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=40)
+    parser.add_argument("--turns", type=int, default=12)
+    args = parser.parse_args()
+
+    rows = _conversations(max(1, args.conversations), max(1, args.turns))
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        counter = iter(range(1000))
+        stores = {
+            "memory": MemorySessionStore,
+            "sqlite": lambda: SQLiteSessionStore(os.path.join(tmp, f"sessions-{next(counter)}.db")),
+        }
+        for make_store in stores.values():
+            failures += _check_equivalence(rows, make_store)
+            failures += _check_behaviour(make_store)
+            failures += _check_batch(make_store)
+        failures += _check_limits(tmp)
+
+        for failure in failures:
+            print(f"FAIL {failure}")
+        if failures:
+            print(f"{len(failures)} failure(s)")
+            return 1
+
+        print(f"turns={len(rows)} conversations={args.conversations}: identical to echoing client (memory, sqlite)")
+        runs = {"echo hints": _echo, **{f"session ({name})": (lambda rows, make=make: _session(rows, make())) for name, make in stores.items()}}
+        for name, run in runs.items():
+            us, size = _time(run, rows)
+            print(f"  {name:18} {us:8.1f} us/turn   {size:7.0f} request bytes/turn")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""Check the static suggestion tables against the per-request builder they replaced.
+
+Usage: python scripts/check_suggestion_tables.py [--rounds 20]
+
+Runs both builders over every intent x domain x style x focus length x
+planner state x unresolved fields x recent/preferred/avoid hint combination
+and exits non-zero on the first difference, then reports per-call CPU.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chatbot import processor  # noqa: E402
+from chatbot.responses import RESPONSE_TEMPLATES  # noqa: E402
+
+
+def _legacy_dedupe(items: list[dict]) -> list[dict]:
+    seen_commands: set[str] = set()
+    out: list[dict] = []
+    for item in items:
+        label = str(item.get("label", "")).strip()
+        command = str(item.get("command", "")).strip()
+        tone = str(item.get("tone", "info")).strip() or "info"
+        if not label or not command:
+            continue
+        cmd_key = command.lower()
+        if cmd_key in seen_commands:
+            continue
+        seen_commands.add(cmd_key)
+        out.append({"label": label, "command": command, "tone": tone})
+        if len(out) >= processor.MAX_SUGGESTIONS:
+            break
+    return out
+
+
+def _legacy_quick_suggestions(
+    intent: str,
+    context: dict[str, str],
+    profile: dict,
+    hint: dict[str, Any],
+    memory: dict[str, Any],
+    planner: dict,
+) -> list[dict]:
+    domain = context.get("domain", "umum")
+    focus_minutes = int(profile.get("focus_minutes", 25))
+    style = str(profile.get("style", "supportive"))
+    recent = [str(x).lower() for x in hint.get("recent_intents", [])]
+    preferred_commands = processor._normalize_string_list(hint.get("preferred_commands", []), limit=6)
+    avoid_commands = set(processor._normalize_string_list(hint.get("avoid_commands", []), limit=6))
+
+    by_intent: dict[str, list[dict]] = {
+        "create_assignment": [
+            {"label": "Isi Deadline", "command": "deadline besok 21:00", "tone": "warning"},
+            {"label": "Tambah Deskripsi", "command": "deskripsi: rangkum 3 referensi utama", "tone": "info"},
+            {"label": "Pecah Langkah", "command": "pecah tugas kuliah ini jadi 3 langkah", "tone": "success"},
+        ],
+        "create_task": [
+            {"label": "Isi Deadline", "command": "deadline besok 19:00", "tone": "warning"},
+            {"label": "Prioritas Tinggi", "command": "set prioritas tinggi", "tone": "critical"},
+            {"label": "Mulai 25m", "command": "mulai sekarang 25 menit", "tone": "success"},
+        ],
+        "set_reminder": [
+            {"label": "Hari Ini 19:30", "command": "ingatkan aku hari ini 19:30", "tone": "warning"},
+            {"label": "Besok 07:00", "command": "ingatkan aku besok 07:00", "tone": "info"},
+            {"label": "Check-In Malam", "command": "ingatkan check-in malam ini 21:00", "tone": "success"},
+        ],
+        "daily_brief": [
+            {"label": "Prioritas Utama", "command": "tugas paling mendesak saya apa", "tone": "warning"},
+            {"label": "Risiko 24 Jam", "command": "risiko deadline 24 jam ke depan", "tone": "critical"},
+            {"label": "Rencana Besok", "command": "rencana fokus besok pagi", "tone": "info"},
+        ],
+        "greeting": [
+            {"label": "Cek Target", "command": "cek target harian pasangan", "tone": "info"},
+            {"label": "Rekomendasi Tugas", "command": "rekomendasi tugas kuliah", "tone": "success"},
+            {"label": "Evaluasi", "command": "evaluasi hari ini", "tone": "info"},
+        ],
+        "check_daily_target": [
+            {"label": "Check-In Progres", "command": "check-in progres hari ini", "tone": "info"},
+            {"label": f"Fokus {focus_minutes}m", "command": f"ingatkan aku fokus {focus_minutes} menit", "tone": "warning"},
+            {"label": "Evaluasi", "command": "evaluasi malam ini", "tone": "info"},
+        ],
+        "reminder_ack": [
+            {"label": f"Mulai {focus_minutes}m", "command": f"oke mulai fokus {focus_minutes} menit", "tone": "success"},
+            {"label": "Check-In", "command": "check-in progres sekarang", "tone": "info"},
+            {"label": "Evaluasi", "command": "evaluasi singkat", "tone": "info"},
+        ],
+        "checkin_progress": [
+            {"label": "Rekomendasi", "command": "rekomendasi tugas berikutnya", "tone": "success"},
+            {"label": "Target Besok", "command": "cek target harian besok", "tone": "info"},
+            {"label": "Motivasi Tegas", "command": "toxic motivasi", "tone": "warning"},
+        ],
+        "evaluation": [
+            {"label": "Rencana Besok", "command": "cek target harian besok", "tone": "success"},
+            {"label": "Prioritas Kuliah", "command": "rekomendasi tugas kuliah", "tone": "warning"},
+            {"label": "Check-In", "command": "check-in progres sekarang", "tone": "info"},
+        ],
+        "affirmation": [
+            {"label": "Rekomendasi", "command": "rekomendasi tugas sekarang", "tone": "success"},
+            {"label": "Evaluasi", "command": "evaluasi hari ini", "tone": "info"},
+            {"label": f"Fokus {focus_minutes}m", "command": f"ingatkan aku fokus {focus_minutes} menit", "tone": "warning"},
+        ],
+        "recommend_task": [
+            {"label": "Mulai Sekarang", "command": "oke mulai sekarang", "tone": "success"},
+            {"label": "Pecah Langkah", "command": "pecah tugas jadi langkah kecil", "tone": "info"},
+            {"label": "Check-In", "command": "check-in progres tugas", "tone": "info"},
+        ],
+        "study_schedule": [
+            {"label": "Besok Pagi", "command": "jadwal belajar besok pagi 120 menit", "tone": "info"},
+            {"label": "Target 180m", "command": "jadwal belajar 180 menit", "tone": "success"},
+            {"label": "Mode Malam", "command": "jadwal belajar malam 90 menit", "tone": "warning"},
+        ],
+        "toxic_motivation": [
+            {"label": f"Gas {focus_minutes}m", "command": f"oke gas fokus {focus_minutes} menit", "tone": "critical"},
+            {"label": "Tugas Prioritas", "command": "rekomendasi tugas prioritas", "tone": "warning"},
+            {"label": "Evaluasi", "command": "evaluasi cepat", "tone": "info"},
+        ],
+        "fallback": [
+            {"label": "Cek Target", "command": "cek target harian pasangan", "tone": "info"},
+            {"label": f"Fokus {focus_minutes}m", "command": f"ingatkan aku fokus {focus_minutes} menit", "tone": "warning"},
+            {"label": "Rekomendasi", "command": "rekomendasi tugas kuliah", "tone": "success"},
+        ],
+    }
+
+    suggestions = list(by_intent.get(intent, by_intent["fallback"]))
+
+    if domain == "kuliah":
+        suggestions.insert(0, {"label": "Prioritas Kuliah", "command": "rekomendasi tugas kuliah paling mendesak", "tone": "warning"})
+
+    if style == "strict":
+        suggestions.insert(0, {"label": "Mode Tegas", "command": "toxic motivasi sekarang", "tone": "critical"})
+
+    if "evaluation" in recent:
+        suggestions.insert(0, {"label": "Eksekusi Sekarang", "command": "oke mulai sekarang", "tone": "success"})
+
+    unresolved = memory.get("unresolved_fields", [])
+    if isinstance(unresolved, list):
+        if "deadline" in unresolved:
+            suggestions.insert(0, {"label": "Isi Deadline", "command": "deadline besok 19:00", "tone": "warning"})
+        if "title" in unresolved:
+            suggestions.insert(0, {"label": "Isi Judul", "command": "judul tugas [isi judul]", "tone": "info"})
+
+    if planner.get("requires_clarification"):
+        suggestions.insert(0, {"label": "Lengkapi Detail", "command": "oke saya lengkapi detailnya", "tone": "warning"})
+    elif planner.get("mode") == "bundle":
+        suggestions.insert(0, {"label": "Jalankan Bundle", "command": "oke jalankan rencana ini", "tone": "success"})
+
+    if avoid_commands:
+        suggestions = [
+            item for item in suggestions
+            if str(item.get("command", "")).strip().lower() not in avoid_commands
+        ]
+
+    if preferred_commands:
+        by_command = {}
+        for item in suggestions:
+            cmd = str(item.get("command", "")).strip().lower()
+            if not cmd or cmd in by_command:
+                continue
+            by_command[cmd] = item
+
+        prioritized: list[dict] = []
+        for cmd in preferred_commands:
+            if cmd in by_command:
+                prioritized.append(by_command[cmd])
+            else:
+                label = cmd[:30] if len(cmd) > 30 else cmd
+                prioritized.append({"label": label, "command": cmd, "tone": "success"})
+
+        for item in suggestions:
+            cmd = str(item.get("command", "")).strip().lower()
+            if cmd in preferred_commands:
+                continue
+            prioritized.append(item)
+        suggestions = prioritized
+
+    return _legacy_dedupe(suggestions)
+
+
+INTENTS = (*RESPONSE_TEMPLATES, "fallback", "unknown")
+DOMAINS = ("umum", "kuliah", "habit")
+STYLES = ("supportive", "strict", "balanced")
+FOCUS_MINUTES = (10, 25, 45, 180)
+PLANNERS = (
+    {"requires_clarification": False, "mode": "single"},
+    {"requires_clarification": False, "mode": "bundle"},
+    {"requires_clarification": True, "mode": "bundle"},
+)
+MEMORIES = (
+    {},
+    {"unresolved_fields": ["deadline"]},
+    {"unresolved_fields": ["title", "deadline", "time"]},
+    {"unresolved_fields": "deadline"},
+)
+HINTS = (
+    {},
+    {"recent_intents": ["Evaluation", "greeting"]},
+    {"avoid_commands": ["Evaluasi Hari Ini", "oke saya lengkapi detailnya", "rekomendasi tugas kuliah paling mendesak"]},
+    {"preferred_commands": ["cek target harian besok", "  Rekomendasi Tugas Kuliah ", "perintah baru yang cukup panjang sekali ya"]},
+    {
+        "recent_intents": ["evaluation"],
+        "preferred_commands": ["oke mulai sekarang", "toxic motivasi sekarang", "ingatkan aku fokus 25 menit"],
+        "avoid_commands": ["toxic motivasi sekarang", "deadline besok 19:00", "", "x"],
+    },
+    {"preferred_commands": ["a", "b", "c", "d", "e", "f", "g"]},
+)
+
+
+def _cases():
+    for intent, domain, style, minutes, planner, memory, hint in itertools.product(
+        INTENTS, DOMAINS, STYLES, FOCUS_MINUTES, PLANNERS, MEMORIES, HINTS
+    ):
+        yield intent, {"domain": domain}, {"style": style, "focus_minutes": minutes}, hint, memory, planner
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    cases = list(_cases())
+    for case in cases:
+        legacy = _legacy_quick_suggestions(*case)
+        current = processor._build_quick_suggestions(*case)
+        if legacy != current:
+            print(f"FAIL {case}\n  legacy  {legacy}\n  current {current}")
+            return 1
+
+    timings: dict[str, float] = {}
+    for name, build in (("legacy", _legacy_quick_suggestions), ("tables", processor._build_quick_suggestions)):
+        started = time.process_time()
+        for _ in range(args.rounds):
+            for case in cases:
+                build(*case)
+        timings[name] = (time.process_time() - started) / (args.rounds * len(cases)) * 1e6
+    print(f"cases={len(cases)}: identical")
+    for name, us in timings.items():
+        print(f"  {name:8} {us:7.2f} us/call")
+    print(f"  speed-up {timings['legacy'] / timings['tables']:7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
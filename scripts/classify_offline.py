@@ -0,0 +1,156 @@
+"""Classify an exported message file with process_message_payload on a process pool.
+
+Usage:
+  python scripts/classify_offline.py messages.jsonl [--out results.jsonl] [--workers 4]
+  python scripts/classify_offline.py messages.txt --workers 1,2,4     # throughput at each count
+  cat messages.txt | python scripts/classify_offline.py - --full
+
+Input is one message per line: plain text, or JSON objects with "message"
+(and optional "context", "memory", "planner" hints like the batch API), or a
+JSON array of either. Messages go to the workers in MAX_BATCH_ITEMS chunks so
+neural fallbacks in a chunk share one embeddings request; each worker imports
+the compiled rules and centroids once. Results are written in input order,
+followed by an intent distribution and messages/second per worker count.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chatbot.processor import MAX_BATCH_ITEMS  # noqa: E402
+
+
+def read_items(path: str) -> list[Any]:
+    fh = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with fh:
+        raw = fh.read()
+    if raw.lstrip().startswith("["):
+        data = json.loads(raw)
+        lines: Iterable[Any] = data if isinstance(data, list) else []
+    else:
+        lines = (line for line in raw.splitlines() if line.strip())
+
+    items: list[Any] = []
+    for entry in lines:
+        if isinstance(entry, str) and entry.lstrip().startswith("{"):
+            try:
+                entry = json.loads(entry)
+            except ValueError:
+                pass
+        items.append({"message": entry} if isinstance(entry, str) else entry)
+    return items
+
+
+def _init_worker() -> None:
+    # Compile rules, load persisted centroids and build the canned entries once
+    # per worker, so no chunk pays for them.
+    from chatbot.intents import _ensure_persisted_centroids, _neural_config, warm_intent_rules
+    from chatbot.processor import warm_canned_responses
+
+    warm_intent_rules()
+    if _neural_config().get("enabled"):
+        _ensure_persisted_centroids()
+    warm_canned_responses()
+
+
+def _classify_chunk(chunk: list[Any]) -> list[dict]:
+    from chatbot.processor import process_message_batch
+
+    return process_message_batch(chunk)
+
+
+def _worker_ready(_: int) -> bool:
+    return True
+
+
+def classify(items: list[Any], workers: int, chunk_size: int = MAX_BATCH_ITEMS) -> tuple[list[dict], float]:
+    """Return (results in input order, elapsed seconds excluding pool start-up)."""
+    chunk_size = max(1, min(chunk_size, MAX_BATCH_ITEMS))
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    if workers <= 1:
+        _init_worker()
+        started = time.perf_counter()
+        results = [result for chunk in chunks for result in _classify_chunk(chunk)]
+        return results, time.perf_counter() - started
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        list(pool.map(_worker_ready, range(workers)))  # start every worker before timing
+        started = time.perf_counter()
+        results = [result for batch in pool.map(_classify_chunk, chunks) for result in batch]
+        return results, time.perf_counter() - started
+
+
+def _summary(result: dict, index: int, full: bool) -> dict:
+    if "error" in result:
+        return {"index": index, "error": result["error"]}
+    if full:
+        return {"index": index, **result}
+    planner = result.get("planner") if isinstance(result.get("planner"), dict) else {}
+    return {
+        "index": index,
+        "intent": result.get("intent", ""),
+        "planner_mode": planner.get("mode", ""),
+        "planner_actions": len(planner.get("actions", []) or []),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="message file, or - for stdin")
+    parser.add_argument("--out", help="write JSONL results here (default: stdout unless several worker counts)")
+    parser.add_argument("--workers", default=str(os.cpu_count() or 1), help="worker count, or a comma list to compare")
+    parser.add_argument("--chunk-size", type=int, default=MAX_BATCH_ITEMS)
+    parser.add_argument("--full", action="store_true", help="write the whole payload instead of intent + planner summary")
+    args = parser.parse_args()
+
+    try:
+        counts = [max(1, int(part)) for part in str(args.workers).split(",") if part.strip()]
+    except ValueError:
+        parser.error("--workers must be an integer or a comma-separated list of integers")
+    items = read_items(args.input)
+    if not items:
+        print("no messages in input", file=sys.stderr)
+        return 1
+
+    reference: list[dict] | None = None
+    throughput: list[tuple[int, float]] = []
+    for count in counts:
+        results, elapsed = classify(items, count, args.chunk_size)
+        if reference is None:
+            reference = results
+        elif results != reference:
+            print(f"results differ between worker counts {counts[0]} and {count}", file=sys.stderr)
+            return 1
+        throughput.append((count, len(items) / elapsed if elapsed > 0 else 0.0))
+
+    lines = (json.dumps(_summary(result, i, args.full), ensure_ascii=False) for i, result in enumerate(reference))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            for line in lines:
+                fh.write(line + "\n")
+    elif len(counts) == 1:
+        for line in lines:
+            print(line)
+
+    report = sys.stderr if not args.out and len(counts) == 1 else sys.stdout
+    intents = Counter(str(result.get("intent") or "error") for result in reference)
+    print(f"messages={len(items)}", file=report)
+    for intent, n in intents.most_common():
+        print(f"  {intent:24} {n:7d}  {n / len(items) * 100:5.1f}%", file=report)
+    base = throughput[0][1]
+    for count, rate in throughput:
+        print(f"workers={count:<3} {rate:9.1f} msg/s  ({rate / base:.2f}x vs workers={throughput[0][0]})", file=report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
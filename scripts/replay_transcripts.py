@@ -0,0 +1,211 @@
+"""Replay exported chat transcripts through the stateful chatbot loop, streaming.
+
+Usage:
+  python scripts/replay_transcripts.py chat_messages.jsonl[.gz] [--out replay.jsonl[.gz]]
+      [--planner-feedback clarify|always|never] [--max-conversations 10000] [--full]
+
+Input is JSONL rows as exported from ``chat_messages`` (id, user_id, message,
+created_at) or ``z_ai_memory_events`` (adds intent, context, ...), ordered by
+time, e.g. ``COPY (SELECT row_to_json(m) FROM chat_messages m ORDER BY id) TO STDOUT``.
+Conversations are keyed by user_id (or conversation_id / session_id when present).
+
+Every stage is a generator: rows are read lazily, each turn's ``memory_update``
+becomes the next turn's memory hint for that conversation, and results are
+written as they are produced. Memory use depends on the number of live
+conversations (bounded by --max-conversations), not on the size of the dump.
+
+Planner feedback: the production client rebuilds the planner hint from each new
+message, and a hint with actions carries its steps forward (new text only adds
+steps or completes blocked ones), so feeding every plan back would keep a
+conversation inside its first bundle. The default ``clarify`` carries a plan
+forward for one turn only when it asked for clarification (the reply is
+usually the missing detail); ``always`` feeds every plan back verbatim.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from collections import Counter, OrderedDict
+from typing import IO, Any, Iterable, Iterator
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chatbot.processor import process_message_payload  # noqa: E402
+
+PLANNER_FEEDBACK_MODES = ("clarify", "always", "never")
+CONVERSATION_KEYS = ("conversation_id", "session_id", "user_id")
+
+
+class ReplayStats:
+    def __init__(self) -> None:
+        self.rows = 0
+        self.skipped = 0
+        self.turns = 0
+        self.conversations = 0
+        self.evicted = 0
+        self.intents: Counter[str] = Counter()
+        self.recorded = 0
+        self.recorded_agree = 0
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_rows(lines: Iterable[str], stats: ReplayStats) -> Iterator[dict[str, Any]]:
+    """Decode JSONL lazily; blank, malformed and message-less lines are counted and skipped."""
+    for line in lines:
+        if not line.strip():
+            continue
+        stats.rows += 1
+        try:
+            row = json.loads(line)
+        except ValueError:
+            stats.skipped += 1
+            continue
+        if not isinstance(row, dict) or not isinstance(row.get("message"), str) or not row["message"].strip():
+            stats.skipped += 1
+            continue
+        yield row
+
+
+def _conversation_key(row: dict[str, Any]) -> str:
+    for key in CONVERSATION_KEYS:
+        value = row.get(key)
+        if value not in (None, ""):
+            return f"{key}:{value}"
+    return "anonymous"
+
+
+def replay(
+    rows: Iterable[dict[str, Any]],
+    stats: ReplayStats,
+    planner_feedback: str = "clarify",
+    max_conversations: int = 10000,
+) -> Iterator[tuple[dict[str, Any], dict[str, Any]]]:
+    """Yield (row, payload) per turn, threading memory/planner hints per conversation."""
+    # conversation -> (memory hint, planner hint); LRU-bounded so idle users age out.
+    state: OrderedDict[str, tuple[dict | None, dict | None]] = OrderedDict()
+    for row in rows:
+        key = _conversation_key(row)
+        if key in state:
+            state.move_to_end(key)
+            memory_hint, planner_hint = state[key]
+        else:
+            stats.conversations += 1
+            memory_hint, planner_hint = None, None
+
+        context = row.get("context") if isinstance(row.get("context"), dict) else None
+        payload = process_message_payload(row["message"], context, memory_hint, planner_hint)
+        stats.turns += 1
+        stats.intents[str(payload.get("intent", ""))] += 1
+        recorded = str(row.get("intent") or "").strip()
+        if recorded:
+            stats.recorded += 1
+            stats.recorded_agree += recorded == payload.get("intent")
+
+        planner = payload.get("planner") if isinstance(payload.get("planner"), dict) else None
+        if planner_feedback == "always":
+            next_planner = planner
+        elif planner_feedback == "clarify" and planner_hint is None and planner and planner.get("requires_clarification"):
+            next_planner = planner
+        else:
+            next_planner = None
+        memory_update = payload.get("memory_update") if isinstance(payload.get("memory_update"), dict) else memory_hint
+        state[key] = (memory_update, next_planner)
+        while len(state) > max_conversations:
+            state.popitem(last=False)
+            stats.evicted += 1
+
+        yield row, payload
+
+
+def shape(turns: Iterable[tuple[dict[str, Any], dict[str, Any]]], full: bool = False) -> Iterator[dict[str, Any]]:
+    for row, payload in turns:
+        out: dict[str, Any] = {key: row[key] for key in ("id", "user_id", "conversation_id", "session_id", "created_at") if key in row}
+        if full:
+            out.update(payload)
+        else:
+            planner = payload.get("planner") or {}
+            memory_update = payload.get("memory_update") or {}
+            out.update({
+                "intent": payload.get("intent", ""),
+                "planner_mode": planner.get("mode", ""),
+                "planner_actions": len(planner.get("actions", []) or []),
+                "requires_clarification": bool(planner.get("requires_clarification")),
+                "focus_topic": memory_update.get("focus_topic", ""),
+                "recent_intents": memory_update.get("recent_intents", []),
+            })
+        if row.get("intent"):
+            out["recorded_intent"] = row["intent"]
+        yield out
+
+
+def write_jsonl(records: Iterable[dict[str, Any]], fh: IO[str], flush_every: int = 1000) -> int:
+    written = 0
+    for record in records:
+        fh.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        written += 1
+        if written % flush_every == 0:
+            fh.flush()
+    fh.flush()
+    return written
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="JSONL (optionally .gz) transcript rows, or - for stdin")
+    parser.add_argument("--out", default="-", help="JSONL (optionally .gz) output, default stdout")
+    parser.add_argument("--planner-feedback", choices=PLANNER_FEEDBACK_MODES, default="clarify")
+    parser.add_argument("--max-conversations", type=int, default=10000)
+    parser.add_argument("--full", action="store_true", help="write the whole payload per turn")
+    args = parser.parse_args()
+
+    stats = ReplayStats()
+    started = time.perf_counter()
+    with _open(args.input, "r") as src:
+        out = _open(args.out, "w")
+        try:
+            turns = replay(read_rows(src, stats), stats, args.planner_feedback, max(1, args.max_conversations))
+            write_jsonl(shape(turns, args.full), out)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    elapsed = time.perf_counter() - started
+
+    report = sys.stderr if args.out == "-" else sys.stdout
+    print(
+        f"rows={stats.rows} turns={stats.turns} skipped={stats.skipped} conversations={stats.conversations} "
+        f"evicted={stats.evicted} elapsed={elapsed:.2f}s ({stats.turns / elapsed if elapsed > 0 else 0.0:.0f} turns/s)",
+        file=report,
+    )
+    if stats.recorded:
+        print(f"recorded intent agreement {stats.recorded_agree}/{stats.recorded} ({stats.recorded_agree / stats.recorded * 100:.1f}%)", file=report)
+    for intent, count in stats.intents.most_common():
+        print(f"  {intent:24} {count:8d}", file=report)
+    peak = _peak_rss_mb()
+    if peak is not None:
+        print(f"peak rss {peak:.1f} MB", file=report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())